@@ -1,18 +1,36 @@
 from stable_baselines3 import PPO
+from sb3_contrib import MaskablePPO
 from stable_baselines3.common.env_util import make_vec_env
 from game_gym import RiftboundEnv
+from shm_vec_env import SharedMemoryVecEnv
 import os
 import logging
 
 logger = logging.getLogger("RiftboundNeural.Agent")
 
 class NeuralAgent:
-    def __init__(self, model_path="ppo_riftbound_sovereign"):
+    def __init__(self, model_path="ppo_riftbound_sovereign", n_workers=1, envs_per_worker=1, masked=False):
         self.model_path = model_path
         self.model = None
+        # masked: MaskablePPO over RiftboundEnv.action_masks(), so illegal actions are never sampled
+        self.masked = masked
+        # Training envs: n_workers processes (shared-memory VecEnv) x envs_per_worker each
+        self.n_workers = n_workers
+        self.envs_per_worker = envs_per_worker
 
-    def initialize(self):
-        """Creates or loads the PPO model."""
+    def make_env(self):
+        """Training VecEnv: in-process for one worker, SharedMemoryVecEnv otherwise."""
+        n_envs = self.n_workers * self.envs_per_worker
+        if self.n_workers > 1:
+            return SharedMemoryVecEnv([RiftboundEnv] * n_envs, n_workers=self.n_workers)
+        return make_vec_env(RiftboundEnv, n_envs=n_envs)
+
+    @property
+    def algorithm(self):
+        return MaskablePPO if self.masked else PPO
+
+    def initialize(self, env=None):
+        """Creates or loads the PPO / MaskablePPO model (bound to `env` when given)."""
         # Ensure path is relative to backend if running from root, or absolute
         actual_path = self.model_path
         if not os.path.exists(f"{actual_path}.zip"):
@@ -23,28 +41,38 @@ class NeuralAgent:
                  actual_path = f"../backend/{actual_path}"
         
         if os.path.exists(f"{actual_path}.zip"):
-            self.model = PPO.load(actual_path)
+            self.model = self.algorithm.load(actual_path, env=env)
             logger.info(f"SUCCESS: Loaded existing model from {actual_path}")
         else:
             # Create a wrapped environment
-            vec_env = make_vec_env(RiftboundEnv, n_envs=1)
-            self.model = PPO("MlpPolicy", vec_env, verbose=1)
-            logger.warning(f"NOTICE: Created new PPO model (Trained model not found at {actual_path})")
+            vec_env = env or make_vec_env(RiftboundEnv, n_envs=1)
+            self.model = self.algorithm("MlpPolicy", vec_env, verbose=1)
+            logger.warning(f"NOTICE: Created new {self.algorithm.__name__} model (Trained model not found at {actual_path})")
 
-    def predict(self, observation):
+    def predict(self, observation, action_masks=None):
         if not self.model:
             raise ValueError("Model not initialized. Call initialize() first.")
         
-        action, _states = self.model.predict(observation, deterministic=True)
+        if self.masked:
+            action, _states = self.model.predict(observation, deterministic=True, action_masks=action_masks)
+        else:
+            action, _states = self.model.predict(observation, deterministic=True)
         return action
 
     def train(self, total_timesteps=10000):
-        if not self.model:
-            self.initialize()
-            
-        print(f"Starting training for {total_timesteps} steps...")
-        self.model.learn(total_timesteps=total_timesteps)
-        self.model.save(self.model_path)
+        env = self.make_env()
+        try:
+            if not self.model or self.model.n_envs != env.num_envs:
+                # PPO.load() is the only way to change the number of envs of a model
+                self.initialize(env=env)
+            else:
+                self.model.set_env(env)
+
+            print(f"Starting training for {total_timesteps} steps on {env.num_envs} envs ({self.n_workers} workers)...")
+            self.model.learn(total_timesteps=total_timesteps)
+            self.model.save(self.model_path)
+        finally:
+            env.close()
         print("Training complete and model saved.")
 
 # Singleton instance
@@ -1,6 +1,11 @@
-from stable_baselines3 import PPO
-from backend.env.riftbound_env import RiftboundEnv
 import os
+import sys
+
+from stable_baselines3 import PPO
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_gym import RiftboundEnv
 
 def train():
     log_dir = "./logs"
@@ -10,7 +15,7 @@ def train():
         os.makedirs(models_dir)
 
     print("--- Initializing Riftbound Environment ---")
-    env = RiftboundEnv()
+    env = RiftboundEnv(obs_mode="flat")
     
     # Initialize PPO Agent
     # MlpPolicy is suitable for vector observations
@@ -0,0 +1,443 @@
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from combat import resolve_combat
+from game_logic import (
+    CARD_TABLE, Card, GameState, PLAYER_IDS, zobrist_hash, KEYWORD_BITS, KEYWORDS, LCG_A, LCG_C, LCG_M,
+    MAX_HAND_SIZE, MAX_FIELD_SIZE, DECK_SIZE, POLICY_SEED_SALT,
+    ACTION_END_TURN, ACTION_PLAY_OFFSET, ACTION_ATTACK_OFFSET, NUM_ACTIONS,
+)
+
+NO_WINNER = -1
+
+# Starting values of the per-game arrays; anything not listed starts at 0
+_INITIAL_VALUES = {"turn": 1, "winner": NO_WINNER, "health": 20, "mana": 1, "max_mana": 1}
+
+_BARRIER = KEYWORD_BITS["Barrier"]
+
+# Per-slot card columns shared by the hand and field zones
+_CARD_COLUMNS = ("handle", "card", "cost", "attack", "health", "keywords")
+
+# CARD_TABLE index of mock id card_{1000 + k}, interned on first draw
+_mock_card_index = np.full(9000, -1, dtype=np.int32)
+
+
+def _intern_mock_cards(numbers: np.ndarray) -> np.ndarray:
+    offsets = numbers - 1000
+    missing = np.unique(offsets[_mock_card_index[offsets] < 0])
+    for k in missing.tolist():
+        _mock_card_index[k] = CARD_TABLE.intern(f"card_{1000 + k}")
+    return _mock_card_index[offsets]
+
+
+class BatchedCoreEngine:
+    """
+    Struct-of-arrays version of PythonCoreEngine that steps N games in lockstep.
+
+    Player axis: 0 = "player", 1 = "opponent". Zones are fixed-capacity slot
+    arrays (hand: MAX_HAND_SIZE, field: MAX_FIELD_SIZE) with a per-zone count;
+    slots at or beyond the count are kept zeroed. `*_card` holds the CARD_TABLE
+    index and `*_handle` the per-game instance handle, as on scalar Cards.
+
+    Actions use the fixed-width layout from game_logic (ACTION_END_TURN /
+    ACTION_PLAY_OFFSET + k / ACTION_ATTACK_OFFSET + k), so every rule below
+    mirrors the scalar engine and the same seed plus the same actions yields
+    the same game.
+
+    With a CardCatalog, `deck` [N, 2, deck_size] holds catalog rows sampled at
+    reset and `deck_pos` the next row each player draws, as on PlayerState.
+
+    `policy_seed` is each game's policy_rng, used by rollout() to pick actions
+    exactly as PythonCoreEngine.rollout() does.
+    """
+    def __init__(self, num_games: int, catalog=None, deck_size: int = DECK_SIZE):
+        self.num_games = num_games
+        self.catalog = catalog
+        self.deck_size = deck_size
+        self._rows = np.arange(num_games)
+        self._hand_slots = np.arange(MAX_HAND_SIZE)
+        self._field_slots = np.arange(MAX_FIELD_SIZE)
+        self._allocate()
+
+    def _allocate(self):
+        n = self.num_games
+        self.turn = np.ones(n, dtype=np.int32)
+        self.active = np.zeros(n, dtype=np.int8)
+        self.winner = np.full(n, NO_WINNER, dtype=np.int8)
+        self.next_handle = np.zeros(n, dtype=np.int32)
+        self.seed = np.zeros(n, dtype=np.uint64)
+        self.policy_seed = np.zeros(n, dtype=np.uint64)
+
+        self.health = np.full((n, 2), 20, dtype=np.int32)
+        self.mana = np.ones((n, 2), dtype=np.int32)
+        self.max_mana = np.ones((n, 2), dtype=np.int32)
+
+        self.hand_count = np.zeros((n, 2), dtype=np.int32)
+        self.hand_handle = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.int32)
+        self.hand_card = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.int32)
+        self.hand_cost = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.int32)
+        self.hand_attack = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.int32)
+        self.hand_health = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.int32)
+        self.hand_keywords = np.zeros((n, 2, MAX_HAND_SIZE), dtype=np.uint8)
+
+        self.field_count = np.zeros((n, 2), dtype=np.int32)
+        self.field_handle = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.int32)
+        self.field_card = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.int32)
+        self.field_cost = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.int32)
+        self.field_attack = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.int32)
+        self.field_health = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.int32)
+        self.field_keywords = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=np.uint8)
+        self.field_barrier = np.zeros((n, 2, MAX_FIELD_SIZE), dtype=bool)
+
+        # Graveyards are only counted; dead units never come back
+        self.graveyard_count = np.zeros((n, 2), dtype=np.int32)
+
+        self.deck = np.zeros((n, 2, self.deck_size if self.catalog is not None else 0), dtype=np.int32)
+        self.deck_pos = np.zeros((n, 2), dtype=np.int32)
+
+        self._game_arrays = [
+            name for name, value in vars(self).items()
+            if not name.startswith("_") and isinstance(value, np.ndarray) and value.shape[:1] == (n,)
+        ]
+
+    def reset(self, seeds: Optional[Sequence[int]] = None):
+        """Starts a fresh game in every slot; game i behaves like PythonCoreEngine.reset(seeds[i])."""
+        if seeds is None:
+            seeds = np.random.randint(0, LCG_M, size=self.num_games, dtype=np.uint64)
+        self._allocate()
+        self.reset_games(self._rows, seeds)
+        return self
+
+    def reset_games(self, games: np.ndarray, seeds: Sequence[int]):
+        """Starts a fresh game in the given slots only (autoreset); the other games are untouched."""
+        games = np.asarray(games, dtype=np.int64)
+        for name in self._game_arrays:
+            getattr(self, name)[games] = _INITIAL_VALUES.get(name, 0)
+        self.seed[games] = np.asarray(seeds, dtype=np.uint64) % LCG_M
+        self.policy_seed[games] = self.seed[games] ^ np.uint64(POLICY_SEED_SALT)
+
+        # Same order as PythonCoreEngine.reset: both decks, then the initial hands
+        if self.catalog is not None:
+            pool = self.catalog.playable
+            for p in range(2):
+                for k in range(self.deck_size):
+                    self.deck[games, p, k] = pool[(self._next_random(games) * len(pool)).astype(np.int64)]
+        for p in range(2):
+            players = np.full(games.size, p, dtype=np.int8)
+            for _ in range(4):
+                self._draw_card(games, players)
+
+    def _next_random(self, g: np.ndarray) -> np.ndarray:
+        """Advances the StateSeed LCG of games g, like PythonCoreEngine.next_random."""
+        seed = (self.seed[g] * np.uint64(LCG_A) + np.uint64(LCG_C)) % np.uint64(LCG_M)
+        self.seed[g] = seed
+        return seed / float(LCG_M)
+
+    def _next_policy_random(self, g: np.ndarray) -> np.ndarray:
+        """Advances the policy LCG of games g, like PythonCoreEngine.policy_rng.next_random."""
+        seed = (self.policy_seed[g] * np.uint64(LCG_A) + np.uint64(LCG_C)) % np.uint64(LCG_M)
+        self.policy_seed[g] = seed
+        return seed / float(LCG_M)
+
+    def _randint(self, g: np.ndarray, low: int, high: int) -> np.ndarray:
+        return low + (self._next_random(g) * (high - low + 1)).astype(np.int32)
+
+    def _draw_card(self, g: np.ndarray, p: np.ndarray):
+        """Vectorized PythonCoreEngine._draw_card."""
+        if self.catalog is None:
+            self._draw_mock_card(g, p)
+            return
+        ok = self.deck_pos[g, p] < self.deck_size
+        g, p = g[ok], p[ok]
+        if not g.size:
+            return
+        row = self.deck[g, p, self.deck_pos[g, p]]
+        self.deck_pos[g, p] += 1
+        catalog = self.catalog
+        self._add_to_hand(
+            g, p, catalog.card_index[row], catalog.cost[row], catalog.attack[row],
+            catalog.health[row], catalog.keywords[row]
+        )
+
+    def _draw_mock_card(self, g: np.ndarray, p: np.ndarray):
+        # Same draw order as PythonCoreEngine._create_mock_card
+        card = _intern_mock_cards(self._randint(g, 1000, 9999))
+        cost = self._randint(g, 1, 8)
+        attack = self._randint(g, 1, 8)
+        health = self._randint(g, 1, 8)
+        self._add_to_hand(g, p, card, cost, attack, health, 0)
+
+    def _add_to_hand(self, g: np.ndarray, p: np.ndarray, card, cost, attack, health, keywords):
+        k = self.hand_count[g, p]
+        self.hand_handle[g, p, k] = self.next_handle[g]
+        self.next_handle[g] += 1
+        self.hand_card[g, p, k] = card
+        self.hand_cost[g, p, k] = cost
+        self.hand_attack[g, p, k] = attack
+        self.hand_health[g, p, k] = health
+        self.hand_keywords[g, p, k] = keywords
+        self.hand_count[g, p] = k + 1
+
+    def legal_mask(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Legal actions of the active player of every game as a [N, NUM_ACTIONS] bool mask."""
+        if out is None:
+            out = np.zeros((self.num_games, NUM_ACTIONS), dtype=bool)
+        rows, p = self._rows, self.active
+        live = self.winner == NO_WINNER
+
+        can_place = live & (self.field_count[rows, p] < MAX_FIELD_SIZE)
+        in_hand = self._hand_slots < self.hand_count[rows, p][:, None]
+        affordable = self.hand_cost[rows, p] <= self.mana[rows, p][:, None]
+        on_field = self._field_slots < self.field_count[rows, p][:, None]
+
+        out[:, ACTION_END_TURN] = live
+        out[:, ACTION_PLAY_OFFSET:ACTION_ATTACK_OFFSET] = in_hand & affordable & can_place[:, None]
+        out[:, ACTION_ATTACK_OFFSET:NUM_ACTIONS] = on_field & live[:, None]
+        return out
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """Applies one encoded action per game. Finished games, and games whose
+        action is negative, are left untouched.
+
+        Returns:
+            Boolean [N] array, True where the game has a winner.
+        """
+        actions = np.asarray(actions)
+        live = self.winner == NO_WINNER
+
+        end = np.flatnonzero(live & (actions == ACTION_END_TURN))
+        play = np.flatnonzero(live & (actions >= ACTION_PLAY_OFFSET) & (actions < ACTION_ATTACK_OFFSET))
+        attack = np.flatnonzero(live & (actions >= ACTION_ATTACK_OFFSET) & (actions < NUM_ACTIONS))
+
+        if end.size:
+            self._handle_end_turn(end)
+        if play.size:
+            self._play_card(play, actions[play] - ACTION_PLAY_OFFSET)
+        if attack.size:
+            self._attack(attack, actions[attack] - ACTION_ATTACK_OFFSET)
+
+        return self.winner != NO_WINNER
+
+    def rollout(self, policy: Union[str, Callable] = "random", max_steps: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plays every game forward until it ends or `max_steps` actions were applied,
+        as PythonCoreEngine.rollout() does per game.
+
+        Args:
+            policy: "random", "greedy" or a callable (engine, mask) -> [N] action indexes.
+            max_steps: Cap on the number of actions per game.
+
+        Returns:
+            (winner [N] int8, NO_WINNER where unfinished; actions played [N])
+        """
+        choose = {"random": self.random_actions, "greedy": self.greedy_actions}.get(policy) if isinstance(policy, str) else None
+        if choose is None:
+            choose = lambda mask: policy(self, mask)
+        mask = np.zeros((self.num_games, NUM_ACTIONS), dtype=bool)
+        lengths = np.zeros(self.num_games, dtype=np.int32)
+        for _ in range(max_steps):
+            live = self.winner == NO_WINNER
+            if not live.any():
+                break
+            self.legal_mask(out=mask)
+            self.step(choose(mask))
+            lengths += live
+        return self.winner.copy(), lengths
+
+    def random_actions(self, mask: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Uniform legal action for each game in `rows` (default: every live game),
+        drawn from policy_seed like PythonCoreEngine._random_action. Other games get -1.
+        """
+        actions = np.full(self.num_games, -1, dtype=np.int64)
+        if rows is None:
+            rows = np.flatnonzero(self.winner == NO_WINNER)
+        if rows.size:
+            legal = np.cumsum(mask[rows], axis=1)
+            r = (self._next_policy_random(rows) * legal[:, -1]).astype(np.int64)
+            actions[rows] = np.argmax(legal > r[:, None], axis=1)
+        return actions
+
+    def greedy_actions(self, mask: np.ndarray) -> np.ndarray:
+        """Vectorized PythonCoreEngine._greedy_action."""
+        rows, p = self._rows, self.active
+        play_value = np.where(mask[:, ACTION_PLAY_OFFSET:ACTION_ATTACK_OFFSET], self.hand_cost[rows, p], -1)
+        attack_value = np.where(mask[:, ACTION_ATTACK_OFFSET:NUM_ACTIONS], self.field_attack[rows, p], -1)
+        best_play = np.argmax(play_value, axis=1)
+        best_attack = np.argmax(attack_value, axis=1)
+        return np.where(
+            play_value[rows, best_play] >= 0, ACTION_PLAY_OFFSET + best_play,
+            np.where(attack_value[rows, best_attack] >= 0, ACTION_ATTACK_OFFSET + best_attack, ACTION_END_TURN)
+        )
+
+    def _play_card(self, g: np.ndarray, slot: np.ndarray):
+        p = self.active[g]
+        ok = (slot < self.hand_count[g, p]) & (self.field_count[g, p] < MAX_FIELD_SIZE)
+        g, p, slot = g[ok], p[ok], slot[ok]
+        if not g.size:
+            return
+
+        f = self.field_count[g, p]
+        for col in _CARD_COLUMNS:
+            getattr(self, f"field_{col}")[g, p, f] = getattr(self, f"hand_{col}")[g, p, slot]
+        self.field_barrier[g, p, f] = (self.hand_keywords[g, p, slot] & _BARRIER) != 0
+        self.field_count[g, p] += 1
+        self.mana[g, p] -= self.hand_cost[g, p, slot]
+
+        # list.pop(slot): shift the tail of the hand one slot left
+        src = self._hand_slots + (self._hand_slots >= slot[:, None])
+        np.minimum(src, MAX_HAND_SIZE - 1, out=src)
+        for col in _CARD_COLUMNS:
+            arr = getattr(self, f"hand_{col}")
+            arr[g, p] = np.take_along_axis(arr[g, p], src, axis=1)
+            arr[g, p, MAX_HAND_SIZE - 1] = 0
+        self.hand_count[g, p] -= 1
+
+    def _attack(self, g: np.ndarray, slot: np.ndarray):
+        p = self.active[g]
+        ok = slot < self.field_count[g, p]
+        g, p, slot = g[ok], p[ok], slot[ok]
+        if not g.size:
+            return
+        o = 1 - p
+
+        # Blocker: first unit of the defender (the sweep keeps every field unit alive)
+        has_blocker = self.field_count[g, o] > 0
+
+        direct = ~has_blocker
+        if direct.any():
+            gd, pd, od = g[direct], p[direct], o[direct]
+            self.health[gd, od] -= self.field_attack[gd, pd, slot[direct]]
+            lethal = self.health[gd, od] <= 0
+            self.winner[gd[lethal]] = pd[lethal]
+
+        if has_blocker.any():
+            g, p, slot = g[has_blocker], p[has_blocker], slot[has_blocker]
+            blocker = np.zeros_like(slot)
+            self._resolve_unit_combat(g, p, slot, blocker)
+            self._sweep_dead_units(g, p, slot)
+            self._sweep_dead_units(g, 1 - p, blocker)
+
+    def _sweep_dead_units(self, g: np.ndarray, p: np.ndarray, slot: np.ndarray):
+        """State-based action: units at 0 health or below leave the field (swap-remove)."""
+        dead = self.field_health[g, p, slot] <= 0
+        if not dead.any():
+            return
+        g, p, slot = g[dead], p[dead], slot[dead]
+        last = self.field_count[g, p] - 1
+        for col in _CARD_COLUMNS + ("barrier",):
+            arr = getattr(self, f"field_{col}")
+            arr[g, p, slot] = arr[g, p, last]
+            arr[g, p, last] = 0
+        self.field_count[g, p] = last
+        self.graveyard_count[g, p] += 1
+
+    def _resolve_unit_combat(self, g: np.ndarray, p: np.ndarray, a: np.ndarray, b: np.ndarray):
+        """Vectorized PythonCoreEngine._resolve_unit_combat via combat.resolve_combat."""
+        o = 1 - p
+        dmg_to_attacker, dmg_to_blocker, excess, a_barrier, b_barrier = resolve_combat(
+            self.field_attack[g, p, a], self.field_keywords[g, p, a], self.field_barrier[g, p, a],
+            self.field_attack[g, o, b], self.field_health[g, o, b], self.field_keywords[g, o, b],
+            self.field_barrier[g, o, b]
+        )
+        self.field_health[g, p, a] -= dmg_to_attacker
+        self.field_barrier[g, p, a] = a_barrier
+        self.field_health[g, o, b] -= dmg_to_blocker
+        self.field_barrier[g, o, b] = b_barrier
+
+        # Overwhelm: excess damage carries over to the defending player
+        self.health[g, o] -= excess
+
+    def _handle_end_turn(self, g: np.ndarray):
+        # Switch Player
+        self.active[g] = 1 - self.active[g]
+        q = self.active[g]
+
+        # Mana and Draw
+        self.turn[g] += (q == 0)
+        cap = np.minimum(10, self.turn[g])
+        self.max_mana[g, q] = cap
+        self.mana[g, q] = cap
+
+        # Draw 1
+        can_draw = self.hand_count[g, q] < MAX_HAND_SIZE
+        if can_draw.any():
+            self._draw_card(g[can_draw], q[can_draw])
+
+    @classmethod
+    def from_states(cls, states: List[GameState], policy_seeds: Optional[Sequence[int]] = None, catalog=None) -> "BatchedCoreEngine":
+        """
+        Loads scalar GameStates as the games of a new batch (inverse of to_game_state).
+
+        `policy_seeds` are the games' policy_rng seeds (engine.policy_rng.seed);
+        by default each is derived from the state's seed as reset() does.
+        """
+        engine = cls(len(states), catalog=catalog)
+        for g, state in enumerate(states):
+            engine.turn[g] = state.turn
+            engine.active[g] = PLAYER_IDS.index(state.active_player)
+            engine.winner[g] = PLAYER_IDS.index(state.winner) if state.winner else NO_WINNER
+            engine.next_handle[g] = state.next_handle
+            engine.seed[g] = state.seed
+            for p, pid in enumerate(PLAYER_IDS):
+                player = state.players[pid]
+                engine.health[g, p] = player.health
+                engine.mana[g, p] = player.mana
+                engine.max_mana[g, p] = player.max_mana
+                engine.graveyard_count[g, p] = len(player.graveyard)
+                for zone, cards in (("hand", player.hand), ("field", player.field)):
+                    getattr(engine, f"{zone}_count")[g, p] = len(cards)
+                    for k, card in enumerate(cards):
+                        getattr(engine, f"{zone}_handle")[g, p, k] = card.handle
+                        getattr(engine, f"{zone}_card")[g, p, k] = card.card_index
+                        getattr(engine, f"{zone}_cost")[g, p, k] = card.cost
+                        getattr(engine, f"{zone}_attack")[g, p, k] = card.attack
+                        getattr(engine, f"{zone}_health")[g, p, k] = card.health
+                        getattr(engine, f"{zone}_keywords")[g, p, k] = card.keyword_mask
+                engine.field_barrier[g, p, :len(player.field)] = [c.is_barrier_active for c in player.field]
+                if catalog is not None:
+                    engine.deck[g, p] = player.deck
+                    engine.deck_pos[g, p] = player.deck_pos
+        if policy_seeds is None:
+            engine.policy_seed[:] = engine.seed ^ np.uint64(POLICY_SEED_SALT)
+        else:
+            engine.policy_seed[:] = np.asarray(policy_seeds, dtype=np.uint64) % LCG_M
+        return engine
+
+    def to_game_state(self, g: int) -> GameState:
+        """Materializes game g as a scalar GameState (for inspection and parity checks)."""
+        state = GameState(int(self.seed[g]))
+        state.turn = int(self.turn[g])
+        state.active_player = PLAYER_IDS[self.active[g]]
+        state.winner = PLAYER_IDS[self.winner[g]] if self.winner[g] != NO_WINNER else None
+        state.next_handle = int(self.next_handle[g])
+
+        for p, pid in enumerate(PLAYER_IDS):
+            player = state.players[pid]
+            player.health = int(self.health[g, p])
+            player.mana = int(self.mana[g, p])
+            player.max_mana = int(self.max_mana[g, p])
+            if self.catalog is not None:
+                player.deck = self.deck[g, p].copy()
+                player.deck_pos = int(self.deck_pos[g, p])
+            player.hand = [self._materialize("hand", g, p, k) for k in range(self.hand_count[g, p])]
+            player.field = [self._materialize("field", g, p, k) for k in range(self.field_count[g, p])]
+            for k, card in enumerate(player.field):
+                card.is_barrier_active = bool(self.field_barrier[g, p, k])
+            player.reindex()
+        state.zobrist = zobrist_hash(state)
+        return state
+
+    def _materialize(self, zone: str, g: int, p: int, k: int) -> Card:
+        mask = int(getattr(self, f"{zone}_keywords")[g, p, k])
+        card_id = CARD_TABLE.ids[getattr(self, f"{zone}_card")[g, p, k]]
+        return Card(
+            id=card_id,
+            cost=int(getattr(self, f"{zone}_cost")[g, p, k]),
+            attack=int(getattr(self, f"{zone}_attack")[g, p, k]),
+            health=int(getattr(self, f"{zone}_health")[g, p, k]),
+            type=self.catalog.type_name(card_id) if self.catalog is not None else "Unit",
+            keywords=[kw for kw in KEYWORDS if mask & KEYWORD_BITS[kw]],
+            handle=int(getattr(self, f"{zone}_handle")[g, p, k])
+        )
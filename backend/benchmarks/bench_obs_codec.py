@@ -0,0 +1,84 @@
+"""
+ObsCodec: compression ratio, reconstruction error and decode throughput.
+
+Observations come from random RiftboundEnv playouts (with the card catalog
+and synthetic embeddings, so the 16 semantic channels are populated as they
+would be with a real embedding store), plus the distillation dataset when
+backend/data/distillation_dataset.pkl exists. Decode throughput is measured
+as random training batches written into one reused [B, 32, 9, 5] buffer.
+
+Usage (from backend/):
+    python benchmarks/bench_obs_codec.py [--steps 20000] [--batch 256]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from card_catalog import get_catalog
+from game_gym import RiftboundEnv
+from game_logic import PythonCoreEngine
+from obs_codec import CODEC_MODES, ObsCodec
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'distillation_dataset.pkl')
+
+
+def playout_observations(steps: int, seed: int = 0) -> np.ndarray:
+    env = RiftboundEnv()
+    env.engine = PythonCoreEngine(catalog=get_catalog())
+    env._spatial_encoder.attach(env.engine)
+    rng = np.random.default_rng(seed)
+    # Same scale as MiniLM components
+    env.vectorizer.set_embeddings({card_id: (rng.standard_normal(16) * 0.05).tolist() for card_id in get_catalog().ids})
+    observations = [env.reset(seed=seed)[0]]
+    for a in rng.integers(0, 128, size=steps - 1):
+        obs, _, terminated, _, _ = env.step(int(a))
+        observations.append(obs)
+        if terminated:
+            observations[-1] = env.reset()[0]
+    return np.stack(observations)
+
+
+def report(name: str, observations: np.ndarray, batch: int, repeat: int = 20):
+    print(f"--- {name}: {len(observations)} observations, "
+          f"{(observations.reshape(len(observations), observations.shape[1], -1).any(axis=1)).sum(axis=1).mean():.1f} "
+          f"occupied cells/obs ---")
+    print(f"{'mode':>17} {'bytes/obs':>10} {'ratio':>7} {'max err':>9} {'encode/s':>11} {'decode/s':>11}")
+    print(f"{'float32':>17} {observations[0].nbytes:>10,} {1.0:>6.1f}x {0.0:>9.1e} {'-':>11} {'-':>11}")
+    rng = np.random.default_rng(0)
+    batches = [rng.integers(0, len(observations), size=batch) for _ in range(repeat)]
+    out = np.empty((batch,) + observations.shape[1:], dtype=np.float32)
+    for mode in CODEC_MODES:
+        codec = ObsCodec(mode)
+        start = time.perf_counter()
+        encoded = codec.encode(observations)
+        encode_rate = len(observations) / (time.perf_counter() - start)
+        error = float(np.abs(codec.decode(encoded) - observations).max())
+        start = time.perf_counter()
+        for indices in batches:
+            codec.decode(encoded, indices, out=out)
+        decode_rate = batch * repeat / (time.perf_counter() - start)
+        print(f"{mode:>17} {encoded.nbytes / len(observations):>10,.0f} {encoded.compression_ratio:>6.1f}x "
+              f"{error:>9.1e} {encode_rate:>11,.0f} {decode_rate:>11,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Observation codec benchmark")
+    parser.add_argument("--steps", type=int, default=20000, help="Env steps of playout observations")
+    parser.add_argument("--batch", type=int, default=256, help="Decode batch size")
+    args = parser.parse_args()
+
+    report("RiftboundEnv playouts", playout_observations(args.steps), args.batch)
+    if os.path.exists(DATASET_PATH):
+        with open(DATASET_PATH, "rb") as f:
+            dataset = pickle.load(f)
+        report("distillation_dataset.pkl", np.stack([item["obs"] for item in dataset]), args.batch)
+
+
+if __name__ == "__main__":
+    main()
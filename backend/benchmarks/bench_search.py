@@ -0,0 +1,109 @@
+"""
+Branching benchmark: copy.deepcopy vs snapshot()/restore() vs make/unmake.
+
+Each method walks the full legal-action tree to a fixed depth from the same
+seeded mid-game positions, so node counts must match across methods.
+
+Usage (from backend/):
+    python benchmarks/bench_search.py [--depths 1 2 3 4 5] [--positions 20]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import PythonCoreEngine
+
+
+def _legal(engine):
+    return engine.get_legal_actions(engine.state.active_player)
+
+
+def walk_deepcopy(engine: PythonCoreEngine, depth: int) -> int:
+    if depth == 0 or engine.state.winner:
+        return 1
+    nodes = 0
+    parent = engine.state
+    for action in _legal(engine):
+        engine.state = copy.deepcopy(parent)
+        engine.apply_action(action)
+        nodes += walk_deepcopy(engine, depth - 1)
+    engine.state = parent
+    return nodes
+
+
+def walk_snapshot(engine: PythonCoreEngine, depth: int) -> int:
+    if depth == 0 or engine.state.winner:
+        return 1
+    nodes = 0
+    snap = engine.snapshot()
+    for action in _legal(engine):
+        engine.apply_action(action)
+        nodes += walk_snapshot(engine, depth - 1)
+        engine.restore(snap)
+    return nodes
+
+
+def walk_make_unmake(engine: PythonCoreEngine, depth: int) -> int:
+    if depth == 0 or engine.state.winner:
+        return 1
+    nodes = 0
+    for action in _legal(engine):
+        record = engine.apply_action(action, undoable=True)
+        nodes += walk_make_unmake(engine, depth - 1)
+        engine.undo(record)
+    return nodes
+
+
+METHODS = {
+    "deepcopy": walk_deepcopy,
+    "snapshot": walk_snapshot,
+    "make/unmake": walk_make_unmake,
+}
+
+
+def seeded_position(seed: int, warmup: int = 12) -> PythonCoreEngine:
+    engine = PythonCoreEngine()
+    engine.reset(seed)
+    for _ in range(warmup):
+        actions = _legal(engine)
+        if not actions or engine.state.winner:
+            break
+        engine.apply_action(actions[engine.policy_rng.random_index(len(actions))])
+    return engine
+
+
+def run(depths, positions: int) -> list:
+    results = []
+    for depth in depths:
+        for name, walk in METHODS.items():
+            nodes, elapsed = 0, 0.0
+            for seed in range(positions):
+                engine = seeded_position(seed)
+                start = time.perf_counter()
+                nodes += walk(engine, depth)
+                elapsed += time.perf_counter() - start
+            results.append({"depth": depth, "method": name, "nodes": nodes, "seconds": elapsed})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search branching benchmark")
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 2, 3, 4, 5])
+    parser.add_argument("--positions", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.depths, args.positions)
+    print(f"{'depth':>5} {'method':>12} {'nodes':>10} {'nodes/s':>12} {'vs deepcopy':>12}")
+    baseline = {r["depth"]: r for r in results if r["method"] == "deepcopy"}
+    for r in results:
+        rate = r["nodes"] / r["seconds"] if r["seconds"] else float("inf")
+        speedup = baseline[r["depth"]]["seconds"] / r["seconds"] if r["seconds"] else float("inf")
+        print(f"{r['depth']:>5} {r['method']:>12} {r['nodes']:>10} {rate:>12,.0f} {speedup:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
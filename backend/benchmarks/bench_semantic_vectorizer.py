@@ -0,0 +1,103 @@
+"""
+SemanticVectorizer card lookups: linear startswith() scan vs prefix table.
+
+`ReferenceVectorizer` restores the original get_card_embedding (exact key,
+else a scan over every cached id for the first one starting with the base
+id, converting the list to a new array each call) and the original
+np.mean pooling. Both vectorize the same serialized states with a synthetic
+catalog-sized embedding cache in which every in-game id is a variant
+("<base>-p"), so every lookup takes the fallback path.
+
+The pooled means are taken over rows in sorted order (the memo key is the
+multiset), so outputs may differ from the reference in the last float32 bit;
+the largest absolute difference is reported.
+
+Usage (from backend/):
+    python benchmarks/bench_semantic_vectorizer.py [--cards 723] [--games 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_gym import RiftboundEnv
+from game_logic import CARD_TABLE, PythonCoreEngine
+from semantic_vectorizer import SemanticVectorizer
+
+
+class ReferenceVectorizer(SemanticVectorizer):
+    """The per-call scan and pooling that the prefix table and pool memo replaced."""
+
+    def get_card_embedding(self, card_id):
+        if card_id in self.embeddings:
+            return np.array(self.embeddings[card_id], dtype=np.float32)
+        base_id = "-".join(card_id.split("-")[:2])
+        for key in self.embeddings:
+            if key.startswith(base_id):
+                return np.array(self.embeddings[key], dtype=np.float32)
+        return np.zeros(self.embedding_size, dtype=np.float32)
+
+    def pooled_embedding(self, card_ids):
+        return np.mean([self.get_card_embedding(card_id) for card_id in card_ids], axis=0)
+
+
+def synthetic_embeddings(cards: int, ids, seed: int = 0) -> dict:
+    """`cards` base ids ("SYN-<n>") plus one per in-game id, all keyed "<base>-<suffix>"."""
+    rng = np.random.default_rng(seed)
+    bases = [f"SYN-{n:03d}" for n in range(cards)] + [f"{card_id}-base" for card_id in ids]
+    return {f"{base}-std": rng.random(384).astype(np.float32).tolist() for base in bases}
+
+
+def collect_states(games: int) -> list:
+    serialize = RiftboundEnv(obs_mode="flat")._serialize_state
+    states = []
+    for seed in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed)
+        while not engine.state.winner:
+            states.append(serialize(engine.state))
+            legal = np.flatnonzero(engine.legal_mask(engine.state.active_player))
+            engine.apply_action_index(int(legal[engine.policy_rng.random_index(legal.size)]))
+    # In-game ids become variants of the cached "<id>-base-std" entries
+    for state in states:
+        for player in state["players"].values():
+            for card in player["hand"] + player["field"]:
+                card["id"] = f"{card['id']}-base-p"
+    return states
+
+
+def us_per_state(vectorizer, states: list) -> float:
+    start = time.perf_counter()
+    for state in states:
+        vectorizer.vectorize(state)
+    return (time.perf_counter() - start) / len(states) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SemanticVectorizer lookup benchmark")
+    parser.add_argument("--cards", type=int, default=723, help="Synthetic catalog size")
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+
+    states = collect_states(args.games)
+    embeddings = synthetic_embeddings(args.cards, CARD_TABLE.ids)
+    reference = ReferenceVectorizer(embeddings=embeddings)
+    indexed = SemanticVectorizer(embeddings=embeddings)
+
+    max_diff = max(float(np.abs(indexed.vectorize(s) - reference.vectorize(s)).max()) for s in states)
+    print(f"--- SemanticVectorizer ({len(embeddings)} cached ids, {len(states)} states) ---")
+    print(f"Max abs difference vs reference: {max_diff:.2e}")
+    old = us_per_state(reference, states)
+    cold = us_per_state(SemanticVectorizer(embeddings=embeddings), states)
+    warm = us_per_state(indexed, states)
+    print(f"linear scan:          {old:9.1f} us/state")
+    print(f"prefix table (cold):  {cold:9.1f} us/state ({old / cold:.1f}x)")
+    print(f"prefix table (warm):  {warm:9.1f} us/state ({old / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+SpatialVectorizer.vectorize: per-unit loop vs array-backed single scatter.
+
+`reference_vectorize` is the original implementation (one embedding lookup,
+one log1p per stat and one keyword vector per unit, written cell by cell).
+Both run over serialized states from random playouts, with and without the
+card catalog, and with synthetic embeddings so channels 0-15 are exercised
+even when embeddings_cache.json is absent. Outputs must match bit for bit.
+
+Usage (from backend/):
+    python benchmarks/bench_spatial_vectorizer.py [--games 30] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from card_catalog import get_catalog
+from game_gym import RiftboundEnv
+from game_logic import CARD_TABLE, PythonCoreEngine
+from spatial_vectorizer import SpatialVectorizer
+
+_KEYWORD_MAP = {
+    "Quick Attack": 0, "Barrier": 1, "Overwhelm": 2, "Elusive": 3,
+    "Lifesteal": 4, "Tough": 5, "Challenger": 6, "Fearsome": 7,
+}
+
+
+def reference_vectorize(vectorizer: SpatialVectorizer, game_state: dict, player_id: str) -> np.ndarray:
+    """The per-unit implementation that vectorize() replaced."""
+    tensor = np.zeros((vectorizer.channels, vectorizer.height, vectorizer.width), dtype=np.float32)
+    for pid, player_data in game_state.get("players", {}).items():
+        is_owner = 1.0 if pid == player_id else 0.0
+        for idx, unit in enumerate(player_data.get("field", [])):
+            row = idx % vectorizer.height
+            col = idx // vectorizer.height
+            if col >= vectorizer.width:
+                continue
+            card_id = str(unit.get("id", "0"))
+            if card_id in vectorizer.embeddings:
+                tensor[0:16, row, col] = np.array(vectorizer.embeddings[card_id][:16], dtype=np.float32)
+            else:
+                tensor[0:16, row, col] = np.zeros(16, dtype=np.float32)
+            tensor[16, row, col] = 1.0
+            tensor[17, row, col] = is_owner
+            tensor[18, row, col] = min(np.log1p(unit.get("attack", 0)) / 3.0, 1.0)
+            tensor[21, row, col] = min(np.log1p(unit.get("health", 0)) / 3.0, 1.0)
+            kw_vec = np.zeros(8, dtype=np.float32)
+            for kw in unit.get("keywords", []):
+                if kw in _KEYWORD_MAP:
+                    kw_vec[_KEYWORD_MAP[kw]] = 1.0
+            tensor[24:32, row, col] = kw_vec
+    return tensor
+
+
+def collect_states(games: int) -> list:
+    """(serialized state, player_id) at every decision point of random playouts."""
+    serialize = RiftboundEnv()._serialize_state
+    states = []
+    for catalog in (None, get_catalog()):
+        for seed in range(games):
+            engine = PythonCoreEngine(catalog=catalog)
+            engine.reset(seed)
+            while not engine.state.winner:
+                states.append((serialize(engine.state), engine.state.active_player))
+                legal = np.flatnonzero(engine.legal_mask(engine.state.active_player))
+                engine.apply_action_index(int(legal[engine.policy_rng.random_index(legal.size)]))
+    return states
+
+
+def us_per_call(fn, states: list, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for state, pid in states:
+            fn(state, pid)
+        best = min(best, time.perf_counter() - start)
+    return best / len(states) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SpatialVectorizer.vectorize benchmark")
+    parser.add_argument("--games", type=int, default=30, help="Playouts per catalog setting")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    states = collect_states(args.games)
+    vectorizer = SpatialVectorizer()
+    # Synthetic embeddings for every card seen so far (the JSON cache may not exist)
+    rng = np.random.default_rng(0)
+    vectorizer.set_embeddings({card_id: rng.random(32).tolist() for card_id in CARD_TABLE.ids})
+
+    mismatches = sum(
+        vectorizer.vectorize(state, pid).tobytes() != reference_vectorize(vectorizer, state, pid).tobytes()
+        for state, pid in states
+    )
+    units = sum(len(p["field"]) for state, _ in states for p in state["players"].values()) / len(states)
+
+    reference = us_per_call(lambda s, p: reference_vectorize(vectorizer, s, p), states, args.repeat)
+    scatter = us_per_call(vectorizer.vectorize, states, args.repeat)
+    print("--- SpatialVectorizer.vectorize ---")
+    print(f"States: {len(states)} | Units/state: {units:.1f} | Mismatches: {mismatches}")
+    print(f"per-unit loop:  {reference:8.1f} us/call")
+    print(f"single scatter: {scatter:8.1f} us/call ({reference / scatter:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
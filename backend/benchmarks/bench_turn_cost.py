@@ -0,0 +1,95 @@
+"""
+Per-action cost by turn: checks that long games do not get slower every turn.
+
+Both sides play a trading policy (develop, attack only into blockers, never
+face), so games run to the turn limit and units keep dying. Each timed action
+includes legal-move generation, apply_action, _serialize_state and both
+vectorizers, the work a gym step does.
+
+Usage (from backend/):
+    python benchmarks/bench_turn_cost.py [--turns 50] [--games 20]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import PythonCoreEngine
+from game_gym import RiftboundEnv
+from spatial_vectorizer import SpatialVectorizer
+from vectorizer import StateVectorizer
+
+
+def trading_action(engine: PythonCoreEngine, actions: list) -> dict:
+    """Plays cards first, attacks only when the defender has a unit to block, then ends the turn."""
+    state = engine.state
+    defender = state.players["opponent" if state.active_player == "player" else "player"]
+    for action in actions:
+        if action["type"] == "PLAY_CARD":
+            return action
+    if defender.field:
+        for action in actions:
+            if action["type"] == "ATTACK":
+                return action
+    return actions[0]
+
+
+def run(turns: int, games: int, bucket: int = 5) -> dict:
+    env = RiftboundEnv()
+    spatial = SpatialVectorizer()
+    flat = StateVectorizer()
+    timings = defaultdict(list)
+    field_sizes = defaultdict(list)
+    attacks = defaultdict(int)
+
+    for seed in range(games):
+        engine = env.engine
+        engine.reset(seed)
+        while engine.state.turn <= turns and not engine.state.winner:
+            turn = engine.state.turn
+            key = (seed, turn, engine.state.active_player)
+            start = time.perf_counter()
+            actions = engine.get_legal_actions(engine.state.active_player)
+            action = trading_action(engine, actions)
+            # Attacks per turn are capped so turns stay comparable across the game
+            if action["type"] == "ATTACK":
+                attacks[key] += 1
+                if attacks[key] > 3:
+                    action = actions[0]
+            engine.apply_action(action)
+            serialized = env._serialize_state(engine.state)
+            spatial.vectorize(serialized, player_id="player")
+            flat.vectorize(serialized)
+            elapsed = time.perf_counter() - start
+
+            b = (turn - 1) // bucket
+            timings[b].append(elapsed)
+            field_sizes[b].append(sum(len(p.field) for p in engine.state.players.values()))
+
+    return {
+        b: {
+            "turns": f"{b * bucket + 1}-{(b + 1) * bucket}",
+            "actions": len(ts),
+            "us_per_action": 1e6 * sum(ts) / len(ts),
+            "avg_field_units": sum(field_sizes[b]) / len(field_sizes[b]),
+        }
+        for b, ts in sorted(timings.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-action cost by turn")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--games", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'turns':>7} {'actions':>8} {'us/action':>10} {'field units':>12}")
+    for row in run(args.turns, args.games).values():
+        print(f"{row['turns']:>7} {row['actions']:>8} {row['us_per_action']:>10.1f} {row['avg_field_units']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Multi-process VecEnv scaling: SharedMemoryVecEnv vs SB3's SubprocVecEnv.
+
+For each worker count, both envs run the same random actions over
+`envs_per_worker * workers` RiftboundEnv instances. SubprocVecEnv always has
+one process per env, so it is only run when envs_per_worker is 1.
+DummyVecEnv (one process) is the baseline that the speedup is relative to.
+
+Scaling stops at the machine's core count; worker counts above it only
+measure the synchronization overhead.
+
+Usage (from backend/):
+    python benchmarks/bench_vec_env_scaling.py [--workers 1 2 4 8 16 32 64] [--steps 300]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_gym import RiftboundEnv
+from shm_vec_env import SharedMemoryVecEnv
+
+
+def steps_per_sec(vec_env, steps: int, seed: int = 0) -> float:
+    """Env steps per second (every env counts) over `steps` vector steps, after one warm-up step."""
+    vec_env.seed(seed)
+    vec_env.reset()
+    actions = np.random.default_rng(seed).integers(0, 128, size=(steps + 1, vec_env.num_envs))
+    vec_env.step(actions[0])
+    start = time.perf_counter()
+    for a in actions[1:]:
+        vec_env.step(a)
+    elapsed = time.perf_counter() - start
+    vec_env.close()
+    return vec_env.num_envs * steps / elapsed
+
+
+def run(workers, envs_per_worker: int, steps: int) -> list:
+    rows = []
+    for n in workers:
+        num_envs = n * envs_per_worker
+        row = {
+            "workers": n,
+            "envs": num_envs,
+            "dummy": steps_per_sec(DummyVecEnv([RiftboundEnv] * num_envs), steps),
+            "shared": steps_per_sec(SharedMemoryVecEnv([RiftboundEnv] * num_envs, n_workers=n), steps),
+        }
+        if envs_per_worker == 1:
+            row["subproc"] = steps_per_sec(SubprocVecEnv([RiftboundEnv] * num_envs), steps)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SharedMemoryVecEnv scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--envs-per-worker", type=int, default=1)
+    parser.add_argument("--steps", type=int, default=300, help="Vector steps per configuration")
+    args = parser.parse_args()
+
+    print(f"--- VecEnv Scaling ({os.cpu_count()} CPUs, {args.envs_per_worker} env/worker) ---")
+    print(f"{'workers':>7} {'envs':>6} {'dummy':>10} {'subproc':>10} {'shared':>10} {'speedup':>8}")
+    for row in run(args.workers, args.envs_per_worker, args.steps):
+        subproc = f"{row['subproc']:>10,.0f}" if "subproc" in row else f"{'-':>10}"
+        print(f"{row['workers']:>7} {row['envs']:>6} {row['dummy']:>10,.0f} {subproc} "
+              f"{row['shared']:>10,.0f} {row['shared'] / row['dummy']:>7.2f}x")
+    print("(env steps/s; speedup = shared / dummy)")
+
+
+if __name__ == "__main__":
+    main()
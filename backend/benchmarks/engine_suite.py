@@ -0,0 +1,227 @@
+"""
+PythonCoreEngine benchmark suite.
+
+Reports, from fixed seeds:
+- random-playout games/sec and actions/sec, through get_legal_actions /
+  apply_action and through rollout() (scalar and batched)
+- get_legal_actions / apply_action latency percentiles
+- bytes per live game (scalar and batched engines)
+- perft counts: leaves of the full legal-action tree to each depth from
+  seeded positions (finished games count as one leaf)
+
+Results are written as JSON. With --compare, the run is diffed against an
+earlier result file. Perft counts and the playout action count must match
+exactly; a difference means an engine change altered the rules, not just
+the speed.
+
+Usage (from backend/):
+    python benchmarks/engine_suite.py [--games 500] [--perft-depth 5] [--out results.json]
+    python benchmarks/engine_suite.py --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import PythonCoreEngine
+from batched_engine import BatchedCoreEngine
+from bench_search import seeded_position, walk_make_unmake
+from memory_report import scalar_bytes_per_game, batched_bytes_per_game
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Keys where a larger value is better; the rest (latencies, bytes) are lower-is-better
+HIGHER_IS_BETTER = ("games_per_sec", "actions_per_sec", "nodes_per_sec")
+# Counts fixed by the seeds: any difference is a rules change
+EXACT = ("playout.actions", "rollout.actions", ".nodes")
+
+
+def playout_throughput(games: int, seed: int = 0) -> dict:
+    """Uniform random playouts to the end of the game, timed as a whole."""
+    actions = 0
+    start = time.perf_counter()
+    for g in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed + g)
+        while not engine.state.winner:
+            legal = engine.get_legal_actions(engine.state.active_player)
+            engine.apply_action(legal[engine.policy_rng.random_index(len(legal))])
+            actions += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "games": games,
+        "actions": actions,
+        "games_per_sec": games / elapsed,
+        "actions_per_sec": actions / elapsed,
+    }
+
+
+def rollout_throughput(games: int, seed: int = 0) -> dict:
+    """The same playouts through PythonCoreEngine.rollout() and one BatchedCoreEngine.rollout()."""
+    actions = 0
+    start = time.perf_counter()
+    for g in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed + g)
+        actions += engine.rollout("random")[1]
+    elapsed = time.perf_counter() - start
+
+    batched = BatchedCoreEngine(games).reset(range(seed, seed + games))
+    start = time.perf_counter()
+    _, lengths = batched.rollout("random")
+    batched_elapsed = time.perf_counter() - start
+    return {
+        "actions": actions,
+        "games_per_sec": games / elapsed,
+        "actions_per_sec": actions / elapsed,
+        "batched_games_per_sec": games / batched_elapsed,
+        "batched_actions_per_sec": int(lengths.sum()) / batched_elapsed,
+    }
+
+
+def _percentiles(samples_ns: list) -> dict:
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e3
+    return {
+        "mean_us": float(samples.mean()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p90_us": float(np.percentile(samples, 90)),
+        "p99_us": float(np.percentile(samples, 99)),
+    }
+
+
+def call_latencies(games: int, seed: int = 0) -> dict:
+    """Per-call latency of get_legal_actions and apply_action over random playouts."""
+    legal_ns, apply_ns = [], []
+    clock = time.perf_counter_ns
+    for g in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed + g)
+        while not engine.state.winner:
+            t0 = clock()
+            legal = engine.get_legal_actions(engine.state.active_player)
+            t1 = clock()
+            action = legal[engine.policy_rng.random_index(len(legal))]
+            t2 = clock()
+            engine.apply_action(action)
+            t3 = clock()
+            legal_ns.append(t1 - t0)
+            apply_ns.append(t3 - t2)
+    return {
+        "get_legal_actions": _percentiles(legal_ns),
+        "apply_action": _percentiles(apply_ns),
+    }
+
+
+def perft(depths, positions: int) -> dict:
+    """Leaf counts per depth, summed over `positions` seeded positions."""
+    counts = {}
+    for depth in depths:
+        engines = [seeded_position(seed) for seed in range(positions)]
+        start = time.perf_counter()
+        nodes = sum(walk_make_unmake(engine, depth) for engine in engines)
+        elapsed = time.perf_counter() - start
+        counts[str(depth)] = {"nodes": nodes, "nodes_per_sec": nodes / elapsed if elapsed else 0.0}
+    return counts
+
+
+def run(games: int, perft_depth: int, positions: int, memory_games: int) -> dict:
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "config": {"games": games, "perft_depth": perft_depth, "positions": positions, "memory_games": memory_games},
+        "playout": playout_throughput(games),
+        "rollout": rollout_throughput(games),
+        "latency": call_latencies(max(1, games // 5)),
+        "memory": {
+            "scalar_bytes_per_game": scalar_bytes_per_game(memory_games, steps=30),
+            "batched_bytes_per_game": batched_bytes_per_game(memory_games),
+        },
+        "perft": perft(range(1, perft_depth + 1), positions),
+    }
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, previous: dict) -> bool:
+    """Prints metric deltas against an earlier run. Returns False if any seed-fixed count changed."""
+    now, before = _flatten(current), _flatten(previous)
+    if current.get("config") != previous.get("config"):
+        print(f"Note: configs differ ({previous.get('config')} -> {current.get('config')}), counts are not comparable")
+    counts_ok = True
+    print(f"{'metric':<42} {'before':>14} {'now':>14} {'change':>9}")
+    for name in sorted(now.keys() & before.keys()):
+        if name.startswith(("meta.", "config.")):
+            continue
+        old, new = before[name], now[name]
+        if name.endswith(EXACT):
+            status = "ok" if old == new else "MISMATCH"
+            counts_ok &= old == new
+            print(f"{name:<42} {old:>14,} {new:>14,} {status:>9}")
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        better = change > 0 if name.endswith(HIGHER_IS_BETTER) else change < 0
+        print(f"{name:<42} {old:>14,.1f} {new:>14,.1f} {change:>+8.1f}%{'' if abs(change) < 1 or better else ' (worse)'}")
+    return counts_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PythonCoreEngine benchmark suite")
+    parser.add_argument("--games", type=int, default=500, help="Random playouts for throughput")
+    parser.add_argument("--perft-depth", type=int, default=5)
+    parser.add_argument("--positions", type=int, default=20, help="Seeded positions for perft")
+    parser.add_argument("--memory-games", type=int, default=500)
+    parser.add_argument("--out", type=str, default=None, help="Result file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier result file to diff against")
+    args = parser.parse_args()
+
+    results = run(args.games, args.perft_depth, args.positions, args.memory_games)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("engine_%Y%m%d_%H%M%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+
+    playout = results["playout"]
+    print("--- Engine Benchmark ---")
+    print(f"  Playouts: {playout['games_per_sec']:,.0f} games/s | {playout['actions_per_sec']:,.0f} actions/s")
+    rollout = results["rollout"]
+    print(f"  rollout(): {rollout['games_per_sec']:,.0f} games/s | {rollout['actions_per_sec']:,.0f} actions/s"
+          f" (batched: {rollout['batched_games_per_sec']:,.0f} games/s)")
+    for call, stats in results["latency"].items():
+        print(f"  {call}: p50 {stats['p50_us']:.1f}us | p90 {stats['p90_us']:.1f}us | p99 {stats['p99_us']:.1f}us")
+    memory = results["memory"]
+    print(f"  Memory: {memory['scalar_bytes_per_game']:,.0f} B/game scalar | {memory['batched_bytes_per_game']:,.0f} B/game batched")
+    for depth, row in results["perft"].items():
+        print(f"  perft({depth}): {row['nodes']:,} nodes ({row['nodes_per_sec']:,.0f}/s)")
+    print(f"  Saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print()
+        if not compare(results, previous):
+            print("Seeded counts changed: the engine rules differ from the compared run.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Memory report: bytes per live game for the scalar and batched engines.
+
+The reference line rebuilds each measured GameState in the pre-slots model
+(__dict__ objects, one id string and keyword list per card), so the
+before/after comparison of the state model reruns from this script.
+
+Usage (from backend/):
+    python benchmarks/memory_report.py [--games 2000] [--steps 30]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from game_logic import PythonCoreEngine
+from batched_engine import BatchedCoreEngine
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Recursive sys.getsizeof over containers, __dict__ and __slots__ objects.
+
+    Objects already counted (shared or interned) are only charged once per `seen` set.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    else:
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(obj.__dict__, seen)
+        for cls in type(obj).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(obj, slot):
+                    size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class _DictCard:
+    """Card as it was before __slots__: string id and keyword list per card."""
+    def __init__(self, id, cost, attack=0, health=0, type="Unit", keywords=None):
+        self.id = id
+        self.cost = cost
+        self.attack = attack
+        self.health = health
+        self.type = type
+        self.keywords = keywords or []
+        self.is_barrier_active = "Barrier" in self.keywords
+
+
+class _DictPlayerState:
+    def __init__(self, id):
+        self.id = id
+        self.health = 20
+        self.max_health = 20
+        self.mana = 1
+        self.max_mana = 1
+        self.hand = []
+        self.field = []
+        self.graveyard = []
+
+
+class _DictGameState:
+    def __init__(self):
+        self.turn = 1
+        self.active_player = "player"
+        self.phase = "Main"
+        self.players = {"player": _DictPlayerState("player"), "opponent": _DictPlayerState("opponent")}
+        self.winner = None
+        self.log = []
+
+
+def _dict_state(state) -> _DictGameState:
+    """The same position in the pre-slots state model."""
+    old = _DictGameState()
+    old.turn, old.active_player, old.winner = state.turn, state.active_player, state.winner
+    for pid, player in state.players.items():
+        target = old.players[pid]
+        target.health, target.mana, target.max_mana = player.health, player.mana, player.max_mana
+        for zone in ("hand", "field"):
+            getattr(target, zone).extend(
+                # The old factory built a new id string for every dealt card
+                _DictCard(card.id.encode().decode(), card.cost, card.attack, card.health, card.type, card.keywords)
+                for card in getattr(player, zone)
+            )
+    return old
+
+
+def _play_random(engine: PythonCoreEngine, steps: int):
+    for _ in range(steps):
+        if engine.state.winner:
+            break
+        actions = engine.get_legal_actions(engine.state.active_player)
+        engine.apply_action(actions[engine.policy_rng.random_index(len(actions))])
+
+
+def mid_game_states(games: int, steps: int, seed: int = 0) -> list:
+    states = []
+    for g in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed + g)
+        _play_random(engine, steps)
+        states.append(engine.state)
+    return states
+
+
+def scalar_bytes_per_game(states: list) -> float:
+    """Average retained size of a GameState (shared small ints/strings charged once)."""
+    seen = set()
+    total = sum(deep_sizeof(s, seen) for s in states)
+    return total / len(states)
+
+
+def batched_bytes_per_game(games: int) -> float:
+    engine = BatchedCoreEngine(games).reset(range(games))
+    total = sum(v.nbytes for v in vars(engine).values() if hasattr(v, "nbytes") and v.ndim and len(v) == games)
+    return total / games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per live game")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=30, help="Random actions played before measuring")
+    args = parser.parse_args()
+
+    states = mid_game_states(args.games, args.steps)
+    reference = scalar_bytes_per_game([_dict_state(s) for s in states])
+    scalar = scalar_bytes_per_game(states)
+    batched = batched_bytes_per_game(args.games)
+    print("--- Memory per live game ---")
+    print(f"  __dict__ GameState (ref):   {reference:,.0f} bytes")
+    print(f"  PythonCoreEngine GameState: {scalar:,.0f} bytes ({reference / scalar:.2f}x smaller)")
+    print(f"  BatchedCoreEngine arrays:   {batched:,.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from embedding_store import _file_lock
+from game_logic import CARD_TABLE, Card, DECK_SIZE, KEYWORD_BITS, _MASK_KEYWORDS
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "src", "data", "riftbound-data.json")
+CATALOG_PATH = os.path.join(os.path.dirname(__file__), "data", "card_catalog.npz")
+
+# Bump when the compiled layout changes so stale files are rebuilt
+CATALOG_VERSION = 1
+
+CARD_TYPES = ["Unit", "Spell", "Gear", "Legend", "Battlefield", "Rune", "Champion", "Token"]
+TYPE_CODES = {name: code for code, name in enumerate(CARD_TYPES)}
+
+# Types that can be played to the field as units
+UNIT_TYPES = ("Unit", "Champion", "Token")
+
+_TAG_PATTERN = re.compile(r"\[([^\]]+)\]")
+
+
+def _parse_int(value) -> int:
+    """Costs come as strings ("4"), "" or None; Might as int or None."""
+    if value is None or value == "":
+        return 0
+    return int(value)
+
+
+def _card_keyword_mask(card: dict) -> int:
+    """Engine keywords named in the card's keyword list or as [Tag]s in its text."""
+    mask = 0
+    names = list(card.get("keywords") or []) + _TAG_PATTERN.findall(card.get("text") or "")
+    for name in names:
+        mask |= KEYWORD_BITS.get(name.strip(), 0)
+    return mask
+
+
+def compile_catalog(data_path: str = DATA_PATH, out_path: str = CATALOG_PATH) -> str:
+    """Compiles riftbound-data.json into columnar arrays saved as a .npz.
+
+    Riftbound units only have Might, so it is used for both attack and health.
+    Non-numeric costs (Legends, Battlefields, Runes) compile to 0.
+    """
+    with open(data_path, "r", encoding="utf-8-sig") as f:
+        cards = json.load(f)
+
+    ids = np.array([c["id"] for c in cards])
+    cost = np.array([_parse_int(c.get("cost")) for c in cards], dtype=np.int16)
+    might = np.array([_parse_int(c.get("attack")) for c in cards], dtype=np.int16)
+    types = np.array([TYPE_CODES.get(c.get("type"), TYPE_CODES["Unit"]) for c in cards], dtype=np.uint8)
+    keywords = np.array([_card_keyword_mask(c) for c in cards], dtype=np.uint8)
+
+    # Deck pool: units with a printed cost and at least 1 Might
+    unit_codes = [TYPE_CODES[t] for t in UNIT_TYPES]
+    has_cost = np.array([str(c.get("cost") or "").isdigit() for c in cards])
+    playable = np.flatnonzero(np.isin(types, unit_codes) & has_cost & (might > 0)).astype(np.int32)
+
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    # Per-writer temp file in the same directory, so the os.replace is atomic
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(out_path), suffix=".npz")
+    try:
+        with open(fd, "wb") as f:
+            np.savez(
+                f,
+                version=np.int32(CATALOG_VERSION),
+                ids=ids, cost=cost, attack=might, health=might.copy(),
+                type=types, keywords=keywords, playable=playable,
+            )
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return out_path
+
+
+def _is_stale(data_path: str, catalog_path: str) -> bool:
+    if not os.path.exists(catalog_path):
+        return True
+    return os.path.exists(data_path) and os.path.getmtime(data_path) > os.path.getmtime(catalog_path)
+
+
+def _compile_if_stale(data_path: str, catalog_path: str):
+    """One process compiles; the others wait on the lock and then find the catalog up to date."""
+    os.makedirs(os.path.dirname(os.path.abspath(catalog_path)), exist_ok=True)
+    with _file_lock(catalog_path):
+        if _is_stale(data_path, catalog_path):
+            compile_catalog(data_path, catalog_path)
+
+
+class CardCatalog:
+    """
+    The card pool as parallel arrays, one row per card: `cost`, `attack`,
+    `health`, `type` (code into CARD_TYPES) and `keywords` (KEYWORD_BITS mask).
+    `card_index` maps a row to its CARD_TABLE index and `row_of` an id to its row.
+    Decks are int32 arrays of rows; cards are only built when drawn.
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        if int(arrays["version"]) != CATALOG_VERSION:
+            raise ValueError(f"Card catalog version {int(arrays['version'])}, expected {CATALOG_VERSION}")
+        self.ids: List[str] = arrays["ids"].tolist()
+        self.cost = arrays["cost"].astype(np.int32)
+        self.attack = arrays["attack"].astype(np.int32)
+        self.health = arrays["health"].astype(np.int32)
+        self.type = arrays["type"]
+        self.keywords = arrays["keywords"]
+        self.playable = arrays["playable"]
+        self.row_of: Dict[str, int] = {card_id: row for row, card_id in enumerate(self.ids)}
+        self.card_index = np.array([CARD_TABLE.intern(card_id) for card_id in self.ids], dtype=np.int32)
+
+    @classmethod
+    def load(cls, path: str = CATALOG_PATH, data_path: str = DATA_PATH, auto_compile: bool = True) -> "CardCatalog":
+        """Loads the compiled catalog, (re)compiling it first when missing or older than the JSON."""
+        if auto_compile and _is_stale(data_path, path):
+            _compile_if_stale(data_path, path)
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(dict(arrays))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def sample_deck(self, next_random: Callable[[], float], size: int = DECK_SIZE) -> np.ndarray:
+        """Draws `size` rows from the playable pool (with replacement) using `next_random` in [0, 1)."""
+        pool = self.playable
+        n = len(pool)
+        return np.array([pool[int(next_random() * n)] for _ in range(size)], dtype=np.int32)
+
+    def make_card(self, row: int) -> Card:
+        row = int(row)
+        return Card(
+            id=self.ids[row],
+            cost=int(self.cost[row]),
+            attack=int(self.attack[row]),
+            health=int(self.health[row]),
+            type=CARD_TYPES[self.type[row]],
+            keywords=list(_MASK_KEYWORDS[self.keywords[row]])
+        )
+
+    def type_name(self, card_id: str) -> str:
+        return CARD_TYPES[self.type[self.row_of[card_id]]]
+
+
+_catalog: Optional[CardCatalog] = None
+
+
+def get_catalog() -> CardCatalog:
+    """Process-wide catalog, loaded once."""
+    global _catalog
+    if _catalog is None:
+        _catalog = CardCatalog.load()
+    return _catalog
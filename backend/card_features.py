@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Características de Cartas Compartidas por los Codificadores
+============================================================
+
+CardRows resuelve una sola vez cada card_index de CARD_TABLE a sus filas
+de embedding: la exacta (la que usa SpatialVectorizer) y la resuelta, que
+para variantes como "OGN-066-p" cae en la primera carta con el mismo id
+base (la que usa SemanticVectorizer). Una misma instancia se comparte
+entre los vectorizadores de un entorno.
+
+CardFeatures reúne las cartas de un GameState en listas por jugador
+(filas de embedding de mano y campo, y carta, ataque, vida y keywords de
+cada unidad del campo).
+RiftboundEnv construye una por observación y se la pasa a los modos
+spatial y semantic; cada jugador se extrae la primera vez que se pide,
+así que una observación spatial sin cambios no extrae nada.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import numpy as np
+
+from game_logic import CARD_TABLE
+
+
+class CardRows:
+    """Filas de embedding por id y por card_index para un mapping {id: vector}.
+
+    Args:
+        embeddings: {id: vector} o EmbeddingStore; las filas siguen su orden de iteración
+    """
+
+    def __init__(self, embeddings):
+        self.row_of = {}
+        self._prefix_rows = {}
+        for row, card_id in enumerate(embeddings):
+            self.row_of[card_id] = row
+            # Gana el primer id (en orden del cache), como el antiguo recorrido con startswith()
+            for end in range(len(card_id) + 1):
+                self._prefix_rows.setdefault(card_id[:end], row)
+        # Por card_index: fila exacta (array, para indexar matrices) y fila resuelta (-1 = sin embedding)
+        self.exact = np.zeros(0, dtype=np.int64)
+        self.resolved = []
+
+    def resolve(self, card_id: str) -> int:
+        """Fila exacta, si no la del primer id con su id base (SET-NUM), si no -1."""
+        row = self.row_of.get(card_id)
+        if row is None:
+            base_id = "-".join(card_id.split("-")[:2])
+            row = self._prefix_rows.get(base_id, -1)
+        return row
+
+    def tables(self) -> tuple:
+        """(exact, resolved) indexados por card_index; crecen con CARD_TABLE."""
+        known = len(self.resolved)
+        if known < len(CARD_TABLE):
+            new_ids = CARD_TABLE.ids[known:]
+            self.exact = np.concatenate([self.exact, [self.row_of.get(card_id, -1) for card_id in new_ids]]).astype(np.int64)
+            self.resolved.extend(self.resolve(card_id) for card_id in new_ids)
+        return self.exact, self.resolved
+
+
+class PlayerCards:
+    """Cartas de un jugador: filas resueltas de mano y campo, y (card_index, ataque, vida, keyword_mask) por unidad.
+
+    Listas de Python: son pocas cartas y cada codificador indexa o memoriza
+    por unidad, así que crear arrays por paso costaría más que leerlas.
+    """
+    __slots__ = ("hand_rows", "field_rows", "field_units")
+
+    def __init__(self, player, card_rows: CardRows):
+        _, resolved = card_rows.tables()
+        self.hand_rows = [resolved[card.card_index] for card in player.hand]
+        self.field_units = [(card.card_index, card.attack, card.health, card.keyword_mask) for card in player.field]
+        self.field_rows = [resolved[unit[0]] for unit in self.field_units]
+
+
+class CardFeatures:
+    """Cartas de un GameState para una observación, extraídas una vez y compartidas por los codificadores.
+
+    Args:
+        state: GameState de PythonCoreEngine (no debe cambiar mientras se usa)
+        card_rows: CardRows de los vectorizadores que la van a leer
+    """
+    __slots__ = ("state", "card_rows", "_players")
+
+    def __init__(self, state, card_rows: CardRows):
+        self.state = state
+        self.card_rows = card_rows
+        self._players = {}
+
+    def player(self, player_id: str) -> PlayerCards:
+        cards = self._players.get(player_id)
+        if cards is None:
+            cards = self._players[player_id] = PlayerCards(self.state.players[player_id], self.card_rows)
+        return cards
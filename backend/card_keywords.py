@@ -0,0 +1,23 @@
+"""Keyword bitmasks shared by the engines, the combat rules and the vectorizers."""
+from typing import List
+
+# Keyword bit order is also the order of the spatial keyword channels (24-31)
+KEYWORDS = [
+    "Quick Attack", "Barrier", "Overwhelm", "Elusive",
+    "Lifesteal", "Tough", "Challenger", "Fearsome",
+]
+KEYWORD_BITS = {kw: 1 << i for i, kw in enumerate(KEYWORDS)}
+
+
+def keyword_mask(keywords: List[str]) -> int:
+    """Packs a keyword list into the KEYWORD_BITS bitmask (unknown keywords are ignored)."""
+    mask = 0
+    for kw in keywords:
+        mask |= KEYWORD_BITS.get(kw, 0)
+    return mask
+
+
+# Keyword lists decoded once per mask value
+_MASK_KEYWORDS = [
+    tuple(kw for kw in KEYWORDS if mask & KEYWORD_BITS[kw]) for mask in range(1 << len(KEYWORDS))
+]
@@ -0,0 +1,152 @@
+"""
+Unit combat rules shared by PythonCoreEngine and BatchedCoreEngine.
+
+Follows .docs/knowledge-base/ENGINE_INTERNAL_RULES.md:
+- Attacker and blocker strike simultaneously; with Quick Attack the attacker
+  strikes first and a blocker it kills does not strike back.
+- Tough reduces every strike the unit receives by 1.
+- An active Barrier absorbs one strike and pops.
+- Overwhelm sends the excess (strike - blocker health) to the defending
+  player, even when a Barrier absorbed the strike; an unshielded blocker
+  ends at 0 health.
+
+Outcomes are returned as damage dealt, never as final health, so they do not
+depend on the attacker's health. That keeps the lookup table to
+(attacker attack, blocker attack, blocker health, keyword flags).
+"""
+from typing import Tuple
+
+import numpy as np
+
+from card_keywords import KEYWORD_BITS
+
+_QUICK_ATTACK = KEYWORD_BITS["Quick Attack"]
+_OVERWHELM = KEYWORD_BITS["Overwhelm"]
+_TOUGH = KEYWORD_BITS["Tough"]
+
+# Stats 0..TABLE_STAT_MAX are served by the lookup table, larger ones by the kernel
+TABLE_STAT_MAX = 11
+_S = TABLE_STAT_MAX + 1
+_NUM_FLAGS = 1 << 6
+
+# Packed outcome layout: 8 bits per damage value, then the two barrier pops
+_DMG_BITS = 8
+_DMG_MASK = (1 << _DMG_BITS) - 1
+_POP_ATTACKER = 1 << 24
+_POP_BLOCKER = 1 << 25
+
+
+def resolve_combat(a_atk, a_kw, a_barrier, b_atk, b_hp, b_kw, b_barrier):
+    """
+    Resolves any number of attacker/blocker pairs at once (arrays broadcast).
+
+    Args:
+        a_atk, b_atk: attack of the attacker / blocker.
+        b_hp: current health of the blocker.
+        a_kw, b_kw: KEYWORD_BITS masks.
+        a_barrier, b_barrier: whether each unit's Barrier is still active.
+
+    Returns:
+        (damage to attacker, damage to blocker, damage to the defending player,
+        attacker barrier after, blocker barrier after)
+    """
+    a_atk = np.asarray(a_atk, dtype=np.int32)
+    b_atk = np.asarray(b_atk, dtype=np.int32)
+    b_hp = np.asarray(b_hp, dtype=np.int32)
+    a_kw = np.asarray(a_kw)
+    b_kw = np.asarray(b_kw)
+    a_barrier = np.asarray(a_barrier, dtype=bool)
+    b_barrier = np.asarray(b_barrier, dtype=bool)
+
+    # Attacker strikes
+    strike = np.maximum(a_atk - ((b_kw & _TOUGH) != 0), 0)
+    dmg_to_blocker = np.where(b_barrier, 0, strike)
+
+    # Blocker strikes back, unless a Quick Attack already killed it
+    quick = (a_kw & _QUICK_ATTACK) != 0
+    strikes_back = ~quick | (dmg_to_blocker < b_hp)
+    counter = np.maximum(b_atk - ((a_kw & _TOUGH) != 0), 0)
+    dmg_to_attacker = np.where(strikes_back & ~a_barrier, counter, 0)
+
+    # Overwhelm: the excess goes through, Barrier or not
+    excess = np.where((a_kw & _OVERWHELM) != 0, np.maximum(strike - b_hp, 0), 0)
+    dmg_to_blocker = np.where(excess > 0, np.where(b_barrier, 0, b_hp), dmg_to_blocker)
+
+    return (
+        dmg_to_attacker,
+        dmg_to_blocker,
+        excess,
+        a_barrier & ~strikes_back,
+        np.zeros_like(b_barrier),
+    )
+
+
+def _flag_offsets(bits_to_flags) -> list:
+    """Per keyword mask, the mask's table flags pre-multiplied into a flat index offset."""
+    offsets = []
+    for mask in range(256):
+        flags = sum(flag for bit, flag in bits_to_flags if mask & bit)
+        offsets.append(flags * _S ** 3)
+    return offsets
+
+
+# Table flags: attacker QA/Overwhelm/Tough/barrier = bits 0-3, blocker Tough/barrier = bits 4-5
+_ATTACKER_OFFSET = _flag_offsets(((_QUICK_ATTACK, 1), (_OVERWHELM, 2), (_TOUGH, 4)))
+_BLOCKER_OFFSET = _flag_offsets(((_TOUGH, 16),))
+_ATTACKER_BARRIER_OFFSET = 8 * _S ** 3
+_BLOCKER_BARRIER_OFFSET = 32 * _S ** 3
+
+
+def _build_table() -> np.ndarray:
+    flags, a_atk, b_atk, b_hp = np.meshgrid(
+        np.arange(_NUM_FLAGS), np.arange(_S), np.arange(_S), np.arange(_S), indexing="ij"
+    )
+    a_kw = (flags & 1) * _QUICK_ATTACK | ((flags >> 1) & 1) * _OVERWHELM | ((flags >> 2) & 1) * _TOUGH
+    b_kw = ((flags >> 4) & 1) * _TOUGH
+    dmg_a, dmg_b, nexus, a_barrier, _ = resolve_combat(
+        a_atk, a_kw, (flags >> 3) & 1, b_atk, b_hp, b_kw, (flags >> 5) & 1
+    )
+    b_pops = ((flags >> 5) & 1).astype(bool)
+    a_pops = ((flags >> 3) & 1).astype(bool) & ~a_barrier
+    packed = (
+        dmg_a
+        | dmg_b << _DMG_BITS
+        | nexus << (2 * _DMG_BITS)
+        | a_pops * _POP_ATTACKER
+        | b_pops * _POP_BLOCKER
+    )
+    return packed.astype(np.int32).ravel()
+
+
+_table = None
+
+
+def combat_table() -> list:
+    """Packed outcomes for every (flags, attacker attack, blocker attack, blocker health), built on first use.
+
+    Kept as a list: single-pair lookups are plain Python and indexing a list
+    is several times cheaper than indexing a NumPy array.
+    """
+    global _table
+    if _table is None:
+        _table = _build_table().tolist()
+    return _table
+
+
+def combat_outcome(a_atk: int, a_kw: int, a_barrier: bool, b_atk: int, b_hp: int, b_kw: int, b_barrier: bool) -> Tuple[int, int, int, bool, bool]:
+    """Single-pair resolve_combat: O(1) table lookup for small stats, kernel fallback otherwise."""
+    if 0 <= a_atk < _S and 0 <= b_atk < _S and 0 <= b_hp < _S:
+        index = _ATTACKER_OFFSET[a_kw] + _BLOCKER_OFFSET[b_kw] + (a_atk * _S + b_atk) * _S + b_hp
+        if a_barrier:
+            index += _ATTACKER_BARRIER_OFFSET
+        if b_barrier:
+            index += _BLOCKER_BARRIER_OFFSET
+        packed = (_table or combat_table())[index]
+        return (
+            packed & _DMG_MASK,
+            (packed >> _DMG_BITS) & _DMG_MASK,
+            (packed >> 2 * _DMG_BITS) & _DMG_MASK,
+            a_barrier and not packed & _POP_ATTACKER,
+            False,
+        )
+    return tuple(v.item() for v in resolve_combat(a_atk, a_kw, a_barrier, b_atk, b_hp, b_kw, b_barrier))
@@ -0,0 +1,251 @@
+"""
+Binary card embedding store: a float32 .npy matrix (one row per card) plus a
+JSON list of card ids, opened with np.load(mmap_mode="r").
+
+A store is a directory of immutable versions (matrix.npy, ids.json and
+optionally hashes.json) and a `current` file naming the live one. Writers
+build a new version and then swap `current` with one os.replace, so a reader
+always gets an ids list and a matrix from the same version.
+
+Every process maps the same file, so N env workers share one page-cached copy
+instead of each parsing the JSON cache into Python floats. get_store() keeps
+one EmbeddingStore per path for the whole process and converts
+card_embeddings_cache.json on first use (and again whenever the JSON is newer);
+the conversion runs under a lock file, so workers that start together convert
+it once and the rest wait for it.
+
+hashes.json maps each id to a hash of the text it was embedded from
+(text_hash()), so CardEmbeddingService only re-embeds new or changed cards.
+A mapped matrix is never replaced, only pruned once it is neither current nor
+previous and older than PRUNE_AGE; on Windows, pruning skips a version that
+another process still maps.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+EMBEDDINGS_DIR = os.path.join(os.path.dirname(__file__), "embeddings")
+JSON_PATH = os.path.join(EMBEDDINGS_DIR, "card_embeddings_cache.json")
+STORE_PATH = os.path.join(EMBEDDINGS_DIR, "card_embeddings_store")
+
+CURRENT_FILE = "current"
+MATRIX_FILE = "matrix.npy"
+IDS_FILE = "ids.json"
+HASHES_FILE = "hashes.json"
+
+# all-MiniLM-L6-v2; only used for the shape of an empty store
+DEFAULT_DIM = 384
+# Versions younger than this are never pruned (another writer may still be filling them)
+PRUNE_AGE = 60.0
+
+
+def current_version(store_path: str) -> Optional[str]:
+    """Directory of the live version of a store, or None when nothing was written yet."""
+    try:
+        with open(os.path.join(store_path, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return os.path.join(store_path, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_json(path: str, value):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(value, f)
+
+
+def _switch_current(store_path: str, version: str):
+    """Points `current` at `version` through a uniquely named temp file (per process) and one os.replace."""
+    fd, temp_path = tempfile.mkstemp(dir=store_path, prefix=CURRENT_FILE + ".", suffix=".tmp")
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(version))
+        os.replace(temp_path, os.path.join(store_path, CURRENT_FILE))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _prune_versions(store_path: str, previous: Optional[str]):
+    """Deletes old versions, keeping the current one and `previous` (a reader may still be opening it)."""
+    keep = {os.path.basename(v) for v in (current_version(store_path), previous) if v is not None}
+    cutoff = time.time() - PRUNE_AGE
+    for name in os.listdir(store_path):
+        path = os.path.join(store_path, name)
+        if name.startswith("v-") and name not in keep and os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Cross-process lock on `path` + ".lock".
+
+    An OS lock (flock, or msvcrt.locking on Windows) on a lock file that is
+    never deleted: taking it is atomic, and the kernel releases it if the
+    holder dies, so there is no stale lock to break.
+    """
+    with open(path + ".lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after ~10 s of retries
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def save_matrix(ids: List[str], matrix: np.ndarray, store_path: str = STORE_PATH,
+                text_hashes: Optional[Dict[str, str]] = None) -> str:
+    """Writes a [len(ids), dim] matrix as a new version of the store and makes it the current one."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if len(ids) != len(matrix):
+        raise ValueError(f"{len(ids)} ids for {len(matrix)} embedding rows")
+
+    os.makedirs(store_path, exist_ok=True)
+    previous = current_version(store_path)
+    # Unique per writer, so concurrent writers never share a version
+    version = tempfile.mkdtemp(dir=store_path, prefix="v-")
+    try:
+        np.save(os.path.join(version, MATRIX_FILE), matrix)
+        _write_json(os.path.join(version, IDS_FILE), list(ids))
+        if text_hashes is not None:
+            _write_json(os.path.join(version, HASHES_FILE), text_hashes)
+        _switch_current(store_path, version)
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+    _prune_versions(store_path, previous)
+    _stores.pop(os.path.abspath(store_path), None)
+    return store_path
+
+
+def save_store(embeddings: Mapping, store_path: str = STORE_PATH,
+               text_hashes: Optional[Dict[str, str]] = None) -> str:
+    """Writes {card_id: vector} as a store (see save_matrix)."""
+    ids = [str(card_id) for card_id in embeddings]
+    if ids:
+        matrix = np.asarray([np.asarray(v, dtype=np.float32) for v in embeddings.values()], dtype=np.float32)
+    else:
+        matrix = np.zeros((0, DEFAULT_DIM), dtype=np.float32)
+    return save_matrix(ids, matrix, store_path, text_hashes)
+
+
+def convert_json(json_path: str = JSON_PATH, store_path: str = STORE_PATH) -> str:
+    """Converts the JSON embedding cache into a store (without text hashes, so the next generation re-embeds all)."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        return save_store(json.load(f), store_path, text_hashes={})
+
+
+def _is_stale(json_path: str, store_path: str) -> bool:
+    current = os.path.join(store_path, CURRENT_FILE)
+    if not os.path.exists(current):
+        return True
+    return os.path.exists(json_path) and os.path.getmtime(json_path) > os.path.getmtime(current)
+
+
+def _convert_if_stale(json_path: str, store_path: str):
+    """One process converts; the others wait on the lock and then find the store up to date."""
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    with _file_lock(store_path):
+        if _is_stale(json_path, store_path):
+            convert_json(json_path, store_path)
+
+
+class EmbeddingStore(Mapping):
+    """
+    Read-only {card_id: float32 vector} mapping over a [num_cards, dim] matrix.
+    `row_of` maps an id to its row; values are views into `matrix`, so a store
+    can be passed wherever the old JSON dict was.
+    """
+    def __init__(self, ids: List[str], matrix: np.ndarray, text_hashes: Optional[Dict[str, str]] = None):
+        if len(ids) != len(matrix):
+            raise ValueError(f"Embedding store has {len(ids)} ids for {len(matrix)} rows")
+        self.ids = ids
+        self.matrix = matrix
+        self.row_of: Dict[str, int] = {card_id: row for row, card_id in enumerate(ids)}
+        # id -> text_hash() of the embedded text; empty for stores converted from JSON
+        self.text_hashes: Dict[str, str] = text_hashes or {}
+
+    @classmethod
+    def load(cls, path: str = STORE_PATH, json_path: str = JSON_PATH, auto_convert: bool = True,
+             mmap: bool = True) -> "EmbeddingStore":
+        """Maps the store, converting the JSON cache first when the store is missing or older.
+
+        Without either the store is empty. mmap=False reads the matrix into
+        memory instead of mapping it.
+        """
+        if auto_convert and os.path.exists(json_path) and _is_stale(json_path, path):
+            _convert_if_stale(json_path, path)
+        version = current_version(path)
+        if version is None:
+            return cls([], np.zeros((0, DEFAULT_DIM), dtype=np.float32))
+        with open(os.path.join(version, IDS_FILE), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        text_hashes = None
+        if os.path.exists(os.path.join(version, HASHES_FILE)):
+            with open(os.path.join(version, HASHES_FILE), "r", encoding="utf-8") as f:
+                text_hashes = json.load(f)
+        return cls(ids, np.load(os.path.join(version, MATRIX_FILE), mmap_mode="r" if mmap else None), text_hashes)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def __getitem__(self, card_id: str) -> np.ndarray:
+        return self.matrix[self.row_of[card_id]]
+
+    def __contains__(self, card_id) -> bool:
+        return card_id in self.row_of
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+_stores: Dict[str, EmbeddingStore] = {}
+
+
+def get_store(path: str = STORE_PATH, json_path: str = JSON_PATH) -> EmbeddingStore:
+    """Process-wide store for `path`, loaded once."""
+    key = os.path.abspath(path)
+    store: Optional[EmbeddingStore] = _stores.get(key)
+    if store is None:
+        store = _stores[key] = EmbeddingStore.load(path, json_path)
+    return store
+
+
+def reload_store(path: str = STORE_PATH, json_path: str = JSON_PATH) -> EmbeddingStore:
+    """Drops the cached store for `path` and loads it again (save_matrix already drops it)."""
+    _stores.pop(os.path.abspath(path), None)
+    return get_store(path, json_path)
@@ -10,17 +10,31 @@ Los embeddings semánticos permiten que el modelo de IA generalice a cartas
 nuevas sin re-entrenamiento, ya que cartas con efectos similares tendrán
 vectores cercanos en el espacio latente.
 
-El cache se almacena en formato JSON para acceso rápido desde otros scripts.
+El cache se almacena como EmbeddingStore binario (matriz float32 .npy +
+índice de ids, ver backend/embedding_store.py) que los vectorizadores abren
+con mmap y comparten en todo el proceso. Junto a cada embedding se guarda
+el hash de su texto: en cada parche solo se codifican (por lotes) las
+cartas nuevas o con texto cambiado.
 
 Author: Manuel Ramirez Ballesteros
 Email: ramiballes96@gmail.com
 Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
 """
 
+import argparse
 import json
 import os
+import sys
+import time
+
 from sentence_transformers import SentenceTransformer
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from embedding_store import STORE_PATH, EmbeddingStore, get_store, save_matrix, text_hash
+
 
 class CardEmbeddingService:
     """Servicio para generación y gestión de embeddings de cartas.
@@ -30,11 +44,8 @@ class CardEmbeddingService:
     """
     
     def __init__(self):
-        # Ruta del cache de embeddings
-        self.cache_path = os.path.join(
-            os.path.dirname(__file__), 
-            "card_embeddings_cache.json"
-        )
+        # Ruta del cache de embeddings (EmbeddingStore)
+        self.cache_path = STORE_PATH
         
         # Ruta del archivo de datos de cartas
         self.data_path = os.path.join(
@@ -52,11 +63,28 @@ class CardEmbeddingService:
             self._model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
         return self._model
     
-    def generate_embeddings(self) -> dict:
-        """Genera embeddings para todas las cartas y los guarda en cache.
+    @staticmethod
+    def describe(card: dict) -> str:
+        """Texto descriptivo de una carta: nombre, tipo y efecto."""
+        name = card.get("name", "")
+        card_type = card.get("type", "")
+        text = card.get("text", "")
+        return f"{name}. {card_type}. {text}".strip()
+    
+    def generate_embeddings(self, batch_size: int = 64, force: bool = False) -> dict:
+        """Genera embeddings para las cartas nuevas o modificadas y guarda el cache.
+        
+        Cada carta se identifica por el hash de su descripción: si coincide
+        con el guardado en el cache, se reutiliza su embedding. El resto se
+        codifica en lotes de `batch_size` y el cache se reescribe de forma
+        atómica (las cartas que ya no existen desaparecen).
+        
+        Args:
+            batch_size: Descripciones por llamada a model.encode
+            force: Recodificar todas las cartas aunque su texto no cambie
         
         Returns:
-            Diccionario {card_id: [embedding_384d]}
+            Estadísticas {"cards", "encoded", "reused", "removed", "seconds", "cards_per_sec"}
         """
         # Cargar datos de cartas
         if not os.path.exists(self.data_path):
@@ -68,43 +96,71 @@ class CardEmbeddingService:
         
         print(f"Procesando {len(cards)} cartas...")
         
-        embeddings = {}
+        # Descripción y hash de cada carta (la última aparición de un id manda, como en el dict original)
+        descriptions = {}
         for card in cards:
-            card_id = str(card.get("id", ""))
-            
-            # Construir texto descriptivo combinando nombre, tipo y efecto
-            name = card.get("name", "")
-            card_type = card.get("type", "")
-            text = card.get("text", "")
-            
-            description = f"{name}. {card_type}. {text}".strip()
-            
+            description = self.describe(card)
             if description:
-                # Generar embedding
-                vec = self.model.encode(description).tolist()
-                embeddings[card_id] = vec
+                descriptions[str(card.get("id", ""))] = description
+        ids = list(descriptions)
+        hashes = {card_id: text_hash(descriptions[card_id]) for card_id in ids}
+        
+        # Cache anterior (save_matrix escribe una versión nueva, esta no se toca)
+        previous = EmbeddingStore.load(self.cache_path)
+        pending = [
+            card_id for card_id in ids
+            if force or previous.text_hashes.get(card_id) != hashes[card_id] or card_id not in previous
+        ]
         
-        # Guardar cache
-        with open(self.cache_path, 'w', encoding='utf-8') as f:
-            json.dump(embeddings, f)
+        start = time.perf_counter()
+        encoded = np.zeros((0, previous.dim), dtype=np.float32)
+        if pending:
+            encoded = self.model.encode(
+                [descriptions[card_id] for card_id in pending],
+                batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            ).astype(np.float32)
+        elapsed = time.perf_counter() - start
         
+        matrix = np.empty((len(ids), encoded.shape[1] if pending else previous.dim), dtype=np.float32)
+        pending_row = {card_id: k for k, card_id in enumerate(pending)}
+        for row, card_id in enumerate(ids):
+            k = pending_row.get(card_id)
+            matrix[row] = encoded[k] if k is not None else previous[card_id]
+        
+        # Guardar cache (versión nueva, activada con un único os.replace)
+        save_matrix(ids, matrix, self.cache_path, text_hashes=hashes)
+        
+        stats = {
+            "cards": len(ids),
+            "encoded": len(pending),
+            "reused": len(ids) - len(pending),
+            "removed": sum(card_id not in hashes for card_id in previous),
+            "seconds": elapsed,
+            "cards_per_sec": len(pending) / elapsed if pending and elapsed > 0 else 0.0,
+        }
         print(f"Cache guardado en {self.cache_path}")
-        print(f"Total embeddings: {len(embeddings)}")
+        print(f"Total embeddings: {stats['cards']} | Codificados: {stats['encoded']} | "
+              f"Reutilizados: {stats['reused']} | Eliminados: {stats['removed']}")
+        if pending:
+            print(f"Codificación: {elapsed:.2f} s ({stats['cards_per_sec']:.0f} cartas/s, lotes de {batch_size})")
         
-        return embeddings
+        return stats
     
-    def load_cache(self) -> dict:
+    def load_cache(self):
         """Carga embeddings desde el cache existente.
         
         Returns:
-            Diccionario de embeddings o dict vacío si no existe cache
+            EmbeddingStore {card_id: vector float32} (vacío si no existe cache);
+            un JSON antiguo se convierte automáticamente la primera vez
         """
-        if os.path.exists(self.cache_path):
-            with open(self.cache_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return {}
+        return get_store(self.cache_path)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera los embeddings de cartas (solo las nuevas o modificadas)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--force", action="store_true", help="Recodificar todas las cartas")
+    args = parser.parse_args()
+    
     service = CardEmbeddingService()
-    service.generate_embeddings()
+    service.generate_embeddings(batch_size=args.batch_size, force=args.force)
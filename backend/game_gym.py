@@ -6,19 +6,45 @@ Entorno Gymnasium para Riftbound TCG
 Implementa la interfaz estándar de Gymnasium para permitir el entrenamiento
 de agentes de aprendizaje por refuerzo en el juego Riftbound.
 
-Espacio de observación:
-    Box([0,1], shape=(32, 9, 5)) - Tensor espacial generado por SpatialVectorizer
+Espacio de observación (parámetro obs_mode):
+    "spatial":  Box([0,1], shape=(32, 9, 5)) - SpatialVectorizer (por defecto)
+    "flat":     Box(shape=(256,)) - StateVectorizer
+    "semantic": Box(shape=(640,)) - SemanticVectorizer
+    Varios modos a la vez (lista o tupla): Dict {modo: observación}. Los
+    embeddings y la tabla card_index -> fila (CardRows) se cargan una vez
+    para spatial y semantic, que además leen en cada paso las mismas filas,
+    ataque, vida y keywords por carta (CardFeatures). Solo flat usa el
+    estado serializado.
 
 Espacio de acciones:
-    Discrete(128) - Índice de acción mapeado a acciones legales
+    Discrete(128) - Disposición fija del motor (game_logic):
+        0:      Terminar turno
+        1-10:   Jugar la carta del hueco k de la mano
+        11-55:  Atacar con la unidad del hueco k del campo
+        56-127: Relleno (nunca legal)
+    action_masks() devuelve la máscara de acciones legales para MaskablePPO.
+    Un índice ilegal (política sin máscara) se mapea como antes: índice
+    módulo número de acciones legales.
 
 Función de recompensa:
     +10: Victoria
     -10: Derrota
     +(health - 20) * 0.05: Recompensa intermedia basada en ventaja de vida
 
-El entorno incluye un "oponente interno" que juega acciones aleatorias
-para permitir partidas completas durante el entrenamiento.
+Estados y posiciones de inicio:
+    get_state() / set_state() guardan y restauran la partida exacta
+    (snapshot_pool.EnvState). Con `snapshot_pool`, reset() empieza desde una
+    posición del pool con probabilidad `pool_prob` (el resto, partida nueva);
+    reset(options={"state": estado}) empieza desde un estado concreto.
+
+Observación espacial incremental:
+    El motor emite eventos de cambio del campo y el modo spatial solo
+    recodifica las celdas afectadas (nada si la acción no cambió el campo).
+    verify_obs=True compara cada observación con la codificación completa.
+
+El entorno incluye un "oponente interno" para permitir partidas completas
+durante el entrenamiento. Por defecto juega acciones aleatorias; el
+parámetro `opponent` acepta cualquier política de opponents.py.
 
 Author: Manuel Ramirez Ballesteros
 Email: ramiballes96@gmail.com
@@ -28,49 +54,105 @@ Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
-from spatial_vectorizer import SpatialVectorizer
-from game_logic import PythonCoreEngine
+from card_features import CardFeatures
+from spatial_vectorizer import IncrementalSpatialEncoder, SpatialVectorizer
+from vectorizer import StateVectorizer
+from semantic_vectorizer import SemanticVectorizer
+from game_logic import PythonCoreEngine, NUM_ACTIONS
+from opponents import make_opponent
+from snapshot_pool import EnvState
+
+OBS_MODES = ("flat", "spatial", "semantic")
 
 
 class RiftboundEnv(gym.Env):
     """Entorno de Riftbound compatible con Gymnasium.
     
-    Integra el motor de juego (PythonCoreEngine) con el vectorizador espacial
-    para generar observaciones aptas para redes convolucionales.
+    Integra el motor de juego (PythonCoreEngine) con los vectorizadores
+    para generar observaciones espaciales (redes convolucionales), planas o
+    semánticas, según obs_mode.
     """
     
     metadata = {"render_modes": ["human"], "render_fps": 4}
 
-    def __init__(self, render_mode: str = None):
+    def __init__(self, render_mode: str = None, opponent=None, obs_mode="spatial",
+                 snapshot_pool=None, pool_prob: float = 1.0, verify_obs: bool = False):
         super().__init__()
         
         self.engine = PythonCoreEngine()
-        self.vectorizer = SpatialVectorizer(channels=32, height=9, width=5)
+        # Política del oponente interno: None/"random", "heuristic" o un Opponent
+        self.opponent = make_opponent(opponent)
+        # Posiciones de inicio opcionales (SnapshotPool) y probabilidad de usarlas en reset()
+        self.snapshot_pool = snapshot_pool
+        self.pool_prob = pool_prob
+        
+        self.obs_modes = (obs_mode,) if isinstance(obs_mode, str) else tuple(obs_mode)
+        unknown = set(self.obs_modes) - set(OBS_MODES)
+        if unknown or not self.obs_modes:
+            raise ValueError(f"obs_mode desconocido: {sorted(unknown)} (válidos: {OBS_MODES})")
+        
+        # Codificadores: cada uno solo si se pide; los embeddings se cargan una vez
+        self.vectorizer = None
+        self.flat_vectorizer = None
+        self.semantic_vectorizer = None
+        obs_spaces = {}
+        if "spatial" in self.obs_modes:
+            self.vectorizer = SpatialVectorizer(channels=32, height=9, width=5)
+            # Tensor persistente parcheado con los eventos del motor (verify_obs: comprobar cada paso)
+            self._spatial_encoder = IncrementalSpatialEncoder(self.vectorizer, "player", verify=verify_obs)
+            self._spatial_encoder.attach(self.engine)
+            obs_spaces["spatial"] = spaces.Box(low=0, high=1, shape=(32, 9, 5), dtype=np.float32)
+        if "flat" in self.obs_modes:
+            self.flat_vectorizer = StateVectorizer()
+            obs_spaces["flat"] = spaces.Box(
+                low=-np.inf, high=np.inf, shape=(self.flat_vectorizer.vector_dim,), dtype=np.float32
+            )
+        if "semantic" in self.obs_modes:
+            shared = self.vectorizer.embeddings if self.vectorizer is not None else None
+            rows = self.vectorizer.card_rows if self.vectorizer is not None else None
+            self.semantic_vectorizer = SemanticVectorizer(embeddings=shared, card_rows=rows)
+            obs_spaces["semantic"] = spaces.Box(
+                low=-np.inf, high=np.inf, shape=(self.semantic_vectorizer.total_dim,), dtype=np.float32
+            )
+        # Solo el modo flat lee el estado serializado
+        self._needs_serialized = "flat" in self.obs_modes
         
-        # Observaciones: tensor espacial normalizado
-        self.observation_space = spaces.Box(
-            low=0, high=1, shape=(32, 9, 5), dtype=np.float32
-        )
+        if len(self.obs_modes) == 1:
+            self.observation_space = obs_spaces[self.obs_modes[0]]
+        else:
+            self.observation_space = spaces.Dict({mode: obs_spaces[mode] for mode in self.obs_modes})
         
         # Acciones: índice discreto (mapeado a acciones legales en step())
         self.action_space = spaces.Discrete(128)
+        # Máscara reutilizada por action_masks(); el relleno queda siempre a False
+        self._action_mask = np.zeros(self.action_space.n, dtype=bool)
         
         self.render_mode = render_mode
 
     def reset(self, seed: int = None, options: dict = None) -> tuple:
         """Reinicia el juego a un estado inicial.
         
+        Args:
+            seed: Semilla de Gymnasium (de ella deriva la del motor)
+            options: {"state": EnvState} para empezar desde un estado concreto
+        
         Returns:
             observation: Tensor espacial del estado inicial
             info: Diccionario con acciones legales disponibles
         """
         super().reset(seed=seed)
-        state = self.engine.reset()
+        pool = self.snapshot_pool
+        if options and options.get("state") is not None:
+            options["state"].restore_into(self.engine)
+        elif pool is not None and len(pool) and self.np_random.random() < self.pool_prob:
+            pool.sample(self.np_random).restore_into(self.engine)
+        else:
+            # La semilla del motor (LCG StateSeed) deriva del generador de Gymnasium
+            if seed is None:
+                seed = int(self.np_random.integers(0, 2**32))
+            self.engine.reset(seed)
         
-        observation = self.vectorizer.vectorize(
-            self._serialize_state(state), 
-            player_id="player"
-        )
+        observation = self._observe(self.engine.state)
         
         info = {"legal_actions": self.engine.get_legal_actions("player")}
         return observation, info
@@ -89,22 +171,24 @@ class RiftboundEnv(gym.Env):
             info: Información adicional
         """
         # 1. Ejecutar acción del jugador
-        legal_actions = self.engine.get_legal_actions("player")
+        mask = self.engine.legal_mask("player")
+        action_idx = int(action_idx)
         
-        if legal_actions:
-            # Mapeo seguro: acción modulo número de acciones legales
-            action = legal_actions[action_idx % len(legal_actions)]
-            self.engine.apply_action(action)
+        if action_idx < NUM_ACTIONS and mask[action_idx]:
+            self.engine.apply_action_index(action_idx)
+        else:
+            legal = np.flatnonzero(mask)
+            if legal.size:
+                # Mapeo seguro: acción modulo número de acciones legales
+                self.engine.apply_action_index(int(legal[action_idx % legal.size]))
 
-        # 2. Simular turno del oponente (política aleatoria)
+        # 2. Simular turno del oponente con self.opponent (aleatorio por defecto,
+        #    "heuristic" o cualquier Opponent, p. ej. un CheckpointOpponent congelado)
         self._play_opponent_turn()
         
         # 3. Generar observación desde la perspectiva del jugador
         raw_state = self.engine.state
-        observation = self.vectorizer.vectorize(
-            self._serialize_state(raw_state), 
-            player_id="player"
-        )
+        observation = self._observe(raw_state)
         
         # 4. Calcular recompensa
         reward = 0.0
@@ -125,8 +209,56 @@ class RiftboundEnv(gym.Env):
         
         return observation, reward, terminated, truncated, info
 
+    def get_state(self) -> EnvState:
+        """Estado exacto de la partida (motor + LCG del oponente), para set_state() o un SnapshotPool."""
+        return EnvState.capture(self.engine)
+
+    def set_state(self, state: EnvState) -> np.ndarray:
+        """Restaura un estado de get_state(); la partida sigue igual que desde el original.
+        
+        Returns:
+            observation: Observación del estado restaurado
+        """
+        state.restore_into(self.engine)
+        return self._observe(self.engine.state)
+
+    def _observe(self, state):
+        """Observación del jugador en cada modo pedido.
+        
+        Los modos spatial y semantic comparten una CardFeatures del paso: las
+        filas de embedding, ataque, vida y keywords de cada carta se extraen
+        una vez por jugador, y solo si algún modo las lee (spatial solo
+        recodifica las celdas que cambiaron desde la observación anterior).
+        El modo flat serializa el estado.
+        """
+        serialized = self._serialize_state(state) if self._needs_serialized else None
+        features = None
+        if self.vectorizer is not None or self.semantic_vectorizer is not None:
+            rows = (self.vectorizer or self.semantic_vectorizer).card_rows
+            features = CardFeatures(state, rows)
+        observation = {}
+        for mode in self.obs_modes:
+            if mode == "spatial":
+                observation[mode] = self._spatial_encoder.observe(features).copy()
+            elif mode == "flat":
+                observation[mode] = self.flat_vectorizer.vectorize(serialized)
+            else:
+                observation[mode] = self.semantic_vectorizer.vectorize_features(features, player_id="player")
+        if len(self.obs_modes) == 1:
+            return observation[self.obs_modes[0]]
+        return observation
+
+    def action_masks(self) -> np.ndarray:
+        """Máscara de acciones legales del jugador sobre Discrete(128).
+        
+        Devuelve siempre el mismo array (sin reservar memoria); se sobrescribe
+        en la siguiente llamada.
+        """
+        self._action_mask[:NUM_ACTIONS] = self.engine.legal_mask("player")
+        return self._action_mask
+
     def _play_opponent_turn(self) -> None:
-        """Simula el turno del oponente con política aleatoria.
+        """Simula el turno del oponente con la política de self.opponent.
         
         El bucle continúa hasta que:
         - El juego termine (hay ganador)
@@ -140,28 +272,31 @@ class RiftboundEnv(gym.Env):
                 break
             
             acting_pid = self.engine.state.active_player
-            actions = self.engine.get_legal_actions(acting_pid)
+            mask = self.engine.legal_mask(acting_pid)
             
-            if not actions:
+            if not mask.any():
                 break
             
-            # Política aleatoria simple
-            action = actions[np.random.randint(0, len(actions))]
-            self.engine.apply_action(action)
+            self.engine.apply_action_index(self.opponent.act(self.engine, acting_pid, mask))
             steps += 1
 
     def _serialize_state(self, state) -> dict:
-        """Convierte el estado interno a diccionario para el vectorizador."""
+        """Convierte el estado interno a diccionario (formato del dict path del vectorizador).
+        
+        Lo usa el modo flat; spatial y semantic leen el estado vía CardFeatures.
+        """
         return {
             "turn": state.turn,
             "activePlayer": state.active_player,
             "phase": state.phase,
+            "seed": state.seed,
+            "zobrist": state.zobrist,
             "players": {
                 pid: {
                     "health": p.health,
                     "mana": p.mana,
                     "hand": [
-                        {"id": c.id, "attack": c.attack, "health": c.health} 
+                        {"id": c.id, "cost": c.cost, "attack": c.attack, "health": c.health} 
                         for c in p.hand
                     ],
                     "field": [
@@ -1,26 +1,152 @@
 import copy
 import random
-from typing import List, Dict, Optional, Any
+from operator import attrgetter
+from typing import List, Dict, Optional, Any, Callable, Tuple, Union
+
+import numpy as np
+
+from card_keywords import KEYWORDS, KEYWORD_BITS, keyword_mask, _MASK_KEYWORDS
+from combat import combat_outcome
 
 # Types
 PlayerId = str
 Phase = str
 
+PLAYER_IDS = ("player", "opponent")
+
+# Zone capacities. The field matches the 9x5 board of the spatial observation.
+MAX_HAND_SIZE = 10
+MAX_FIELD_SIZE = 45
+DECK_SIZE = 40
+
+# Fixed-width action layout: end turn | play hand slot k | attack with field slot k
+ACTION_END_TURN = 0
+ACTION_PLAY_OFFSET = 1
+ACTION_ATTACK_OFFSET = ACTION_PLAY_OFFSET + MAX_HAND_SIZE
+NUM_ACTIONS = ACTION_ATTACK_OFFSET + MAX_FIELD_SIZE
+
+NO_SLOT = 0xFF
+
+# Field change events, recorded as (kind, player_id, field slot) while engine.events is a list.
+# The slot is the unit's position right after the change.
+EVENT_UNIT_PLACED = 0      # a unit now occupies the slot (played, or moved in by a swap-remove)
+EVENT_UNIT_REMOVED = 1     # the slot is now empty (the field shrank to `slot` units)
+EVENT_STATS_CHANGED = 2    # the unit's attack or health changed
+EVENT_KEYWORD_POPPED = 3   # a one-shot keyword was consumed (Barrier)
+EVENT_STATE_REPLACED = 4   # reset/restore/undo: the whole state changed (player_id None, slot -1)
+
+# StateSeed LCG, identical to CoreEngine.nextRandom (a = 1664525, c = 1013904223, m = 2^32)
+LCG_A = 1664525
+LCG_C = 1013904223
+LCG_M = 4294967296
+# Offsets the policy stream from the rules stream of the same game seed
+POLICY_SEED_SALT = 0x9E3779B9
+
+
+class LCG:
+    """Standalone StateSeed LCG, for randomness that is not part of the game state."""
+    __slots__ = ("seed",)
+
+    def __init__(self, seed: int):
+        self.seed = seed % LCG_M
+
+    def next_random(self) -> float:
+        self.seed = (LCG_A * self.seed + LCG_C) % LCG_M
+        return self.seed / LCG_M
+
+    def randint(self, low: int, high: int) -> int:
+        """Integer in [low, high], inclusive like random.randint."""
+        return low + int(self.next_random() * (high - low + 1))
+
+    def random_index(self, n: int) -> int:
+        """Uniform index in [0, n)."""
+        return int(self.next_random() * n)
+
+
+class CardTable:
+    """
+    Interns card ids into dense integer indexes shared by every game.
+    Cards store the index, so identity checks are int compares and each id string lives once.
+    """
+    __slots__ = ("ids", "_index")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, card_id: str) -> int:
+        idx = self._index.get(card_id)
+        if idx is None:
+            idx = len(self.ids)
+            self._index[card_id] = idx
+            self.ids.append(card_id)
+        return idx
+
+    def index_of(self, card_id: str) -> int:
+        """Index of an already interned id, or -1."""
+        return self._index.get(card_id, -1)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+# Shared by every engine instance in the process
+CARD_TABLE = CardTable()
+
+
 class Card:
     """
     Represents a game card with its core stats and keyword mechanics.
     Mirror of the frontend RuntimeCard structure for parity in RL environments.
+
+    `card_index` is the interned id in CARD_TABLE, `handle` the per-game instance
+    handle issued by the engine, and keywords are packed into `keyword_mask`.
     """
-    def __init__(self, id: str, cost: int, attack: int = 0, health: int = 0, type: str = "Unit", keywords: List[str] = None):
-        self.id = id
+    __slots__ = ("handle", "card_index", "cost", "attack", "health", "type", "keyword_mask", "is_barrier_active")
+
+    def __init__(self, id: str, cost: int, attack: int = 0, health: int = 0, type: str = "Unit", keywords: List[str] = None, handle: int = -1):
+        self.handle = handle
+        self.card_index = CARD_TABLE.intern(id)
         self.cost = cost
         self.attack = attack
         self.health = health
         self.type = type
-        self.keywords = keywords or []
-        self.is_barrier_active = "Barrier" in self.keywords
+        self.keyword_mask = keyword_mask(keywords or [])
+        self.is_barrier_active = bool(self.keyword_mask & KEYWORD_BITS["Barrier"])
+
+    @property
+    def id(self) -> str:
+        return CARD_TABLE.ids[self.card_index]
+
+    @property
+    def keywords(self) -> List[str]:
+        return list(_MASK_KEYWORDS[self.keyword_mask])
+
+    def copy(self) -> "Card":
+        """Independent copy with the same handle, without re-interning or re-parsing keywords."""
+        card = Card.__new__(Card)
+        for name in Card.__slots__:
+            setattr(card, name, getattr(self, name))
+        return card
+
 
 class PlayerState:
+    """
+    `hand_slots` / `field_slots` map a card handle to its position in hand / field
+    (NO_SLOT when absent), giving O(1) lookups for actions.
+
+    `hand_costs` mirrors the hand's costs and `legal_mask` caches this player's
+    legal actions in the fixed-width layout; the engine keeps both up to date
+    as cards move and mana changes, and rebuilds the mask when `mask_dirty`.
+
+    With a card catalog, `deck` holds the catalog rows of the player's deck
+    (never mutated during a game) and `deck_pos` the next row to draw.
+    """
+    __slots__ = (
+        "id", "health", "max_health", "mana", "max_mana", "hand", "field", "graveyard",
+        "hand_slots", "field_slots", "hand_costs", "legal_mask", "mask_dirty", "deck", "deck_pos",
+    )
+
     def __init__(self, id: PlayerId):
         self.id = id
         self.health = 20
@@ -30,9 +156,135 @@ class PlayerState:
         self.hand: List[Card] = []
         self.field: List[Card] = []
         self.graveyard: List[Card] = []
+        self.hand_slots = bytearray()
+        self.field_slots = bytearray()
+        self.hand_costs = np.zeros(MAX_HAND_SIZE, dtype=np.int32)
+        self.legal_mask = np.zeros(NUM_ACTIONS, dtype=bool)
+        self.mask_dirty = True
+        self.deck: Optional[np.ndarray] = None
+        self.deck_pos = 0
+
+    def hand_slot(self, handle: int) -> int:
+        """Position of the card in hand, or -1."""
+        if 0 <= handle < len(self.hand_slots) and self.hand_slots[handle] != NO_SLOT:
+            return self.hand_slots[handle]
+        return -1
+
+    def field_slot(self, handle: int) -> int:
+        """Position of the unit on the field, or -1."""
+        if 0 <= handle < len(self.field_slots) and self.field_slots[handle] != NO_SLOT:
+            return self.field_slots[handle]
+        return -1
+
+    def reindex(self):
+        """Rebuilds the handle indexes and hand costs from the zone lists; the legal mask goes dirty."""
+        self.hand_slots = bytearray()
+        self.field_slots = bytearray()
+        for slots, zone in ((self.hand_slots, self.hand), (self.field_slots, self.field)):
+            for pos, card in enumerate(zone):
+                _set_slot(slots, card.handle, pos)
+        self.hand_costs[:len(self.hand)] = [c.cost for c in self.hand]
+        self.mask_dirty = True
+
+
+def _set_slot(slots: bytearray, handle: int, pos: int):
+    if handle >= len(slots):
+        slots.extend(b"\xff" * (handle + 1 - len(slots)))
+    slots[handle] = pos
+
+
+# Zobrist hashing: the position hash is the sum (mod 2^64) of one key per
+# component: the header (turn, active player, winner), each player's
+# (health, mana, max mana) and each card in a hand or on a field. A component
+# key XORs one random 64-bit value per field from small fixed tables (values
+# are taken mod 256, card indexes get a table that grows with CARD_TABLE), so
+# no key is ever stored. Summing instead of XOR-ing components keeps duplicate
+# cards from cancelling out. Handles, the seed and graveyards are not hashed,
+# so equal positions reached by different games share a key.
+ZOBRIST_MASK = (1 << 64) - 1
+_PLAYER_INDEX = {pid: p for p, pid in enumerate(PLAYER_IDS)}
+_Z_HEADER, _Z_PLAYER, _Z_CARD = 1, 2, 3
+_ZONE_HAND, _ZONE_FIELD = 0, 1
+_ZOBRIST_FOLD = 0x100000001B3
+_Z_VALUES = 256
+
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & ZOBRIST_MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & ZOBRIST_MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & ZOBRIST_MASK
+    return x ^ (x >> 31)
+
+
+def _zobrist_table(salt: int, size: int = _Z_VALUES, start: int = 0) -> List[int]:
+    """Random keys start..size-1 of table `salt`, the same in every process."""
+    return [_splitmix64((salt * _ZOBRIST_FOLD + i) & ZOBRIST_MASK) for i in range(start, size)]
+
+
+_ZT_TURN, _ZT_ACTIVE, _ZT_WINNER = _zobrist_table(1), _zobrist_table(2, 2), _zobrist_table(3, 3)
+# Player and card tables are per owner, so no two components share a table
+_ZT_HEALTH = [_zobrist_table(10 + p) for p in range(2)]
+_ZT_MANA = [_zobrist_table(12 + p) for p in range(2)]
+_ZT_MAX_MANA = [_zobrist_table(14 + p) for p in range(2)]
+_ZT_SLOT = _zobrist_table(20, 4)  # owner * 2 + zone
+_ZT_COST, _ZT_ATTACK, _ZT_HEALTH_CARD = _zobrist_table(21), _zobrist_table(22), _zobrist_table(23)
+_ZT_BARRIER = _zobrist_table(24, 2)
+_ZT_CARD_SALT = 25
+_ZT_CARD: List[int] = []
+
+
+def _zobrist_key(fields: tuple) -> int:
+    """Key of one component, from its _header_fields / _player_fields / _card_fields tuple."""
+    kind = fields[0]
+    if kind == _Z_CARD:
+        _, owner, zone, card_index, cost, attack, health, barrier = fields
+        if card_index >= len(_ZT_CARD):
+            _ZT_CARD.extend(_zobrist_table(_ZT_CARD_SALT, card_index + _Z_VALUES, len(_ZT_CARD)))
+        return (_ZT_SLOT[owner * 2 + zone] ^ _ZT_CARD[card_index] ^ _ZT_COST[cost & 255]
+                ^ _ZT_ATTACK[attack & 255] ^ _ZT_HEALTH_CARD[health & 255] ^ _ZT_BARRIER[barrier])
+    if kind == _Z_PLAYER:
+        _, owner, health, mana, max_mana = fields
+        return _ZT_HEALTH[owner][health & 255] ^ _ZT_MANA[owner][mana & 255] ^ _ZT_MAX_MANA[owner][max_mana & 255]
+    _, turn, active, winner = fields
+    return _ZT_TURN[turn & 255] ^ _ZT_ACTIVE[active] ^ _ZT_WINNER[winner + 1]
+
+
+def _header_fields(state: "GameState") -> tuple:
+    winner = _PLAYER_INDEX[state.winner] if state.winner else -1
+    return (_Z_HEADER, state.turn, _PLAYER_INDEX[state.active_player], winner)
+
+
+def _player_fields(player: "PlayerState") -> tuple:
+    return (_Z_PLAYER, _PLAYER_INDEX[player.id], player.health, player.mana, player.max_mana)
+
+
+def _card_fields(player: "PlayerState", zone: int, card: Card) -> tuple:
+    return (
+        _Z_CARD, _PLAYER_INDEX[player.id], zone, card.card_index,
+        card.cost, card.attack, card.health, card.is_barrier_active
+    )
+
+
+def zobrist_hash(state: "GameState") -> int:
+    """Full recomputation of the position hash the engine keeps in `state.zobrist`."""
+    h = _zobrist_key(_header_fields(state))
+    for player in state.players.values():
+        h += _zobrist_key(_player_fields(player))
+        for zone, cards in ((_ZONE_HAND, player.hand), (_ZONE_FIELD, player.field)):
+            for card in cards:
+                h += _zobrist_key(_card_fields(player, zone, card))
+    return h & ZOBRIST_MASK
+
 
 class GameState:
-    def __init__(self):
+    """
+    `zobrist` is a 64-bit position hash kept up to date by the engine on every
+    action (see zobrist_hash), usable as a transposition or dedup key.
+    """
+    __slots__ = ("turn", "active_player", "phase", "players", "winner", "log", "next_handle", "seed", "zobrist")
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed % LCG_M
         self.turn = 1
         self.active_player = "player"
         self.phase = "Main"
@@ -42,144 +294,554 @@ class GameState:
         }
         self.winner: Optional[str] = None
         self.log: List[str] = []
+        self.next_handle = 0
+        self.zobrist = zobrist_hash(self)
+
+
+# Scalar fields captured by undo records and snapshots
+_STATE_FIELDS = ("turn", "active_player", "phase", "winner", "next_handle", "seed", "zobrist")
+_PLAYER_FIELDS = ("health", "max_health", "mana", "max_mana", "deck_pos")
+_get_state_fields = attrgetter(*_STATE_FIELDS)
+_get_player_fields = attrgetter(*_PLAYER_FIELDS)
+
+
+def _capture_header(state: GameState) -> tuple:
+    return (
+        _get_state_fields(state),
+        tuple(_get_player_fields(state.players[pid]) for pid in PLAYER_IDS),
+    )
+
+
+def _restore_header(state: GameState, header: tuple):
+    state_values, player_values = header
+    for name, value in zip(_STATE_FIELDS, state_values):
+        setattr(state, name, value)
+    for pid, values in zip(PLAYER_IDS, player_values):
+        player = state.players[pid]
+        for name, value in zip(_PLAYER_FIELDS, values):
+            setattr(player, name, value)
+
+
+class UndoRecord:
+    """
+    Everything an action can change, captured before it runs: scalar fields,
+    shallow copies of the zone lists it touches (with their owner, whose
+    handle indexes are rebuilt on undo), the lengths of append-only zones
+    (graveyards) and the combat-mutable values (health, barrier) of the units
+    that may fight.
+    """
+    __slots__ = ("header", "zones", "appends", "units", "log_len")
+
+    def __init__(self, header: tuple, zones: tuple, appends: tuple, units: tuple, log_len: int):
+        self.header = header
+        self.zones = zones
+        self.appends = appends
+        self.units = units
+        self.log_len = log_len
+
+
+class Snapshot:
+    """
+    Immutable copy of a GameState for search. Card objects are shared with the
+    live state (only health and barrier ever change, and those are stored here),
+    so taking a snapshot copies references, not cards. Decks are shared too
+    (never mutated during a game).
+    """
+    __slots__ = ("header", "zones", "log")
+
+    def __init__(self, header: tuple, zones: tuple, log: tuple):
+        self.header = header
+        self.zones = zones
+        self.log = log
+
+
+def _unit_values(zone: List[Card]) -> tuple:
+    return tuple((c.health, c.is_barrier_active) for c in zone)
+
 
 class PythonCoreEngine:
-    def __init__(self):
-        self.state = GameState()
-        # Seed logic would go here
+    """
+    Game rules draw from the StateSeed LCG stored in `state.seed`, so a game is
+    fully determined by its starting seed and action list (see replay()).
+    Action sampling (opponents, rollouts) uses `policy_rng`, a second LCG seeded
+    from the same game seed, so it never shifts the rules stream.
+
+    Without a catalog, cards are random mocks. With a CardCatalog (see
+    card_catalog.py), each player gets a deck of `deck_size` real cards sampled
+    from the rules stream at reset and draws from it in order.
+
+    Setting `events` to a list makes the engine append an EVENT_* tuple for
+    every field change, so observers (see spatial_vectorizer.IncrementalSpatialEncoder)
+    can patch instead of re-reading the whole board. It is None by default and
+    costs nothing then; the consumer clears the list.
+    """
+    def __init__(self, seed: Optional[int] = None, catalog=None, deck_size: int = DECK_SIZE):
+        if seed is None:
+            seed = random.getrandbits(32)  # Default random seed
+        self.catalog = catalog
+        self.deck_size = deck_size
+        self.state = GameState(seed)
+        self.policy_rng = LCG(seed ^ POLICY_SEED_SALT)
+        self.events: Optional[List[tuple]] = None
 
-    def reset(self):
-        self.state = GameState()
-        # Deal initial hands (Mock)
-        for pid in ["player", "opponent"]:
+    def reset(self, seed: Optional[int] = None):
+        """Starts a new game. Without a seed, the next one is drawn from policy_rng."""
+        if seed is None:
+            seed = self.policy_rng.randint(0, LCG_M - 1)
+        self.state = GameState(seed)
+        self.policy_rng = LCG(seed ^ POLICY_SEED_SALT)
+        self._emit(EVENT_STATE_REPLACED, None, -1)
+        if self.catalog is not None:
+            for pid in PLAYER_IDS:
+                self.state.players[pid].deck = self.catalog.sample_deck(self._next_random, self.deck_size)
+        # Deal initial hands
+        for pid in PLAYER_IDS:
             for _ in range(4):
-                self.state.players[pid].hand.append(self._create_mock_card())
+                self._draw_card(self.state.players[pid])
         return self.state
 
+    @classmethod
+    def replay(cls, seed: int, actions: List[Dict[str, Any]], catalog=None) -> "PythonCoreEngine":
+        """Re-simulates a game from its starting seed and action list."""
+        engine = cls(catalog=catalog)
+        engine.reset(seed)
+        for action in actions:
+            engine.apply_action(action)
+        return engine
+
+    def _next_random(self) -> float:
+        # Linear Congruential Generator (LCG) over state.seed, as CoreEngine.nextRandom
+        self.state.seed = (LCG_A * self.state.seed + LCG_C) % LCG_M
+        return self.state.seed / LCG_M
+
+    def _randint(self, low: int, high: int) -> int:
+        return low + int(self._next_random() * (high - low + 1))
+
+    def snapshot(self) -> Snapshot:
+        """Captures the current state for a later restore(). Much cheaper than copy.deepcopy."""
+        state = self.state
+        zones = []
+        for pid in PLAYER_IDS:
+            player = state.players[pid]
+            hand, field = tuple(player.hand), tuple(player.field)
+            # Graveyard cards are never mutated again, so references are enough
+            zones.append((hand, _unit_values(hand), field, _unit_values(field), tuple(player.graveyard), player.deck))
+        return Snapshot(_capture_header(state), tuple(zones), tuple(state.log))
+
+    def restore(self, snap: Snapshot, copy_cards: bool = False):
+        """Puts the engine back in the exact state captured by snapshot().
+
+        By default the captured hand/field Card objects are reused and their
+        health/barrier reset, which is right for rolling back this engine.
+        With copy_cards=True they are left untouched and fresh copies are
+        restored instead, for snapshots whose cards may still be live in
+        another engine.
+        """
+        state = self.state
+        _restore_header(state, snap.header)
+        for pid, (hand, hand_values, field, field_values, graveyard, deck) in zip(PLAYER_IDS, snap.zones):
+            player = state.players[pid]
+            for zone, cards, values in ((player.hand, hand, hand_values), (player.field, field, field_values)):
+                if copy_cards:
+                    cards = [card.copy() for card in cards]
+                zone[:] = cards
+                for card, (health, barrier) in zip(cards, values):
+                    card.health = health
+                    card.is_barrier_active = barrier
+            player.graveyard[:] = graveyard
+            player.deck = deck
+            player.reindex()
+        state.log[:] = snap.log
+        self._emit(EVENT_STATE_REPLACED, None, -1)
+
+    def undo(self, record: UndoRecord):
+        """Reverts the action that produced `record` (make/unmake; records must be undone LIFO)."""
+        state = self.state
+        _restore_header(state, record.header)
+        for _, zone, cards in record.zones:
+            zone[:] = cards
+        for zone, length in record.appends:
+            del zone[length:]
+        for card, health, barrier in record.units:
+            card.health = health
+            card.is_barrier_active = barrier
+        del state.log[record.log_len:]
+        for owner in {owner for owner, _, _ in record.zones}:
+            owner.reindex()
+        self._emit(EVENT_STATE_REPLACED, None, -1)
+
+    def _emit(self, kind: int, player_id: Optional[str], slot: int):
+        if self.events is not None:
+            self.events.append((kind, player_id, slot))
+
+    def _make_undo_record(self, action_type: str) -> UndoRecord:
+        state = self.state
+        player = state.players[state.active_player]
+        opponent = state.players["opponent" if state.active_player == "player" else "player"]
+
+        units = ()
+        appends = ()
+        if action_type == "END_TURN":
+            zones = ((opponent, opponent.hand),)
+        elif action_type == "PLAY_CARD":
+            zones = ((player, player.hand), (player, player.field))
+        elif action_type == "ATTACK":
+            zones = ((player, player.field), (opponent, opponent.field))
+            appends = ((player.graveyard, len(player.graveyard)), (opponent.graveyard, len(opponent.graveyard)))
+            units = tuple((c, c.health, c.is_barrier_active) for _, zone in zones for c in zone)
+        else:
+            zones = ()
+        return UndoRecord(
+            _capture_header(state),
+            tuple((owner, zone, tuple(zone)) for owner, zone in zones),
+            appends,
+            units,
+            len(state.log)
+        )
+
+    def _rehash(self, old: tuple, new: tuple):
+        """Swaps one component of state.zobrist: `old` fields out, `new` fields in."""
+        state = self.state
+        state.zobrist = (state.zobrist - _zobrist_key(old) + _zobrist_key(new)) & ZOBRIST_MASK
+
+    def _add_to_hand(self, player: PlayerState, card: Card):
+        card.handle = self.state.next_handle
+        self.state.next_handle += 1
+        self.state.zobrist = (self.state.zobrist + _zobrist_key(_card_fields(player, _ZONE_HAND, card))) & ZOBRIST_MASK
+        _set_slot(player.hand_slots, card.handle, len(player.hand))
+        player.hand_costs[len(player.hand)] = card.cost
+        player.hand.append(card)
+
+    def _draw_card(self, player: PlayerState):
+        """Draws the next deck card into hand (nothing once the deck is empty), or a mock card without a catalog."""
+        if self.catalog is None:
+            self._add_to_hand(player, self._create_mock_card())
+        elif player.deck_pos < len(player.deck):
+            self._add_to_hand(player, self.catalog.make_card(player.deck[player.deck_pos]))
+            player.deck_pos += 1
+
     def _create_mock_card(self) -> Card:
         # Simple mock factory
         return Card(
-            id=f"card_{random.randint(1000,9999)}",
-            cost=random.randint(1, 8),
-            attack=random.randint(1, 8),
-            health=random.randint(1, 8)
+            id=f"card_{self._randint(1000, 9999)}",
+            cost=self._randint(1, 8),
+            attack=self._randint(1, 8),
+            health=self._randint(1, 8)
         )
 
-    def get_legal_actions(self, player_id: str) -> List[Dict[str, Any]]:
-        if self.state.winner:
-            return []
-        
-        if self.state.active_player != player_id:
-            return []
+    def legal_mask(self, player_id: str) -> np.ndarray:
+        """Legal actions of `player_id` as a bool mask over the fixed-width action layout.
 
-        actions = []
+        Returns the engine's cached array (no allocation); treat it as read-only,
+        it changes in place as the game advances.
+        """
         player = self.state.players[player_id]
+        if player.mask_dirty:
+            self._rebuild_mask(player)
+        return player.legal_mask
 
-        # End Turn
-        actions.append({"type": "END_TURN"})
+    def invalidate_legal_masks(self):
+        """Call after editing the state outside the engine."""
+        for player in self.state.players.values():
+            player.mask_dirty = True
 
+    def _rebuild_mask(self, player: PlayerState):
+        mask = player.legal_mask
+        mask.fill(False)
+        player.mask_dirty = False
+        if self.state.winner or self.state.active_player != player.id:
+            return
+        # End Turn
+        mask[ACTION_END_TURN] = True
         # Play Card
-        for card in player.hand:
-            if card.cost <= player.mana:
-                actions.append({"type": "PLAY_CARD", "card_id": card.id})
-
+        self._update_play_bits(player)
         # Attack (Simple Rule: All units can attack face)
-        for card in player.field:
-            actions.append({"type": "ATTACK", "card_id": card.id})
+        mask[ACTION_ATTACK_OFFSET:ACTION_ATTACK_OFFSET + len(player.field)] = True
+
+    def _update_play_bits(self, player: PlayerState):
+        """Recomputes the play segment after a hand, mana or field-size change."""
+        plays = player.legal_mask[ACTION_PLAY_OFFSET:ACTION_ATTACK_OFFSET]
+        n = len(player.hand)
+        if len(player.field) >= MAX_FIELD_SIZE:
+            plays.fill(False)
+        else:
+            np.less_equal(player.hand_costs[:n], player.mana, out=plays[:n])
+            plays[n:] = False
+
+    def get_legal_actions(self, player_id: str) -> List[Dict[str, Any]]:
+        """Dict view over legal_mask(): END_TURN, then plays in hand order, then attacks in field order."""
+        mask = self.legal_mask(player_id)
+        return [self.decode_action(int(i), player_id) for i in np.flatnonzero(mask)]
 
-        return actions
+    def decode_action(self, index: int, player_id: Optional[str] = None) -> Dict[str, Any]:
+        """Turns a layout index into the dict action (player_id defaults to the active player)."""
+        player = self.state.players[player_id or self.state.active_player]
+        if index == ACTION_END_TURN:
+            return {"type": "END_TURN"}
+        if index < ACTION_ATTACK_OFFSET:
+            card = player.hand[index - ACTION_PLAY_OFFSET]
+            return {"type": "PLAY_CARD", "card_id": card.id, "handle": card.handle}
+        card = player.field[index - ACTION_ATTACK_OFFSET]
+        return {"type": "ATTACK", "card_id": card.id, "handle": card.handle}
 
-    def apply_action(self, action: Dict[str, Any]):
+    def encode_action(self, action: Dict[str, Any]) -> int:
+        """Layout index of a dict action for the active player, or -1 if its card is not found."""
+        player = self.state.players[self.state.active_player]
+        if action["type"] == "END_TURN":
+            return ACTION_END_TURN
+        if action["type"] == "PLAY_CARD":
+            slot = self._find_slot(player.hand, player.hand_slot, action)
+            return ACTION_PLAY_OFFSET + slot if slot != -1 else -1
+        if action["type"] == "ATTACK":
+            slot = self._find_slot(player.field, player.field_slot, action)
+            return ACTION_ATTACK_OFFSET + slot if slot != -1 else -1
+        return -1
+
+    def apply_action(self, action: Dict[str, Any], undoable: bool = False) -> Optional[UndoRecord]:
+        """Applies an action. With undoable=True returns an UndoRecord for undo()."""
         if self.state.winner:
-            return
+            return None
+
+        record = self._make_undo_record(action["type"]) if undoable else None
+        player = self.state.players[self.state.active_player]
 
-        p_id = self.state.active_player
-        player = self.state.players[p_id]
-        
         if action["type"] == "END_TURN":
             self._handle_end_turn()
-        
+
         elif action["type"] == "PLAY_CARD":
-            card_id = action["card_id"]
-            # Find card
-            card_idx = next((i for i, c in enumerate(player.hand) if c.id == card_id), -1)
+            card_idx = self._find_slot(player.hand, player.hand_slot, action)
             if card_idx != -1:
-                card = player.hand[card_idx]
-                player.mana -= card.cost
-                player.hand.pop(card_idx)
-                player.field.append(card)
+                self._play_card(player, card_idx)
 
         elif action["type"] == "ATTACK":
-            card_id = action["card_id"]
-            card = next((c for c in player.field if c.id == card_id), None)
-            if card:
-                opponent_id = "opponent" if p_id == "player" else "player"
-                opponent = self.state.players[opponent_id]
-                
-                # Check for blockers (simple mock: first unit can block)
-                blocker = next((c for c in opponent.field if c.health > 0), None)
-                
-                if blocker:
-                    # Resolve combat with keywords
-                    self._resolve_unit_combat(card, blocker, opponent_id)
+            card_idx = self._find_slot(player.field, player.field_slot, action)
+            if card_idx != -1:
+                self._attack(player, card_idx)
+
+        return record
+
+    def apply_action_index(self, index: int, undoable: bool = False) -> Optional[UndoRecord]:
+        """apply_action for a layout index, without building the dict."""
+        if self.state.winner:
+            return None
+
+        player = self.state.players[self.state.active_player]
+        if index == ACTION_END_TURN:
+            record = self._make_undo_record("END_TURN") if undoable else None
+            self._handle_end_turn()
+        elif ACTION_PLAY_OFFSET <= index < ACTION_ATTACK_OFFSET:
+            record = self._make_undo_record("PLAY_CARD") if undoable else None
+            if index - ACTION_PLAY_OFFSET < len(player.hand):
+                self._play_card(player, index - ACTION_PLAY_OFFSET)
+        elif ACTION_ATTACK_OFFSET <= index < NUM_ACTIONS:
+            record = self._make_undo_record("ATTACK") if undoable else None
+            if index - ACTION_ATTACK_OFFSET < len(player.field):
+                self._attack(player, index - ACTION_ATTACK_OFFSET)
+        else:
+            record = None
+        return record
+
+    def rollout(self, policy: Union[str, Callable] = "random", max_steps: int = 1000) -> Tuple[Optional[str], int]:
+        """
+        Plays the current game forward until it ends or `max_steps` actions were applied.
+
+        Works on legal_mask() and layout indexes only, so no dicts or action
+        lists are built per step. The state is modified in place: take a
+        snapshot() first to keep the position.
+
+        Args:
+            policy: "random" (uniform over legal actions, drawn from policy_rng),
+                "greedy" (see _greedy_action) or a callable (engine, mask) -> action index.
+            max_steps: Cap on the number of actions played.
+
+        Returns:
+            (winner or None, number of actions played)
+        """
+        choose = ROLLOUT_POLICIES[policy] if isinstance(policy, str) else policy
+        state = self.state
+        steps = 0
+        while steps < max_steps and not state.winner:
+            self.apply_action_index(choose(self, self.legal_mask(state.active_player)))
+            steps += 1
+        return state.winner, steps
+
+    def _random_action(self, mask: np.ndarray) -> int:
+        """Uniform legal index; same draw as picking from get_legal_actions() with policy_rng."""
+        end = ACTION_ATTACK_OFFSET + len(self.state.players[self.state.active_player].field)
+        legal = 0
+        for i in range(end):
+            if mask[i]:
+                legal += 1
+        r = self.policy_rng.random_index(legal)
+        for i in range(end):
+            if mask[i]:
+                if r == 0:
+                    return i
+                r -= 1
+        return ACTION_END_TURN
+
+    def _greedy_action(self, mask: np.ndarray) -> int:
+        """Plays the most expensive affordable card, else attacks with the strongest unit, else ends the turn."""
+        player = self.state.players[self.state.active_player]
+        best, best_value = ACTION_END_TURN, -1
+        for k, card in enumerate(player.hand):
+            if card.cost > best_value and mask[ACTION_PLAY_OFFSET + k]:
+                best, best_value = ACTION_PLAY_OFFSET + k, card.cost
+        if best != ACTION_END_TURN:
+            return best
+        for k, unit in enumerate(player.field):
+            if unit.attack > best_value and mask[ACTION_ATTACK_OFFSET + k]:
+                best, best_value = ACTION_ATTACK_OFFSET + k, unit.attack
+        return best
+
+    def _play_card(self, player: PlayerState, card_idx: int):
+        if len(player.field) >= MAX_FIELD_SIZE:
+            return
+        card = player.hand[card_idx]
+        old_fields = _player_fields(player)
+        player.mana -= card.cost
+        self._rehash(old_fields, _player_fields(player))
+        self._rehash(_card_fields(player, _ZONE_HAND, card), _card_fields(player, _ZONE_FIELD, card))
+        player.hand.pop(card_idx)
+        player.hand_slots[card.handle] = NO_SLOT
+        for pos in range(card_idx, len(player.hand)):
+            player.hand_slots[player.hand[pos].handle] = pos
+        player.hand_costs[card_idx:len(player.hand)] = player.hand_costs[card_idx + 1:len(player.hand) + 1]
+        _set_slot(player.field_slots, card.handle, len(player.field))
+        player.field.append(card)
+        self._emit(EVENT_UNIT_PLACED, player.id, len(player.field) - 1)
+
+        if not player.mask_dirty:
+            player.legal_mask[ACTION_ATTACK_OFFSET + len(player.field) - 1] = True
+            self._update_play_bits(player)
+
+    def _attack(self, player: PlayerState, card_idx: int):
+        card = player.field[card_idx]
+        opponent_id = "opponent" if player.id == "player" else "player"
+        opponent = self.state.players[opponent_id]
+
+        # Check for blockers (simple mock: first unit can block).
+        # The sweep below keeps every unit on the field alive.
+        if opponent.field:
+            blocker = opponent.field[0]
+            units = ((player, card), (opponent, blocker))
+            old_fields = [_card_fields(owner, _ZONE_FIELD, unit) for owner, unit in units]
+            old_opponent = _player_fields(opponent)
+            # Resolve combat with keywords
+            self._resolve_unit_combat(card, blocker, opponent_id)
+            if self.events is not None:
+                for (owner, unit), slot, old in zip(units, (card_idx, 0), old_fields):
+                    self._emit_unit_changes(owner.id, slot, old, unit)
+            self._rehash(old_opponent, _player_fields(opponent))
+            self._sweep_dead_units(units)
+            # Units that died leave the hash with their pre-combat fields
+            z = self.state.zobrist
+            for (owner, unit), old in zip(units, old_fields):
+                z -= _zobrist_key(old)
+                if unit.health > 0:
+                    z += _zobrist_key(_card_fields(owner, _ZONE_FIELD, unit))
+            self.state.zobrist = z & ZOBRIST_MASK
+        else:
+            # Direct attack
+            old_fields = _player_fields(opponent)
+            opponent.health -= card.attack
+            self._rehash(old_fields, _player_fields(opponent))
+            if opponent.health <= 0:
+                old_fields = _header_fields(self.state)
+                self.state.winner = player.id
+                self._rehash(old_fields, _header_fields(self.state))
+                self.invalidate_legal_masks()
+
+    def _emit_unit_changes(self, player_id: str, slot: int, old_fields: tuple, unit: Card):
+        """Stat and keyword events for a unit, against its _card_fields() from before combat."""
+        if (old_fields[-3], old_fields[-2]) != (unit.attack, unit.health):
+            self._emit(EVENT_STATS_CHANGED, player_id, slot)
+        if old_fields[-1] and not unit.is_barrier_active:
+            self._emit(EVENT_KEYWORD_POPPED, player_id, slot)
+
+    def _sweep_dead_units(self, units):
+        """State-based action: units at 0 health or below go from the field to the graveyard."""
+        for owner, unit in units:
+            if unit.health <= 0:
+                self._remove_from_field(owner, owner.field_slots[unit.handle])
+                owner.graveyard.append(unit)
+
+    def _remove_from_field(self, player: PlayerState, slot: int):
+        """O(1) swap-remove: the last unit takes the freed slot."""
+        field = player.field
+        removed = field[slot]
+        last = field.pop()
+        if slot < len(field):
+            field[slot] = last
+            player.field_slots[last.handle] = slot
+        player.field_slots[removed.handle] = NO_SLOT
+        self._emit(EVENT_UNIT_REMOVED, player.id, len(field))
+        if slot < len(field):
+            self._emit(EVENT_UNIT_PLACED, player.id, slot)
+
+        if not player.mask_dirty:
+            player.legal_mask[ACTION_ATTACK_OFFSET + len(field)] = False
+            if len(field) == MAX_FIELD_SIZE - 1:
+                # Off turn the mask stays empty; the turn start rebuilds it
+                if player.id == self.state.active_player:
+                    self._update_play_bits(player)
                 else:
-                    # Direct attack
-                    opponent.health -= card.attack
-                    if opponent.health <= 0:
-                        self.state.winner = p_id
+                    player.mask_dirty = True
+        return removed
+
+    @staticmethod
+    def _find_slot(zone: List[Card], slot_of, action: Dict[str, Any]) -> int:
+        """Resolves an action's card to a zone position: O(1) by handle, else first card with that id."""
+        if "handle" in action:
+            return slot_of(action["handle"])
+        card_index = CARD_TABLE.index_of(action["card_id"])
+        return next((i for i, c in enumerate(zone) if c.card_index == card_index), -1)
 
     def _resolve_unit_combat(self, attacker: Card, blocker: Card, defender_id: str):
         """
         Resolves combat between units in the Python environment.
-        Implements Quick Attack, Barrier, and Overwhelm to ensure training parity.
+        Quick Attack, Barrier, Overwhelm and Tough come from combat.combat_outcome,
+        the same rules the batched engine applies.
         """
-        attacker_dmg = attacker.attack
-        blocker_dmg = blocker.attack
-
-        # Quick Attack Logic
-        if "Quick Attack" in attacker.keywords:
-            if not blocker.is_barrier_active:
-                blocker.health -= attacker_dmg
-            else:
-                blocker.is_barrier_active = False # Pop barrier
-            
-            # If blocker survives, it strikes back
-            if blocker.health > 0:
-                if not attacker.is_barrier_active:
-                    attacker.health -= blocker_dmg
-                else:
-                    attacker.is_barrier_active = False
-        else:
-            # Simultaneous strike
-            if not blocker.is_barrier_active:
-                blocker.health -= attacker_dmg
-            else:
-                blocker.is_barrier_active = False
-            
-            if not attacker.is_barrier_active:
-                attacker.health -= blocker_dmg
-            else:
-                attacker.is_barrier_active = False
-
-        # Overwhelm check
-        if "Overwhelm" in attacker.keywords and blocker.health < 0:
-            excess = abs(blocker.health)
+        dmg_to_attacker, dmg_to_blocker, excess, attacker_barrier, blocker_barrier = combat_outcome(
+            attacker.attack, attacker.keyword_mask, attacker.is_barrier_active,
+            blocker.attack, blocker.health, blocker.keyword_mask, blocker.is_barrier_active
+        )
+        attacker.health -= dmg_to_attacker
+        attacker.is_barrier_active = attacker_barrier
+        blocker.health -= dmg_to_blocker
+        blocker.is_barrier_active = blocker_barrier
+
+        # Overwhelm: excess damage carries over to the defending player
+        if excess:
             self.state.players[defender_id].health -= excess
-            blocker.health = 0
 
     def _handle_end_turn(self):
         # Switch Player
+        old_header = _header_fields(self.state)
+        self.state.players[self.state.active_player].mask_dirty = True
         self.state.active_player = "opponent" if self.state.active_player == "player" else "player"
         next_p = self.state.players[self.state.active_player]
         
         # Mana and Draw
         if self.state.active_player == "player":
              self.state.turn += 1
+        self._rehash(old_header, _header_fields(self.state))
         
         cap = min(10, self.state.turn)
+        old_fields = _player_fields(next_p)
         next_p.max_mana = cap
         next_p.mana = cap
+        self._rehash(old_fields, _player_fields(next_p))
         
         # Draw 1
-        if len(next_p.hand) < 10:
-            next_p.hand.append(self._create_mock_card())
+        if len(next_p.hand) < MAX_HAND_SIZE:
+            self._draw_card(next_p)
+        next_p.mask_dirty = True
+
+
+# Built-in rollout policies, by name
+ROLLOUT_POLICIES = {
+    "random": PythonCoreEngine._random_action,
+    "greedy": PythonCoreEngine._greedy_action,
+}
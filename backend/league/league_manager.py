@@ -3,6 +3,7 @@ import numpy as np
 import logging
 from game_gym import RiftboundEnv
 from models.muzero_nexus import MuZeroNexus
+from opponents import CheckpointOpponent, RandomOpponent
 
 class LeagueManager:
     """
@@ -23,32 +24,42 @@ class LeagueManager:
             print(f"LeagueManager Error: Could not load opponent. {e}")
             self.opponent = None # Fallback or fail
 
-    def get_opponent_action(self, obs):
+    def get_opponent_actions(self, obs_batch, masks=None):
         """
-        Queries the frozen opponent for an action given the current observation.
+        Batched query: one forward pass for a [B, 32, 9, 5] batch of observations.
+        With `masks` ([B, A] bool, legal actions), illegal actions are never chosen.
+        Returns (actions [B], values [B]).
         """
-        if self.opponent is None: return 0, 0.0
+        batch = len(obs_batch)
+        if self.opponent is None: return np.zeros(batch, dtype=np.int64), np.zeros(batch, dtype=np.float32)
 
         with torch.no_grad():
-            obs_t = torch.tensor(obs).unsqueeze(0).to(self.device)
-            # Representation
-            s0 = self.opponent.representation(obs_t)
-            # Prediction
-            p, v = self.opponent.prediction(s0)
-            
+            obs_t = torch.as_tensor(np.asarray(obs_batch, dtype=np.float32)).to(self.device)
+            p, v = self.opponent(obs_t)
+            if masks is not None:
+                masks_t = torch.as_tensor(np.asarray(masks, dtype=bool)).to(self.device)
+                p = p[:, :masks_t.shape[1]].masked_fill(~masks_t, float("-inf"))
             # Greedy action for strong opposition (or sample for diversity)
-            action_idx = torch.argmax(p[0]).item()
-            return action_idx, v.item()
+            return p.argmax(dim=1).cpu().numpy(), v[:, 0].cpu().numpy()
+
+    def get_opponent_action(self, obs):
+        """
+        Queries the frozen opponent for an action given the current observation.
+        """
+        actions, values = self.get_opponent_actions(np.asarray(obs)[None])
+        return int(actions[0]), float(values[0])
 
     def get_opponent_value(self, obs):
         """
         Returns the Value (V) estimate of the opponent for a given state.
         Used for Minimax Reward calculation.
         """
-        if self.opponent is None: return 0.0
+        return float(self.get_opponent_actions(np.asarray(obs)[None])[1][0])
 
-        with torch.no_grad():
-            obs_t = torch.tensor(obs).unsqueeze(0).to(self.device)
-            s0 = self.opponent.representation(obs_t)
-            _, v = self.opponent.prediction(s0)
-            return v.item()
+    def as_opponent(self):
+        """
+        The fixed opponent as an env opponent (opponents.py), batched across
+        every game of a RiftboundVectorEnv. Random play if it failed to load.
+        """
+        if self.opponent is None: return RandomOpponent()
+        return CheckpointOpponent(self.opponent, device=self.device)
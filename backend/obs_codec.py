@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Códec de Observaciones Espaciales para Datasets y Replay Buffers
+=================================================================
+
+Una observación espacial [32, 9, 5] float32 ocupa 5,6 KB, pero casi todas
+las celdas están vacías y la mayoría de canales son binarios o acotados en
+[0, 1]. ObsCodec guarda lotes [N, C, H, W] en uno de estos modos:
+
+- "sparse" (sin pérdida): solo las celdas ocupadas (algún canal distinto
+  de 0), en formato CSR: offsets [N+1], celda de cada entrada y su columna
+  de C canales float32. Decodifica bit a bit la observación original.
+- "quantized" (denso, con pérdida): los primeros `float16_channels`
+  canales (embedding semántico, rango libre) en float16 y el resto
+  (presencia, propietario, ataque/vida log-normalizados, keywords; todos en
+  [0, 1]) en uint8 como round(x * 255). Los canales binarios siguen siendo
+  exactos; los acotados tienen error <= 1/510.
+- "sparse_quantized": celdas ocupadas con columnas cuantizadas.
+
+decode() escribe directamente en un buffer [B, C, H, W] float32 (uno nuevo o
+`out`) las filas pedidas, en cualquier orden, para sacar lotes de
+entrenamiento sin reconstruir el dataset entero.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import numpy as np
+
+CODEC_MODES = ("sparse", "quantized", "sparse_quantized")
+# Arrays de EncodedObs (según el modo); el resto de claves de un .npz son columnas extra
+_ARRAY_KEYS = ("offsets", "cells", "values", "f16", "u8")
+
+_U8_SCALE = np.float32(255)
+
+
+class EncodedObs:
+    """Lote de observaciones codificado: modo, forma original [N, C, H, W] y arrays."""
+    __slots__ = ("mode", "shape", "float16_channels", "arrays")
+
+    def __init__(self, mode: str, shape: tuple, float16_channels: int, arrays: dict):
+        self.mode = mode
+        self.shape = tuple(int(d) for d in shape)
+        self.float16_channels = int(float16_channels)
+        self.arrays = arrays
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    @property
+    def compression_ratio(self) -> float:
+        """Tamaño float32 denso / tamaño codificado."""
+        return int(np.prod(self.shape)) * 4 / max(self.nbytes, 1)
+
+    def save(self, path: str, **columns) -> None:
+        """Guarda el lote en un .npz, junto con columnas extra por muestra (logits, valores...)."""
+        np.savez(path, mode=self.mode, shape=np.array(self.shape), float16_channels=self.float16_channels,
+                 **self.arrays, **columns)
+
+    @classmethod
+    def load(cls, path: str) -> "EncodedObs":
+        """Lote guardado con save(); las columnas extra se leen aparte con np.load."""
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {k: data[k] for k in data.files if k in _ARRAY_KEYS}
+            return cls(str(data["mode"]), tuple(data["shape"]), int(data["float16_channels"]), arrays)
+
+    @classmethod
+    def concatenate(cls, parts: list) -> "EncodedObs":
+        """Une lotes del mismo modo y forma (p. ej. trozos de un replay buffer)."""
+        first = parts[0]
+        arrays = {}
+        for key in first.arrays:
+            if key == "offsets":
+                # Cada trozo continúa donde acabó el anterior
+                shifted, base = [np.zeros(1, dtype=np.int64)], 0
+                for part in parts:
+                    shifted.append(part.arrays["offsets"][1:] + base)
+                    base += int(part.arrays["offsets"][-1])
+                arrays[key] = np.concatenate(shifted)
+            else:
+                arrays[key] = np.concatenate([part.arrays[key] for part in parts])
+        shape = (sum(len(part) for part in parts),) + first.shape[1:]
+        return cls(first.mode, shape, first.float16_channels, arrays)
+
+
+class ObsCodec:
+    """Codificador/decodificador de lotes de observaciones [N, C, H, W] float32.
+
+    Args:
+        mode: Uno de CODEC_MODES
+        float16_channels: Canales iniciales guardados en float16 al cuantizar
+            (16 = embedding semántico del SpatialVectorizer); el resto va en
+            uint8 y debe estar en [0, 1]
+    """
+
+    def __init__(self, mode: str = "sparse", float16_channels: int = 16):
+        if mode not in CODEC_MODES:
+            raise ValueError(f"Modo de códec desconocido: {mode} (válidos: {CODEC_MODES})")
+        self.mode = mode
+        self.float16_channels = float16_channels
+
+    def encode(self, observations: np.ndarray) -> EncodedObs:
+        observations = np.asarray(observations, dtype=np.float32)
+        n, c, h, w = observations.shape
+        if self.mode == "quantized":
+            arrays = self._quantize(observations, axis=1)
+        else:
+            flat = observations.reshape(n, c, h * w)
+            rows, cells = np.nonzero(flat.any(axis=1))
+            values = flat[rows, :, cells]  # [T, C]
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+            arrays = {"offsets": offsets, "cells": cells.astype(np.uint8 if h * w <= 256 else np.uint16)}
+            if self.mode == "sparse":
+                arrays["values"] = values
+            else:
+                arrays.update(self._quantize(values, axis=1))
+        return EncodedObs(self.mode, observations.shape, self.float16_channels, arrays)
+
+    def decode(self, encoded: EncodedObs, indices=None, out: np.ndarray = None) -> np.ndarray:
+        """Observaciones `indices` (por defecto todas) como [B, C, H, W] float32.
+
+        Args:
+            encoded: Lote de encode() (o EncodedObs.load/concatenate)
+            indices: Filas a decodificar, en el orden del lote de salida
+            out: Buffer [B, C, H, W] float32 C-contiguo a reutilizar (se sobrescribe entero)
+        """
+        n, c, h, w = encoded.shape
+        indices = np.arange(n) if indices is None else np.asarray(indices, dtype=np.int64)
+        b = len(indices)
+        if out is None:
+            out = np.empty((b, c, h, w), dtype=np.float32)
+        arrays = encoded.arrays
+        f16 = encoded.float16_channels
+
+        if encoded.mode == "quantized":
+            out[:, :f16] = arrays["f16"][indices]
+            np.divide(arrays["u8"][indices], _U8_SCALE, out=out[:, f16:])
+            return out
+
+        out.fill(0.0)
+        offsets = arrays["offsets"]
+        starts = offsets[indices]
+        counts = offsets[indices + 1] - starts
+        # Posición en cells/values de cada entrada de las filas pedidas
+        rows = np.repeat(np.arange(b), counts)
+        positions = np.arange(int(counts.sum())) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        cells = arrays["cells"][positions]
+        target = out.reshape(b, c, h * w)
+        if encoded.mode == "sparse":
+            target[rows, :, cells] = arrays["values"][positions]
+        else:
+            target[rows, :f16, cells] = arrays["f16"][positions]
+            target[rows, f16:, cells] = arrays["u8"][positions] / _U8_SCALE
+        return out
+
+    def _quantize(self, values: np.ndarray, axis: int) -> dict:
+        """Canales [:float16_channels] a float16 y el resto a uint8 (round(x * 255), recortado a [0, 1])."""
+        head, tail = np.split(values, [self.float16_channels], axis=axis)
+        return {
+            "f16": head.astype(np.float16),
+            "u8": np.rint(np.clip(tail, 0.0, 1.0) * _U8_SCALE).astype(np.uint8),
+        }
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Oponentes Internos para los Entornos de Riftbound
+==================================================
+
+Políticas intercambiables para el "oponente interno" de RiftboundEnv y
+RiftboundVectorEnv:
+
+- RandomOpponent: acción legal uniforme con el LCG de política del motor
+  (el comportamiento original, reproducible por semilla).
+- HeuristicOpponent: la política "greedy" de rollout() (carta más cara
+  jugable, si no ataque con la unidad más fuerte, si no fin de turno).
+- CheckpointOpponent: un MuZeroNexus congelado; elige la acción legal de
+  mayor logit.
+
+Cada oponente implementa dos métodos:
+
+- act(engine, player_id, mask): una partida (PythonCoreEngine).
+- act_batch(engine, mask, rows): todas las partidas pendientes de un
+  BatchedCoreEngine a la vez. Para CheckpointOpponent esto es una única
+  pasada forward por paso del oponente, sea cual sea el número de entornos.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import numpy as np
+
+from game_logic import NUM_ACTIONS
+from spatial_vectorizer import SpatialVectorizer
+
+# Índice del oponente en BatchedCoreEngine (0 = "player", 1 = "opponent")
+OPPONENT = 1
+
+
+class Opponent:
+    """Interfaz de las políticas del oponente interno."""
+
+    def act(self, engine, player_id: str, mask: np.ndarray) -> int:
+        """Índice de acción (disposición fija de game_logic) para `player_id`.
+
+        Args:
+            engine: PythonCoreEngine con el turno de `player_id`
+            player_id: Jugador que decide
+            mask: engine.legal_mask(player_id), con al menos una acción legal
+        """
+        raise NotImplementedError
+
+    def act_batch(self, engine, mask: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Acción del oponente en cada partida de `rows`; -1 en el resto.
+
+        Args:
+            engine: BatchedCoreEngine
+            mask: engine.legal_mask() [N, NUM_ACTIONS]
+            rows: Partidas en las que le toca decidir al oponente (índice OPPONENT)
+        """
+        raise NotImplementedError
+
+
+class RandomOpponent(Opponent):
+    """Acción legal uniforme con el LCG de política de cada partida."""
+
+    def act(self, engine, player_id, mask):
+        legal = np.flatnonzero(mask)
+        return int(legal[engine.policy_rng.random_index(legal.size)])
+
+    def act_batch(self, engine, mask, rows):
+        return engine.random_actions(mask, rows)
+
+
+class HeuristicOpponent(Opponent):
+    """Política greedy del motor: desarrollar primero, después atacar."""
+
+    def act(self, engine, player_id, mask):
+        return engine._greedy_action(mask)
+
+    def act_batch(self, engine, mask, rows):
+        actions = np.full(engine.num_games, -1, dtype=np.int64)
+        actions[rows] = engine.greedy_actions(mask)[rows]
+        return actions
+
+
+class CheckpointOpponent(Opponent):
+    """MuZeroNexus congelado que juega la acción legal de mayor logit.
+
+    Args:
+        model: MuZeroNexus ya construido o ruta a un state_dict (.pt)
+        device: Dispositivo de torch (por defecto CUDA si está disponible)
+    """
+
+    def __init__(self, model, device=None):
+        # torch solo se importa si se usa un oponente neuronal
+        import torch
+        from models.muzero_nexus import MuZeroNexus
+
+        self._torch = torch
+        self.device = torch.device(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+        if isinstance(model, str):
+            path = model
+            model = MuZeroNexus()
+            model.load_state_dict(torch.load(path, map_location=self.device))
+        self.model = model.to(self.device).eval()
+        self.vectorizer = SpatialVectorizer(channels=32, height=9, width=5)
+        self._observation = np.zeros((32, 9, 5), dtype=np.float32)
+        self._observations = None
+
+    def _masked_argmax(self, observations: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """Una pasada forward para todo el lote; las acciones ilegales nunca se eligen."""
+        torch = self._torch
+        with torch.no_grad():
+            logits, _ = self.model(torch.from_numpy(observations).to(self.device))
+            logits = logits[:, :NUM_ACTIONS].masked_fill(~torch.from_numpy(mask).to(self.device), float("-inf"))
+            return logits.argmax(dim=1).cpu().numpy()
+
+    def act(self, engine, player_id, mask):
+        observation = self.vectorizer.vectorize_engine(engine.state, player_id, out=self._observation)
+        return int(self._masked_argmax(observation[None], mask[None])[0])
+
+    def act_batch(self, engine, mask, rows):
+        if self._observations is None or len(self._observations) != engine.num_games:
+            self._observations = np.zeros((engine.num_games, 32, 9, 5), dtype=np.float32)
+        actions = np.full(engine.num_games, -1, dtype=np.int64)
+        if rows.size:
+            self.vectorizer.vectorize_batched(engine, OPPONENT, out=self._observations, rows=rows)
+            actions[rows] = self._masked_argmax(self._observations[rows], mask[rows])
+        return actions
+
+
+OPPONENTS = {
+    "random": RandomOpponent,
+    "heuristic": HeuristicOpponent,
+}
+
+
+def make_opponent(opponent=None) -> Opponent:
+    """Opponent a partir de None (aleatorio), un nombre de OPPONENTS o una instancia."""
+    if opponent is None:
+        return RandomOpponent()
+    if isinstance(opponent, str):
+        return OPPONENTS[opponent]()
+    return opponent
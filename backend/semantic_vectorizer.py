@@ -1,50 +1,109 @@
 import numpy as np
-import json
-import os
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Any, Dict, Sequence
+
+from card_features import CardFeatures, CardRows
+from card_keywords import KEYWORD_BITS
+from embedding_store import get_store
+
+_PHASE_MAP = {'Mulligan': 0.1, 'Main': 0.4, 'Combat': 0.6, 'End': 0.8}
+# Field keyword flags of the game-state block, in feature order
+_FIELD_KEYWORD_BITS = (KEYWORD_BITS["Barrier"], KEYWORD_BITS["Elusive"], KEYWORD_BITS["Overwhelm"])
 
 class SemanticVectorizer:
     """
     Translates JSON GameState into a fixed-size 640-dimension vector.
     Structure: [512-dim semantic] + [128-dim game-state]
+
+    Embeddings come from the process-wide EmbeddingStore (a memory-mapped
+    float32 matrix shared by every vectorizer) or, for a plain dict, a matrix
+    compiled from it. A CardRows indexes it: exact id -> row, and prefix ->
+    row of the first id starting with it, so variant ids ("OGN-066-p") resolve
+    to their base card in O(1); unknown cards get row -1 (zero vector). Mean
+    hand/field embeddings are memoized by the multiset of rows, in an LRU of
+    `pool_cache_size` entries.
+
+    `card_rows` can be shared with a SpatialVectorizer over the same
+    embeddings, so both read one per-step CardFeatures (vectorize_features).
     """
-    def __init__(self, semantic_dim=512, state_dim=128):
+    def __init__(self, semantic_dim=512, state_dim=128, embeddings=None, pool_cache_size=4096, card_rows=None):
         self.semantic_dim = semantic_dim
         self.state_dim = state_dim
         self.total_dim = semantic_dim + state_dim
         
-        # Load card embeddings from cache
+        # Load card embeddings from the binary store
         self.embeddings = {}
         self.embedding_size = 384 # all-MiniLM-L6-v2 size
-        self.cache_path = os.path.join(os.path.dirname(__file__), 'embeddings', 'card_embeddings_cache.json')
-        self.load_embeddings()
+        self.pool_cache_size = pool_cache_size
+        if embeddings is None:
+            self.load_embeddings()
+        else:
+            # Already loaded by another vectorizer (e.g. SpatialVectorizer in a multi-mode env)
+            self.embeddings = embeddings
+            if embeddings:
+                self.embedding_size = len(next(iter(embeddings.values())))
+        self._build_index(card_rows)
 
     def load_embeddings(self):
-        if os.path.exists(self.cache_path):
-            with open(self.cache_path, 'r') as f:
-                self.embeddings = json.load(f)
+        store = get_store()
+        if store:
+            self.embeddings = store
+            self.embedding_size = store.dim
             print(f"SemanticVectorizer: Loaded {len(self.embeddings)} card embeddings.")
-            if self.embeddings:
-                # Get actual size from first entry
-                first_key = next(iter(self.embeddings))
-                self.embedding_size = len(self.embeddings[first_key])
         else:
             print("SemanticVectorizer Warning: No card embeddings cache found. Using zero vectors.")
 
+    def _build_index(self, card_rows=None):
+        """Indexes self.embeddings: the matrix, its CardRows (unless given) and an empty pool cache."""
+        if hasattr(self.embeddings, "matrix"):
+            matrix = self.embeddings.matrix
+        else:
+            matrix = np.zeros((len(self.embeddings), self.embedding_size), dtype=np.float32)
+            for row, emb in enumerate(self.embeddings.values()):
+                matrix[row] = emb
+            matrix.flags.writeable = False
+        self.embedding_matrix = matrix
+        self._zero_embedding = np.zeros(self.embedding_size, dtype=np.float32)
+        self._zero_embedding.flags.writeable = False
+        self.card_rows = card_rows if card_rows is not None else CardRows(self.embeddings)
+        self._pool_cache = OrderedDict()
+
+    def card_row(self, card_id: str) -> int:
+        """Matrix row for a card id: exact match, else first id sharing its base id (SET-NUM), else -1."""
+        return self.card_rows.resolve(card_id)
+
     def get_card_embedding(self, card_id: str) -> np.ndarray:
-        # Fuzzy match for variants if needed (same as sync script)
-        if card_id in self.embeddings:
-            return np.array(self.embeddings[card_id], dtype=np.float32)
-        
-        base_id = "-".join(card_id.split("-")[:2])
-        for key in self.embeddings:
-            if key.startswith(base_id):
-                return np.array(self.embeddings[key], dtype=np.float32)
-        
-        return np.zeros(self.embedding_size, dtype=np.float32)
+        """Read-only view of the card's row in embedding_matrix (zeros for unknown cards)."""
+        row = self.card_row(card_id)
+        return self.embedding_matrix[row] if row >= 0 else self._zero_embedding
+
+    def pooled_embedding(self, card_ids) -> np.ndarray:
+        """Mean embedding of a group of cards (read-only), memoized by the multiset of their rows."""
+        return self.pooled_rows([self.card_row(card_id) for card_id in card_ids])
 
-    def vectorize(self, state: Dict[str, Any], player_id: str = 'player') -> np.ndarray:
-        vector = np.zeros(self.total_dim, dtype=np.float32)
+    def pooled_rows(self, rows) -> np.ndarray:
+        """Mean of embedding_matrix rows (-1 = zero vector), read-only and memoized by the multiset."""
+        key = tuple(sorted(rows))
+        cache = self._pool_cache
+        mean = cache.get(key)
+        if mean is None:
+            # Unknown cards count as zero vectors, as in a plain mean over get_card_embedding()
+            mean = self.embedding_matrix[[row for row in key if row >= 0]].sum(axis=0) / np.float32(len(key))
+            mean.flags.writeable = False
+            cache[key] = mean
+            if len(cache) > self.pool_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return mean
+
+    def vectorize(self, state: Dict[str, Any], player_id: str = 'player', out: np.ndarray = None) -> np.ndarray:
+        """Vectorizes one state; `out` is an optional [total_dim] float32 buffer (overwritten)."""
+        if out is None:
+            vector = np.zeros(self.total_dim, dtype=np.float32)
+        else:
+            vector = out
+            vector.fill(0.0)
         
         # --- 1. GAME STATE (128 dims) ---
         # Fixed indices [512-640]
@@ -55,8 +114,7 @@ class SemanticVectorizer:
         vector[s_idx+1] = 1.0 if state.get('activePlayer') == player_id else 0.0
         vector[s_idx+2] = 1.0 if state.get('priority') == player_id else 0.0
         
-        phase_map = {'Mulligan': 0.1, 'Main': 0.4, 'Combat': 0.6, 'End': 0.8}
-        vector[s_idx+3] = phase_map.get(state.get('phase'), 0.0)
+        vector[s_idx+3] = _PHASE_MAP.get(state.get('phase'), 0.0)
         
         # 1.2 Players (20 x 2 = 40 dims)
         opponent_id = 'opponent' if player_id == 'player' else 'player'
@@ -95,20 +153,70 @@ class SemanticVectorizer:
         field = me.get('field', [])
         
         # HAND POOLING
-        hand_embeddings = [self.get_card_embedding(c['id']) for c in hand if 'id' in c]
-        if hand_embeddings:
-            mean_hand = np.mean(hand_embeddings, axis=0)
+        hand_ids = [c['id'] for c in hand if 'id' in c]
+        if hand_ids:
+            mean_hand = self.pooled_embedding(hand_ids)
             vector[0:384] = mean_hand
         
         # FIELD POOLING (remaining 128 dims)
-        field_embeddings = [self.get_card_embedding(u['id']) for u in field if 'id' in u]
-        if field_embeddings:
-            mean_field = np.mean(field_embeddings, axis=0)
+        field_ids = [u['id'] for u in field if 'id' in u]
+        if field_ids:
+            mean_field = self.pooled_embedding(field_ids)
             # Take first 128 elements of mean field embedding as a hash/summary
             vector[384:512] = mean_field[:128]
             
         return vector
 
+    def vectorize_features(self, features: CardFeatures, player_id: str = 'player', out: np.ndarray = None) -> np.ndarray:
+        """Same vector as vectorize() on the serialized state, from a CardFeatures built with self.card_rows."""
+        if out is None:
+            vector = np.zeros(self.total_dim, dtype=np.float32)
+        else:
+            vector = out
+            vector.fill(0.0)
+        state = features.state
+        s_idx = self.semantic_dim
+        vector[s_idx] = min(state.turn / 50.0, 1.0)
+        vector[s_idx+1] = 1.0 if state.active_player == player_id else 0.0
+        vector[s_idx+3] = _PHASE_MAP.get(state.phase, 0.0)
+
+        opponent_id = 'opponent' if player_id == 'player' else 'player'
+        for i, pid in enumerate([player_id, opponent_id]):
+            player = state.players[pid]
+            offset = s_idx + 10 + (i * 20)
+            vector[offset] = player.health / 20.0
+            vector[offset+1] = player.mana / 10.0
+            vector[offset+2] = 1.0  # No deckCount in the serialized state: the dict path's default 40 / 40
+            vector[offset+3] = len(player.hand) / 10.0
+            vector[offset+4] = len(player.field) / 6.0
+
+        for i, pid in enumerate([player_id, opponent_id]):
+            for j, (_, attack, health, keywords) in enumerate(features.player(pid).field_units[:6]):
+                offset = s_idx + 50 + (i * 36) + (j * 6)
+                vector[offset] = attack / 10.0
+                vector[offset+1] = health / 10.0
+                for k, bit in enumerate(_FIELD_KEYWORD_BITS):
+                    vector[offset+2+k] = 1.0 if keywords & bit else 0.0
+
+        me = features.player(player_id)
+        if me.hand_rows:
+            vector[0:384] = self.pooled_rows(me.hand_rows)
+        if me.field_rows:
+            vector[384:512] = self.pooled_rows(me.field_rows)[:128]
+        return vector
+
+    def vectorize_batch(self, states: Sequence[Dict[str, Any]], player_id='player', out: np.ndarray = None) -> np.ndarray:
+        """
+        Vectorizes a sequence of states into rows 0..B-1 of `out` ([B, total_dim], allocated if None).
+        `player_id` is one perspective for the whole batch or one per state.
+        """
+        if out is None:
+            out = np.zeros((len(states), self.total_dim), dtype=np.float32)
+        player_ids = [player_id] * len(states) if isinstance(player_id, str) else player_id
+        for i, state in enumerate(states):
+            self.vectorize(state, player_id=player_ids[i], out=out[i])
+        return out
+
 if __name__ == "__main__":
     # Test
     v = SemanticVectorizer()
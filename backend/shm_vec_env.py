@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+VecEnv Multiproceso con Memoria Compartida para Riftbound TCG
+==============================================================
+
+Alternativa a SubprocVecEnv de Stable-Baselines3 para RiftboundEnv.
+SubprocVecEnv serializa (pickle) cada observación [32, 9, 5] float32 a
+través de una tubería; con varios núcleos ocupados ese coste domina.
+
+Aquí cada proceso trabajador aloja uno o más entornos y escribe sus
+resultados directamente en un bloque de multiprocessing.shared_memory:
+
+- observaciones      [N, 32, 9, 5] float32
+- observación final  [N, 32, 9, 5] float32 (la del paso que terminó la partida)
+- acciones           [N] int64 (escritas por el proceso principal)
+- recompensas        [N] float32
+- dones / truncated  [N] bool
+- máscaras legales   [N, 128] bool (action_masks() de cada entorno)
+
+Por las tuberías solo viajan comandos de un byte (paso / terminado); el
+resto de comandos (reset, env_method, get_attr...) usan pickle como en
+SubprocVecEnv, pero no están en el bucle caliente.
+
+step_async() escribe las acciones y despierta a los trabajadores sin
+esperar; step_wait() recoge las confirmaciones y copia los buffers. Entre
+ambas llamadas el proceso principal queda libre (p. ej. para la red).
+
+Las infos solo incluyen "TimeLimit.truncated" y "terminal_observation":
+las acciones legales se leen con action_masks() en lugar de viajar como
+listas de diccionarios. env_method("action_masks"), que es lo que usa
+MaskablePPO, también se sirve desde la memoria compartida.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import multiprocessing as mp
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+# Mensajes del bucle caliente (sin pickle)
+_STEP = b"s"
+_DONE = b"d"
+
+
+class _SharedBuffers:
+    """Vistas NumPy sobre un único bloque de memoria compartida."""
+
+    def __init__(self, buf, num_envs: int, obs_shape: tuple, num_actions: int):
+        self.fields = {}
+        offset = 0
+        for name, shape, dtype in self.layout(num_envs, obs_shape, num_actions):
+            dtype = np.dtype(dtype)
+            offset = -(-offset // dtype.alignment) * dtype.alignment
+            array = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+            setattr(self, name, array)
+            self.fields[name] = array
+            offset += array.nbytes
+
+    @staticmethod
+    def layout(num_envs: int, obs_shape: tuple, num_actions: int) -> list:
+        return [
+            ("observations", (num_envs, *obs_shape), np.float32),
+            ("terminal_observations", (num_envs, *obs_shape), np.float32),
+            ("actions", (num_envs,), np.int64),
+            ("rewards", (num_envs,), np.float32),
+            ("dones", (num_envs,), bool),
+            ("truncated", (num_envs,), bool),
+            ("masks", (num_envs, num_actions), bool),
+        ]
+
+    @classmethod
+    def nbytes(cls, num_envs: int, obs_shape: tuple, num_actions: int) -> int:
+        # Cota superior: tamaño de cada campo más el relleno de alineación
+        return sum(
+            int(np.prod(shape)) * np.dtype(dtype).itemsize + np.dtype(dtype).alignment
+            for _, shape, dtype in cls.layout(num_envs, obs_shape, num_actions)
+        )
+
+    def release(self):
+        """Suelta las vistas (necesario antes de cerrar el bloque)."""
+        for name in self.fields:
+            delattr(self, name)
+        self.fields.clear()
+
+
+def _write_mask(buffers: _SharedBuffers, i: int, env) -> None:
+    buffers.masks[i] = env.unwrapped.action_masks()
+
+
+def _worker(remote, parent_remote, env_fns_wrapper: CloudpickleWrapper, first: int,
+            shm_name: str, num_envs: int, obs_shape: tuple, num_actions: int) -> None:
+    # Import aquí para evitar un import circular (igual que SubprocVecEnv)
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = _SharedBuffers(shm.buf, num_envs, obs_shape, num_actions)
+    envs = [_patch_env(env_fn()) for env_fn in env_fns_wrapper.var]
+    slots = range(first, first + len(envs))
+
+    try:
+        while True:
+            message = remote.recv_bytes()
+            if message == _STEP:
+                for i, env in zip(slots, envs):
+                    observation, reward, terminated, truncated, _ = env.step(int(buffers.actions[i]))
+                    done = terminated or truncated
+                    if done:
+                        buffers.terminal_observations[i] = observation
+                        observation, _ = env.reset()
+                    buffers.observations[i] = observation
+                    buffers.rewards[i] = reward
+                    buffers.dones[i] = done
+                    buffers.truncated[i] = truncated and not terminated
+                    _write_mask(buffers, i, env)
+                remote.send_bytes(_DONE)
+                continue
+
+            cmd, data = pickle.loads(message)
+            if cmd == "reset":
+                seeds, options = data
+                for i, env, seed, option in zip(slots, envs, seeds, options):
+                    maybe_options = {"options": option} if option else {}
+                    observation, _ = env.reset(seed=seed, **maybe_options)
+                    buffers.observations[i] = observation
+                    _write_mask(buffers, i, env)
+                remote.send(None)
+            elif cmd == "env_method":
+                local, name, args, kwargs = data
+                remote.send([envs[k].get_wrapper_attr(name)(*args, **kwargs) for k in local])
+            elif cmd == "get_attr":
+                local, name = data
+                remote.send([envs[k].get_wrapper_attr(name) for k in local])
+            elif cmd == "has_attr":
+                found = True
+                for env in envs:
+                    try:
+                        env.get_wrapper_attr(data)
+                    except AttributeError:
+                        found = False
+                remote.send(found)
+            elif cmd == "set_attr":
+                local, name, value = data
+                remote.send([setattr(envs[k], name, value) for k in local])
+            elif cmd == "is_wrapped":
+                local, wrapper_class = data
+                remote.send([is_wrapped(envs[k], wrapper_class) for k in local])
+            elif cmd == "render":
+                remote.send([env.render() for env in envs])
+            elif cmd == "close":
+                for env in envs:
+                    env.close()
+                remote.close()
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buffers.release()
+        shm.close()
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """VecEnv de SB3 con N entornos repartidos en `n_workers` procesos.
+
+    Args:
+        env_fns: Constructores de los entornos (uno por entorno).
+        n_workers: Procesos trabajadores; los entornos se reparten en bloques
+            contiguos (por defecto, un proceso por entorno).
+        start_method: Método de multiprocessing ('forkserver' si existe,
+            si no 'spawn'), como SubprocVecEnv.
+    """
+
+    def __init__(self, env_fns: list, n_workers: int = None, start_method: str = None):
+        self.waiting = False
+        self.closed = False
+        num_envs = len(env_fns)
+        n_workers = min(n_workers or num_envs, num_envs)
+
+        # Espacios leídos de un entorno local: los buffers deben existir antes que los trabajadores
+        probe = env_fns[0]()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        if not isinstance(observation_space, spaces.Box):
+            raise ValueError(f"SharedMemoryVecEnv necesita observaciones Box, no {observation_space}")
+        layout = (num_envs, observation_space.shape, int(action_space.n))
+
+        self._shm = shared_memory.SharedMemory(create=True, size=_SharedBuffers.nbytes(*layout))
+        self._buffers = _SharedBuffers(self._shm.buf, *layout)
+
+        if start_method is None:
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        # Bloques contiguos de entornos por trabajador
+        bounds = np.linspace(0, num_envs, n_workers + 1).astype(int)
+        self._slots = [range(bounds[w], bounds[w + 1]) for w in range(n_workers)]
+        self._owner = [(w, k) for w, slots in enumerate(self._slots) for k in range(len(slots))]
+
+        self.remotes, work_remotes = zip(*[ctx.Pipe() for _ in range(n_workers)])
+        self.processes = []
+        for work_remote, remote, slots in zip(work_remotes, self.remotes, self._slots):
+            args = (
+                work_remote, remote, CloudpickleWrapper([env_fns[i] for i in slots]),
+                slots.start, self._shm.name, *layout,
+            )
+            # daemon=True: si el proceso principal cae, los trabajadores no se quedan colgados
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        super().__init__(num_envs, observation_space, action_space)
+
+    @property
+    def n_workers(self) -> int:
+        return len(self.remotes)
+
+    def reset(self):
+        for remote, slots in zip(self.remotes, self._slots):
+            seeds = [self._seeds[i] for i in slots]
+            options = [self._options[i] for i in slots]
+            remote.send(("reset", (seeds, options)))
+        for remote in self.remotes:
+            remote.recv()
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        # Las semillas y opciones solo se usan una vez
+        self._reset_seeds()
+        self._reset_options()
+        return self._buffers.observations.copy()
+
+    def step_async(self, actions: np.ndarray) -> None:
+        """Escribe las acciones en memoria compartida y despierta a los trabajadores sin esperar."""
+        self._buffers.actions[:] = actions
+        for remote in self.remotes:
+            remote.send_bytes(_STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        for remote in self.remotes:
+            remote.recv_bytes()
+        self.waiting = False
+
+        buffers = self._buffers
+        dones = buffers.dones.copy()
+        truncated = buffers.truncated
+        infos = [{"TimeLimit.truncated": bool(truncated[i])} for i in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = buffers.terminal_observations[i].copy()
+        return buffers.observations.copy(), buffers.rewards.copy(), dones, infos
+
+    def action_masks(self) -> np.ndarray:
+        """Máscaras de acciones legales del jugador [N, 128] tras el último reset/step."""
+        return self._buffers.masks.copy()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv_bytes()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        self._buffers.release()
+        self._shm.close()
+        self._shm.unlink()
+        self.closed = True
+
+    def get_images(self) -> list:
+        for remote in self.remotes:
+            remote.send(("render", None))
+        return [image for remote in self.remotes for image in remote.recv()]
+
+    def _call(self, cmd: str, indices, *data) -> list:
+        """Envía `cmd` a los trabajadores dueños de `indices` y devuelve un resultado por índice, en orden."""
+        indices = list(self._get_indices(indices))
+        per_worker = {}
+        for i in indices:
+            worker, local = self._owner[i]
+            per_worker.setdefault(worker, []).append(local)
+        for worker, local in per_worker.items():
+            self.remotes[worker].send((cmd, (local, *data)))
+        results = {}
+        for worker, local in per_worker.items():
+            for k, result in zip(local, self.remotes[worker].recv()):
+                results[self._slots[worker][k]] = result
+        return [results[i] for i in indices]
+
+    def has_attr(self, attr_name: str) -> bool:
+        for remote in self.remotes:
+            remote.send(("has_attr", attr_name))
+        return all([remote.recv() for remote in self.remotes])
+
+    def get_attr(self, attr_name: str, indices=None) -> list:
+        return self._call("get_attr", indices, attr_name)
+
+    def set_attr(self, attr_name: str, value, indices=None) -> None:
+        self._call("set_attr", indices, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> list:
+        if method_name == "action_masks":
+            # Ya está en memoria compartida: sin ida y vuelta a los trabajadores
+            return list(self._buffers.masks[list(self._get_indices(indices))])
+        return self._call("env_method", indices, method_name, method_args, method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> list:
+        return self._call("is_wrapped", indices, wrapper_class)
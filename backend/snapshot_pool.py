@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Estados de Entorno y Pool de Posiciones de Inicio
+==================================================
+
+EnvState: copia exacta de una partida de RiftboundEnv (snapshot del motor
+más el LCG de política, que decide las jugadas del oponente aleatorio).
+Restaurar un EnvState reproduce la partida paso a paso, igual que si nunca
+se hubiera interrumpido.
+
+SnapshotPool: posiciones de mitad y final de partida desde las que
+RiftboundEnv.reset() puede empezar, para que el cómputo se gaste en
+posiciones relevantes en lugar de en los primeros turnos.
+La probabilidad de cada posición la fija `weighting`:
+
+- "uniform": todas igual
+- "turn":    proporcional al turno (favorece posiciones tardías)
+- "late":    proporcional al turno al cuadrado
+- callable(state) -> float: peso arbitrario
+
+Los estados de un pool deben venir de motores con el mismo catálogo (o sin
+catálogo) que el entorno que los restaura.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import bisect
+
+import numpy as np
+
+from game_logic import LCG, PythonCoreEngine, Snapshot
+
+
+class EnvState:
+    """Snapshot del motor + semilla del LCG de política; inmutable y reutilizable."""
+    __slots__ = ("snapshot", "policy_seed")
+
+    def __init__(self, snapshot: Snapshot, policy_seed: int):
+        self.snapshot = snapshot
+        self.policy_seed = policy_seed
+
+    @classmethod
+    def capture(cls, engine: PythonCoreEngine) -> "EnvState":
+        return cls(engine.snapshot(), engine.policy_rng.seed)
+
+    @property
+    def turn(self) -> int:
+        # header = (campos de GameState en el orden de _STATE_FIELDS, campos de jugadores)
+        return self.snapshot.header[0][0]
+
+    def restore_into(self, engine: PythonCoreEngine) -> None:
+        """Deja `engine` en este estado.
+
+        Las cartas de mano y campo se restauran sobre copias, sin tocar las
+        del snapshot: pueden seguir vivas en el entorno que hizo get_state(),
+        y un mismo EnvState puede sembrar varias partidas a la vez sin que
+        una cambie la vida de las cartas de otra.
+        """
+        engine.restore(self.snapshot, copy_cards=True)
+        engine.policy_rng = LCG(self.policy_seed)
+
+
+WEIGHTINGS = {
+    "uniform": lambda state: 1.0,
+    "turn": lambda state: float(state.turn),
+    "late": lambda state: float(state.turn) ** 2,
+}
+
+
+class SnapshotPool:
+    """Posiciones de inicio ponderadas para RiftboundEnv.reset().
+
+    Args:
+        capacity: Máximo de estados; al llenarse, cada add() sustituye uno al azar
+        weighting: Nombre de WEIGHTINGS o callable(EnvState) -> peso
+        seed: Semilla del generador de sustituciones
+    """
+
+    def __init__(self, capacity: int = 4096, weighting="turn", seed: int = None):
+        self.capacity = capacity
+        self.weighting = WEIGHTINGS[weighting] if isinstance(weighting, str) else weighting
+        self.states = []
+        self.weights = []
+        self._cumulative = None
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def add(self, state: EnvState, weight: float = None) -> None:
+        weight = self.weighting(state) if weight is None else weight
+        if len(self.states) < self.capacity:
+            self.states.append(state)
+            self.weights.append(weight)
+        else:
+            i = int(self._rng.integers(self.capacity))
+            self.states[i] = state
+            self.weights[i] = weight
+        self._cumulative = None
+
+    def sample(self, rng: np.random.Generator) -> EnvState:
+        """Estado con probabilidad proporcional a su peso (búsqueda binaria sobre los pesos acumulados)."""
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.weights).tolist()
+        total = self._cumulative[-1]
+        i = bisect.bisect_right(self._cumulative, rng.random() * total)
+        return self.states[min(i, len(self.states) - 1)]
+
+    @classmethod
+    def collect(cls, games: int, min_turn: int = 4, catalog=None, seed: int = 0, **kwargs) -> "SnapshotPool":
+        """Llena un pool con partidas aleatorias (LCG de política del motor).
+
+        Guarda el inicio de cada turno del jugador a partir de `min_turn`,
+        que es un punto de decisión de RiftboundEnv.step().
+        """
+        pool = cls(**kwargs)
+        engine = PythonCoreEngine(catalog=catalog)
+        for g in range(games):
+            engine.reset(seed + g)
+            turn_start = True
+            while not engine.state.winner:
+                state = engine.state
+                if state.active_player == "player":
+                    if turn_start and state.turn >= min_turn:
+                        pool.add(EnvState.capture(engine))
+                    turn_start = False
+                else:
+                    turn_start = True
+                legal = np.flatnonzero(engine.legal_mask(state.active_player))
+                engine.apply_action_index(int(legal[engine.policy_rng.random_index(legal.size)]))
+        return pool
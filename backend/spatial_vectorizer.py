@@ -28,8 +28,28 @@ Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
 """
 
 import numpy as np
-import json
-import os
+
+from card_features import CardFeatures, CardRows
+from card_keywords import keyword_mask
+from embedding_store import get_store
+from game_logic import CARD_TABLE, EVENT_STATE_REPLACED
+
+# Normalización log del dict path (min(log1p(v) / 3, 1)) precalculada por valor;
+# a partir de 20 el resultado ya satura en 1.0
+_LOG_NORM_MAX = 20
+_LOG_NORM = np.array([min(np.log1p(v) / 3.0, 1.0) for v in range(_LOG_NORM_MAX + 1)], dtype=np.float32)
+_KEYWORD_SHIFTS = np.arange(8, dtype=np.uint8)
+# Canales 24-31 por keyword_mask (un canal por keyword, en el orden de card_keywords.KEYWORDS)
+_KEYWORD_VECTORS = ((np.arange(256)[:, None] >> _KEYWORD_SHIFTS) & 1).astype(np.float32)
+# Tope de columnas memorizadas por vectorize_engine antes de vaciar la cache
+_UNIT_COLUMNS_MAX = 1 << 16
+
+
+def _log_norm(value) -> float:
+    """min(log1p(v) / 3, 1) por tabla para enteros 0.._LOG_NORM_MAX (y saturado por encima)."""
+    if type(value) is int and value >= 0:
+        return _LOG_NORM[value] if value <= _LOG_NORM_MAX else 1.0
+    return min(np.log1p(value) / 3.0, 1.0)
 
 
 class SpatialVectorizer:
@@ -44,112 +64,363 @@ class SpatialVectorizer:
         self.height = height
         self.width = width
         
-        # Cargar cache de embeddings semánticos
-        self.embeddings = self._load_embeddings()
+        # Posición aplanada en [H, W] de cada índice del campo visible (fila idx % H, columna idx // H)
+        cells = np.arange(height * width)
+        self._cell_flat = (cells % height) * width + cells // height
         
-    def _load_embeddings(self) -> dict:
-        """Carga embeddings pre-calculados desde el cache JSON."""
-        cache_path = os.path.join(
-            os.path.dirname(__file__), 
-            "embeddings", 
-            "card_embeddings_cache.json"
-        )
+        # Cargar cache de embeddings semánticos y compilarlo a matriz
+        self.set_embeddings(self._load_embeddings())
         
-        if os.path.exists(cache_path):
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                embeddings = json.load(f)
-            print(f"SpatialVectorizer: Integrados {len(embeddings)} embeddings.")
-            return embeddings
-        else:
-            print("SpatialVectorizer: Cache de embeddings no encontrado.")
-            return {}
-    
-    def _get_semantic_features(self, card_id: str) -> np.ndarray:
-        """Obtiene los primeros 16 componentes del embedding de una carta.
+    def set_embeddings(self, embeddings: dict) -> None:
+        """Sustituye los embeddings y reconstruye las tablas derivadas.
         
-        Si la carta no tiene embedding, devuelve un vector de ceros.
-        Los 16 componentes son suficientes para capturar las relaciones
-        semánticas más importantes entre cartas.
-        """
-        if card_id in self.embeddings:
-            emb = self.embeddings[card_id]
-            return np.array(emb[:16], dtype=np.float32)
-        return np.zeros(16, dtype=np.float32)
-    
-    def _encode_keywords(self, keywords: list) -> np.ndarray:
-        """Codifica keywords como vector binario de 8 dimensiones.
+        - _embedding_matrix [num_cartas + 1, 16] float32: primeros 16
+          componentes de cada carta; la última fila (ceros) es la de las
+          cartas sin embedding.
+        - card_rows: CardRows (fila por id y por card_index), compartible
+          con un SemanticVectorizer sobre los mismos embeddings.
         
-        Keywords soportados:
-        - Quick Attack, Barrier, Overwhelm, Elusive
-        - Lifesteal, Tough, Challenger, Fearsome
+        Args:
+            embeddings: {id: vector} o un EmbeddingStore (se copian sus 16 primeras columnas)
         """
-        keyword_map = {
-            "Quick Attack": 0,
-            "Barrier": 1,
-            "Overwhelm": 2,
-            "Elusive": 3,
-            "Lifesteal": 4,
-            "Tough": 5,
-            "Challenger": 6,
-            "Fearsome": 7
-        }
+        self.embeddings = embeddings
+        self.card_rows = CardRows(embeddings)
+        self._embedding_row = self.card_rows.row_of
+        matrix = np.zeros((len(embeddings) + 1, 16), dtype=np.float32)
+        if hasattr(embeddings, "matrix"):
+            matrix[:-1] = embeddings.matrix[:, :16]
+        else:
+            for row, emb in enumerate(embeddings.values()):
+                matrix[row] = emb[:16]
+        self._embedding_matrix = matrix
+        # Filas de embedding por card_index de CARD_TABLE (vectorize_engine / vectorize_batched)
+        self._semantic_rows = np.zeros((0, 16), dtype=np.float32)
+        # Columnas de canales por unidad ya vistas (vectorize_engine / vectorize)
+        self._unit_columns = {}
+        self._dict_columns = {}
         
-        vec = np.zeros(8, dtype=np.float32)
-        for kw in keywords:
-            if kw in keyword_map:
-                vec[keyword_map[kw]] = 1.0
-        return vec
+    def _load_embeddings(self):
+        """Embeddings pre-calculados: el EmbeddingStore del proceso (mmap, compartido)."""
+        embeddings = get_store()
+        if embeddings:
+            print(f"SpatialVectorizer: Integrados {len(embeddings)} embeddings.")
+        else:
+            print("SpatialVectorizer: Cache de embeddings no encontrado.")
+        return embeddings
     
-    def vectorize(self, game_state: dict, player_id: str) -> np.ndarray:
+    def vectorize(self, game_state: dict, player_id: str, out: np.ndarray = None) -> np.ndarray:
         """Convierte un estado de juego a tensor espacial.
         
+        Cada unidad se resuelve a su columna de 32 canales (construida con
+        las tablas de embeddings, log-normalización y keywords, y memorizada);
+        el oponente sobrescribe la celda del jugador con el mismo índice y
+        el campo entero se escribe con una sola asignación indexada.
+        
         Args:
             game_state: Estado serializado del juego (dict)
             player_id: ID del jugador desde cuya perspectiva se genera el tensor
+            out: Buffer [C, H, W] float32 C-contiguo a reutilizar (se sobrescribe entero)
         
         Returns:
-            Tensor numpy de forma [C, H, W] normalizado a [0, 1]
+            Tensor numpy de forma [C, H, W] normalizado a [0, 1] (`out` si se pasa)
         """
-        tensor = np.zeros((self.channels, self.height, self.width), dtype=np.float32)
+        if out is None:
+            tensor = np.zeros((self.channels, self.height, self.width), dtype=np.float32)
+        else:
+            tensor = out
+            tensor.fill(0.0)
         
-        # Mapear unidades del campo al tensor
+        # Columna de canales de cada celda, en el orden de los índices del campo
+        capacity = self.height * self.width
+        columns = []
         for pid, player_data in game_state.get("players", {}).items():
             is_owner = 1.0 if pid == player_id else 0.0
-            
-            for idx, unit in enumerate(player_data.get("field", [])):
-                # Calcular posición en el grid (distribución simple)
-                row = idx % self.height
-                col = idx // self.height
-                
-                if col >= self.width:
-                    continue  # Fuera del tablero visible
-                
-                # Canales 0-15: Embedding semántico
-                card_id = str(unit.get("id", "0"))
-                semantic = self._get_semantic_features(card_id)
-                tensor[0:16, row, col] = semantic
-                
-                # Canal 16: Presencia
-                tensor[16, row, col] = 1.0
-                
-                # Canal 17: Propietario
-                tensor[17, row, col] = is_owner
-                
-                # Canales 18-20: Ataque (log-normalizado)
-                attack = unit.get("attack", 0)
-                tensor[18, row, col] = min(np.log1p(attack) / 3.0, 1.0)
-                
-                # Canales 21-23: Vida (log-normalizado)
-                health = unit.get("health", 0)
-                tensor[21, row, col] = min(np.log1p(health) / 3.0, 1.0)
-                
-                # Canales 24-31: Keywords
-                keywords = unit.get("keywords", [])
-                kw_vec = self._encode_keywords(keywords)
-                tensor[24:32, row, col] = kw_vec
+            for idx, unit in enumerate(player_data.get("field", [])[:capacity]):
+                key = (str(unit.get("id", "0")), unit.get("attack", 0), unit.get("health", 0),
+                       tuple(unit.get("keywords", ())), is_owner)
+                column = self._dict_columns.get(key)
+                if column is None:
+                    column = self._dict_column(key)
+                if idx < len(columns):
+                    columns[idx] = column
+                else:
+                    columns.append(column)
         
+        if columns:
+            tensor.reshape(self.channels, capacity)[:, self._cell_flat[:len(columns)]] = np.array(columns).T
         return tensor
 
+    def vectorize_batch(self, states, player_id="player", out: np.ndarray = None) -> np.ndarray:
+        """Vectoriza un lote de estados en las filas 0..B-1 de `out`.
+        
+        Args:
+            states: Secuencia de estados serializados (dict) o GameState de
+                PythonCoreEngine (se pueden mezclar), o un BatchedCoreEngine
+                (delegado en vectorize_batched)
+            player_id: Perspectiva para todo el lote o una por estado; con un
+                BatchedCoreEngine, "player"/"opponent" o el índice 0/1
+            out: Buffer [B, C, H, W] float32 C-contiguo a reutilizar (se reserva si es None)
+        
+        Returns:
+            `out` con los B estados escritos
+        """
+        if hasattr(states, "num_games"):
+            player = player_id if isinstance(player_id, int) else int(player_id != "player")
+            return self.vectorize_batched(states, player, out=out)
+        if out is None:
+            out = np.zeros((len(states), self.channels, self.height, self.width), dtype=np.float32)
+        player_ids = [player_id] * len(states) if isinstance(player_id, str) else player_id
+        for i, state in enumerate(states):
+            if isinstance(state, dict):
+                self.vectorize(state, player_ids[i], out=out[i])
+            else:
+                self.vectorize_engine(state, player_ids[i], out=out[i])
+        return out
+    
+    def _dict_column(self, key: tuple) -> np.ndarray:
+        """Los 32 canales de una unidad serializada, memorizados por (id, ataque, vida, keywords, propietario)."""
+        card_id, attack, health, keywords, is_owner = key
+        if len(self._dict_columns) >= _UNIT_COLUMNS_MAX:
+            self._dict_columns.clear()
+        column = np.zeros(self.channels, dtype=np.float32)
+        column[0:16] = self._embedding_matrix[self._embedding_row.get(card_id, -1)]
+        column[16] = 1.0
+        column[17] = is_owner
+        column[18] = _log_norm(attack)
+        column[21] = _log_norm(health)
+        column[24:32] = _KEYWORD_VECTORS[keyword_mask(keywords)]
+        self._dict_columns[key] = column
+        return column
+
+    def _semantic_matrix(self) -> np.ndarray:
+        """Embeddings [len(CARD_TABLE), 16] indexados por card_index; crece con la tabla."""
+        known = len(self._semantic_rows)
+        if known < len(CARD_TABLE):
+            exact, _ = self.card_rows.tables()
+            self._semantic_rows = np.concatenate([self._semantic_rows, self._embedding_matrix[exact[known:]]])
+        return self._semantic_rows
+
+    def vectorize_features(self, features: CardFeatures, player_id: str, out: np.ndarray = None) -> np.ndarray:
+        """Vectoriza las cartas ya extraídas de un GameState (mismo tensor que vectorize_engine).
+
+        Args:
+            features: CardFeatures del estado, construida con self.card_rows
+            player_id: ID del jugador desde cuya perspectiva se genera el tensor
+            out: Buffer [C, H, W] float32 C-contiguo a reutilizar (se sobrescribe entero)
+        """
+        if out is None:
+            out = np.zeros((self.channels, self.height, self.width), dtype=np.float32)
+        else:
+            out.fill(0.0)
+        # El oponente sobrescribe la celda del jugador con el mismo índice, igual que en el dict path
+        columns = []
+        capacity = self.height * self.width
+        for pid in features.state.players:
+            is_owner = 1.0 if pid == player_id else 0.0
+            for idx, unit in enumerate(features.player(pid).field_units[:capacity]):
+                column = self._feature_column(unit, is_owner)
+                if idx < len(columns):
+                    columns[idx] = column
+                else:
+                    columns.append(column)
+
+        if columns:
+            out.reshape(self.channels, capacity)[:, self._cell_flat[:len(columns)]] = np.array(columns).T
+        return out
+
+    def _feature_column(self, unit: tuple, is_owner: float) -> np.ndarray:
+        """Columna de 32 canales de una unidad de PlayerCards.field_units (memorizada)."""
+        card_index, attack, health, keyword_mask = unit
+        key = (card_index, min(attack, _LOG_NORM_MAX), min(health, _LOG_NORM_MAX), keyword_mask, is_owner)
+        column = self._unit_columns.get(key)
+        if column is None:
+            column = self._unit_column(key)
+        return column
+
+    def vectorize_engine(self, state, player_id: str, out: np.ndarray = None) -> np.ndarray:
+        """Vectoriza un GameState de PythonCoreEngine sin pasar por dicts.
+
+        Produce exactamente el mismo tensor que vectorize() sobre el estado
+        serializado (game_gym._serialize_state); el dict path sigue siendo
+        la entrada para los estados JSON de la API.
+
+        Args:
+            state: GameState (engine.state)
+            player_id: ID del jugador desde cuya perspectiva se genera el tensor
+            out: Buffer [C, H, W] float32 C-contiguo a reutilizar (se sobrescribe entero)
+
+        Returns:
+            `out` (o un tensor nuevo si no se pasa)
+        """
+        if out is None:
+            out = np.zeros((self.channels, self.height, self.width), dtype=np.float32)
+        else:
+            out.fill(0.0)
+
+        # Columna de canales de cada celda; el oponente sobrescribe la celda
+        # del jugador con el mismo índice, igual que en el dict path
+        columns = []
+        capacity = self.height * self.width
+        for pid, player in state.players.items():
+            is_owner = 1.0 if pid == player_id else 0.0
+            for idx, card in enumerate(player.field[:capacity]):
+                column = self._card_column(card, is_owner)
+                if idx < len(columns):
+                    columns[idx] = column
+                else:
+                    columns.append(column)
+
+        if columns:
+            out.reshape(self.channels, capacity)[:, self._cell_flat[:len(columns)]] = np.array(columns).T
+        return out
+
+    def _card_column(self, card, is_owner: float) -> np.ndarray:
+        """Columna de 32 canales de una carta del motor (memorizada)."""
+        return self._feature_column((card.card_index, card.attack, card.health, card.keyword_mask), is_owner)
+    
+    def _unit_column(self, key: tuple) -> np.ndarray:
+        """Los 32 canales de una unidad, memorizados por (carta, ataque, vida, keywords, propietario)."""
+        card_index, attack, health, keyword_mask, is_owner = key
+        if len(self._unit_columns) >= _UNIT_COLUMNS_MAX:
+            self._unit_columns.clear()
+        column = np.zeros(self.channels, dtype=np.float32)
+        column[0:16] = self._semantic_matrix()[card_index]
+        column[16] = 1.0
+        column[17] = is_owner
+        column[18] = _LOG_NORM[attack]
+        column[21] = _LOG_NORM[health]
+        column[24:32] = _KEYWORD_VECTORS[keyword_mask]
+        self._unit_columns[key] = column
+        return column
+
+    def vectorize_batched(self, engine, player: int = 0, out: np.ndarray = None, rows: np.ndarray = None) -> np.ndarray:
+        """Vectoriza las partidas de un BatchedCoreEngine sin pasar por dicts.
+
+        Produce exactamente el mismo tensor que vectorize() sobre el estado
+        serializado de cada partida, incluido que las unidades del oponente
+        sobrescriben la celda de la unidad del jugador con el mismo índice.
+
+        Args:
+            engine: BatchedCoreEngine con N partidas
+            player: Índice del jugador de referencia (0 = "player", 1 = "opponent")
+            out: Buffer [N, C, H, W] float32 a reutilizar
+            rows: Partidas a escribir (por defecto todas); el resto de `out` no se toca
+
+        Returns:
+            `out` con las partidas pedidas escritas
+        """
+        if out is None:
+            out = np.zeros((engine.num_games, self.channels, self.height, self.width), dtype=np.float32)
+        if rows is None:
+            rows = np.arange(engine.num_games)
+        out[rows] = 0.0
+        embeddings = self._semantic_matrix()
+        slots = np.arange(engine.field_card.shape[2])
+
+        # Mismo orden que el dict path: primero "player", luego "opponent"
+        for p in range(2):
+            visible = (slots < engine.field_count[rows, p][:, None]) & (slots < self.height * self.width)
+            g, k = np.nonzero(visible)
+            if not g.size:
+                continue
+            g = rows[g]
+            row, col = k % self.height, k // self.height
+
+            out[g, 0:16, row, col] = embeddings[engine.field_card[g, p, k]]
+            out[g, 16, row, col] = 1.0
+            out[g, 17, row, col] = 1.0 if p == player else 0.0
+            out[g, 18, row, col] = _LOG_NORM[np.minimum(engine.field_attack[g, p, k], _LOG_NORM_MAX)]
+            out[g, 21, row, col] = _LOG_NORM[np.minimum(engine.field_health[g, p, k], _LOG_NORM_MAX)]
+            keywords = engine.field_keywords[g, p, k]
+            out[g, 24:32, row, col] = (keywords[:, None] >> _KEYWORD_SHIFTS) & 1
+        return out
+
+
+class IncrementalSpatialEncoder:
+    """Observación espacial persistente que se parchea con los eventos del motor.
+    
+    attach() activa `engine.events`; cada observe() consume los eventos
+    pendientes y reescribe solo las celdas de los huecos del campo que
+    cambiaron (unidad colocada o retirada, estadísticas, keyword consumido).
+    Sin eventos (acción ilegal o sin efecto en el campo) no se codifica nada.
+    Un EVENT_STATE_REPLACED (reset/restore/undo) o un GameState nuevo
+    fuerzan una codificación completa.
+    
+    Las celdas se escriben desde una CardFeatures (la del entorno, compartida
+    con los demás modos, o una propia si observe() no la recibe).
+    
+    El resultado es idéntico a vectorize_engine() sobre el mismo estado; con
+    verify=True cada observe() lo comprueba contra una codificación completa
+    y lanza RuntimeError si difieren.
+    
+    Args:
+        vectorizer: SpatialVectorizer con las tablas de columnas
+        player_id: Perspectiva de la observación
+        verify: Comparar cada observación con la codificación completa
+    """
+    
+    def __init__(self, vectorizer: SpatialVectorizer, player_id: str = "player", verify: bool = False):
+        self.vectorizer = vectorizer
+        self.player_id = player_id
+        self.verify = verify
+        self.tensor = np.zeros((vectorizer.channels, vectorizer.height, vectorizer.width), dtype=np.float32)
+        self._cells = self.tensor.reshape(vectorizer.channels, -1)
+        self._zero_column = np.zeros(vectorizer.channels, dtype=np.float32)
+        self._engine = None
+        self._state = None
+        # Estadística: observaciones completas / parcheadas / sin cambios
+        self.full_encodes = self.patches = self.skips = 0
+    
+    def attach(self, engine) -> None:
+        """Empieza a seguir `engine` (activa sus eventos); la próxima observe() codifica entera."""
+        engine.events = []
+        self._engine = engine
+        self._state = None
+    
+    def observe(self, features: CardFeatures = None) -> np.ndarray:
+        """Observación actual del motor.
+        
+        Args:
+            features: CardFeatures del estado actual (con vectorizer.card_rows);
+                se crea una si no se pasa y hay algo que codificar
+        
+        Returns:
+            El tensor persistente [C, H, W] (se sobrescribe en la siguiente llamada)
+        """
+        engine = self._engine
+        state = engine.state
+        events = engine.events
+        if (state is not self._state or events) and features is None:
+            features = CardFeatures(state, self.vectorizer.card_rows)
+        if state is not self._state or any(kind == EVENT_STATE_REPLACED for kind, _, _ in events):
+            self.vectorizer.vectorize_features(features, self.player_id, out=self.tensor)
+            self._state = state
+            self.full_encodes += 1
+        elif events:
+            capacity = self._cells.shape[1]
+            for idx in {slot for _, _, slot in events if slot < capacity}:
+                self._cells[:, self.vectorizer._cell_flat[idx]] = self._cell_column(features, idx)
+            self.patches += 1
+        else:
+            self.skips += 1
+        events.clear()
+        
+        if self.verify:
+            expected = self.vectorizer.vectorize_engine(state, self.player_id)
+            if not np.array_equal(expected, self.tensor):
+                cells = sorted({int(i) for i in np.flatnonzero((expected != self.tensor).any(axis=0))})
+                raise RuntimeError(f"IncrementalSpatialEncoder: celdas {cells} difieren de la codificación completa")
+        return self.tensor
+    
+    def _cell_column(self, features: CardFeatures, idx: int) -> np.ndarray:
+        """Columna visible en el índice `idx`: la del último jugador con unidad ahí (como vectorize_features)."""
+        column = self._zero_column
+        for pid in features.state.players:
+            units = features.player(pid).field_units
+            if idx < len(units):
+                column = self.vectorizer._feature_column(units[idx], 1.0 if pid == self.player_id else 0.0)
+        return column
+
 
 if __name__ == "__main__":
     # Test básico
@@ -13,15 +13,23 @@ def main():
     parser = argparse.ArgumentParser(description="Riftbound Neural Ignition: Training Harness")
     parser.add_argument("--steps", type=int, default=20000, help="Total training timesteps (default: 20000)")
     parser.add_argument("--save_path", type=str, default="ppo_riftbound_sovereign", help="Path to save the model")
+    parser.add_argument("--workers", type=int, default=1, help="Env worker processes (shared-memory VecEnv when > 1)")
+    parser.add_argument("--masked", action="store_true", help="Train with MaskablePPO (illegal actions are never sampled)")
+    parser.add_argument("--envs_per_worker", type=int, default=1, help="Environments per worker process")
     
     args = parser.parse_args()
     
     logger.info("--- RIFTBOUND NEURAL IGNITION ---")
     logger.info(f"Target Timesteps: {args.steps}")
     logger.info(f"Save Path: {args.save_path}")
+    logger.info(f"Workers: {args.workers} x {args.envs_per_worker} envs")
+    logger.info(f"Algorithm: {'MaskablePPO' if args.masked else 'PPO'}")
     
     # Initialize the agent
     agent.model_path = args.save_path
+    agent.n_workers = args.workers
+    agent.envs_per_worker = args.envs_per_worker
+    agent.masked = args.masked
     agent.initialize()
     
     # Start the learning loop
@@ -32,23 +32,53 @@ import torch.optim as optim
 import torch.nn.functional as F
 import pickle
 import os
+import numpy as np
 from models.tiny_zero import TinyZero
-from torch.utils.data import DataLoader, Dataset
+from obs_codec import EncodedObs, ObsCodec
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler
+
+# Dataset comprimido (obs_codec) primero; el pickle original como alternativa
+DATASET_PATHS = ("backend/data/distillation_dataset.npz", "backend/data/distillation_dataset.pkl")
 
 
 class DistillationDataset(Dataset):
     """Dataset de pares (observación, logits_profesor, valor_profesor).
     
-    Carga datos pre-generados por generate_distillation_data.py.
+    Carga datos pre-generados por generate_distillation_data.py: un .npz
+    con observaciones comprimidas (obs_codec) o el pickle original. En el
+    .npz, __getitem__ acepta también una lista de índices y decodifica el
+    lote entero de una vez (ver StudentTrainer).
     """
     def __init__(self, data_path: str):
-        with open(data_path, "rb") as f:
-            self.data = pickle.load(f)
+        self.encoded = None
+        if data_path.endswith(".npz"):
+            self.encoded = EncodedObs.load(data_path)
+            self.codec = ObsCodec(self.encoded.mode, self.encoded.float16_channels)
+            with np.load(data_path) as data:
+                self.logits = data["logits"]
+                self.values = data["value"]
+        else:
+            with open(data_path, "rb") as f:
+                self.data = pickle.load(f)
 
     def __len__(self) -> int:
+        if self.encoded is not None:
+            return len(self.encoded)
         return len(self.data)
 
-    def __getitem__(self, idx: int) -> dict:
+    def __getitem__(self, idx) -> dict:
+        if self.encoded is not None:
+            # Índice o lista de índices: observaciones decodificadas directamente al lote
+            indices = np.atleast_1d(idx)
+            obs = self.codec.decode(self.encoded, indices)
+            batch = {
+                "obs": torch.from_numpy(obs),
+                "teacher_logits": torch.from_numpy(self.logits[indices]),
+                "teacher_value": torch.from_numpy(self.values[indices])
+            }
+            if np.ndim(idx) == 0:
+                batch = {key: value[0] for key, value in batch.items()}
+            return batch
         item = self.data[idx]
         return {
             "obs": torch.tensor(item["obs"], dtype=torch.float32),
@@ -63,13 +93,20 @@ class StudentTrainer:
     Carga el dataset de logits del profesor y entrena al estudiante
     para imitar su distribución de probabilidad suavizada.
     """
-    def __init__(self, dataset_path: str = "backend/data/distillation_dataset.pkl"):
+    def __init__(self, dataset_path: str = None):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.student = TinyZero().to(self.device)
         self.optimizer = optim.Adam(self.student.parameters(), lr=1e-3)
         
+        if dataset_path is None:
+            dataset_path = next((p for p in DATASET_PATHS if os.path.exists(p)), DATASET_PATHS[0])
         dataset = DistillationDataset(dataset_path)
-        self.dataloader = DataLoader(dataset, batch_size=32, shuffle=True)
+        if dataset.encoded is not None:
+            # El sampler entrega lotes de índices; cada lote se decodifica de una vez
+            sampler = BatchSampler(RandomSampler(dataset), batch_size=32, drop_last=False)
+            self.dataloader = DataLoader(dataset, sampler=sampler, batch_size=None)
+        else:
+            self.dataloader = DataLoader(dataset, batch_size=32, shuffle=True)
 
     def distillation_loss(
         self, 
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Entorno Gymnasium Vectorizado para Riftbound TCG
+=================================================
+
+Versión nativa por lotes de RiftboundEnv: un único BatchedCoreEngine
+contiene las N partidas y cada step() las avanza todas a la vez con
+operaciones NumPy, en lugar de N entornos Python independientes.
+
+- Observaciones: un buffer preasignado [N, 32, 9, 5] escrito por
+  SpatialVectorizer.vectorize_batched (se sobrescribe en cada step).
+- Recompensas / terminated / truncated: arrays [N].
+- Acciones: misma disposición fija que RiftboundEnv; action_masks()
+  devuelve un buffer [N, 128] con las acciones legales de cada partida.
+- Autoreset en el mismo step (AutoresetMode.SAME_STEP): la observación de
+  una partida terminada se devuelve en infos["final_obs"] y la partida se
+  reinicia con una semilla de su propio np_random.
+
+Con las mismas semillas, cada partida reproduce exactamente la secuencia
+de observaciones, recompensas y finales de RiftboundEnv (ver
+verify_vector_env.py): mismo mapeo de acciones, mismo oponente (por
+defecto aleatorio, con el LCG de política de cada partida) y misma semilla
+en cada reinicio.
+
+El oponente (opponents.py) decide por lotes: en cada paso del turno del
+oponente, una sola llamada a act_batch para todas las partidas pendientes;
+con CheckpointOpponent, una sola pasada forward de la red.
+
+Author: Manuel Ramirez Ballesteros
+Email: ramiballes96@gmail.com
+Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
+"""
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from batched_engine import BatchedCoreEngine, NO_WINNER
+from game_logic import NUM_ACTIONS
+from opponents import make_opponent
+from spatial_vectorizer import SpatialVectorizer
+
+# Mismo límite anti-bucle que RiftboundEnv._play_opponent_turn
+MAX_OPPONENT_ACTIONS = 100
+
+PLAYER, OPPONENT = 0, 1
+
+
+class RiftboundVectorEnv(VectorEnv):
+    """N partidas de Riftbound en un solo motor por lotes."""
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs: int = 8, catalog=None, opponent=None):
+        super().__init__()
+        self.num_envs = num_envs
+        self.engine = BatchedCoreEngine(num_envs, catalog=catalog)
+        # Política del oponente interno, compartida por las N partidas
+        self.opponent = make_opponent(opponent)
+        self.vectorizer = SpatialVectorizer(channels=32, height=9, width=5)
+
+        self.single_observation_space = spaces.Box(low=0, high=1, shape=(32, 9, 5), dtype=np.float32)
+        self.single_action_space = spaces.Discrete(128)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        # Buffers reutilizados en cada step
+        self._observations = np.zeros((num_envs, 32, 9, 5), dtype=np.float32)
+        self._mask = np.zeros((num_envs, NUM_ACTIONS), dtype=bool)
+        self._action_masks = np.zeros((num_envs, self.single_action_space.n), dtype=bool)
+        self._rngs = [None] * num_envs
+
+    def reset(self, *, seed=None, options: dict = None):
+        """Reinicia todas las partidas; la partida i usa la semilla seed + i, como N RiftboundEnv."""
+        if seed is not None:
+            seeds = [seed + i for i in range(self.num_envs)] if isinstance(seed, int) else list(seed)
+            self._rngs = [seeding.np_random(s)[0] for s in seeds]
+        else:
+            self._rngs = [rng if rng is not None else seeding.np_random()[0] for rng in self._rngs]
+            seeds = [self._next_seed(i) for i in range(self.num_envs)]
+
+        self.engine.reset(seeds)
+        self.vectorizer.vectorize_batched(self.engine, PLAYER, out=self._observations)
+        return self._observations, {}
+
+    def _next_seed(self, i: int) -> int:
+        # Igual que RiftboundEnv.reset() sin semilla
+        return int(self._rngs[i].integers(0, 2**32))
+
+    def step(self, actions):
+        """Avanza las N partidas: acción del jugador, turno del oponente, observación y recompensa."""
+        engine = self.engine
+        actions = np.asarray(actions, dtype=np.int64)
+
+        # 1. Acción del jugador: el índice si es legal; si no, índice módulo número de acciones legales
+        mask = engine.legal_mask(out=self._mask)
+        mask &= (engine.active == PLAYER)[:, None]
+        direct = (actions < NUM_ACTIONS) & mask[np.arange(self.num_envs), np.minimum(actions, NUM_ACTIONS - 1)]
+        legal = np.cumsum(mask, axis=1)
+        count = legal[:, -1]
+        choice = actions % np.maximum(count, 1)
+        mapped = np.where(count > 0, np.argmax(legal > choice[:, None], axis=1), -1)
+        engine.step(np.where(direct, actions, mapped))
+
+        # 2. Turno del oponente (una decisión por lotes por acción)
+        self._play_opponent_turn()
+
+        # 3. Observación desde la perspectiva del jugador
+        observations = self.vectorizer.vectorize_batched(engine, PLAYER, out=self._observations)
+
+        # 4. Recompensa: +/-10 al ganar o perder, más la ventaja de vida
+        winner = engine.winner
+        terminated = winner != NO_WINNER
+        rewards = np.where(winner == PLAYER, 10.0, np.where(winner == OPPONENT, -10.0, 0.0))
+        rewards += (engine.health[:, PLAYER] - 20) * 0.05
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        infos = {}
+        done = np.flatnonzero(terminated)
+        if done.size:
+            infos = self._autoreset(done, infos)
+        return observations, rewards, terminated, truncated, infos
+
+    def action_masks(self) -> np.ndarray:
+        """Máscaras de acciones legales del jugador [N, 128]; buffer reutilizado, se sobrescribe en cada llamada."""
+        engine = self.engine
+        mask = engine.legal_mask(out=self._mask)
+        mask &= (engine.active == PLAYER)[:, None]
+        self._action_masks[:, :NUM_ACTIONS] = mask
+        return self._action_masks
+
+    def _play_opponent_turn(self):
+        engine = self.engine
+        for _ in range(MAX_OPPONENT_ACTIONS):
+            acting = np.flatnonzero((engine.winner == NO_WINNER) & (engine.active == OPPONENT))
+            if not acting.size:
+                break
+            mask = engine.legal_mask(out=self._mask)
+            engine.step(self.opponent.act_batch(engine, mask, acting))
+
+    def _autoreset(self, done: np.ndarray, infos: dict) -> dict:
+        final_obs = self._observations[done].copy()
+        for k, i in enumerate(done):
+            infos = self._add_info(infos, {"final_obs": final_obs[k], "final_info": {}}, i)
+        self.engine.reset_games(done, [self._next_seed(i) for i in done])
+        self.vectorizer.vectorize_batched(self.engine, PLAYER, out=self._observations, rows=done)
+        return infos
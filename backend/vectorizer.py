@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Dict, Any
+from typing import Any, Dict, Sequence
 
 class StateVectorizer:
     """
@@ -9,8 +9,13 @@ class StateVectorizer:
     def __init__(self, vector_dim=256):
         self.vector_dim = vector_dim
 
-    def vectorize(self, state: Dict[str, Any]) -> np.ndarray:
-        vector = np.zeros(self.vector_dim, dtype=np.float32)
+    def vectorize(self, state: Dict[str, Any], out: np.ndarray = None) -> np.ndarray:
+        """Vectorizes one state; `out` is an optional [vector_dim] float32 buffer (overwritten)."""
+        if out is None:
+            vector = np.zeros(self.vector_dim, dtype=np.float32)
+        else:
+            vector = out
+            vector.fill(0.0)
         idx = 0
 
         # 1. Global State (Indices 0-4)
@@ -48,6 +53,14 @@ class StateVectorizer:
 
         return vector
 
+    def vectorize_batch(self, states: Sequence[Dict[str, Any]], out: np.ndarray = None) -> np.ndarray:
+        """Vectorizes a sequence of states into rows 0..B-1 of `out` ([B, vector_dim], allocated if None)."""
+        if out is None:
+            out = np.zeros((len(states), self.vector_dim), dtype=np.float32)
+        for i, state in enumerate(states):
+            self.vectorize(state, out=out[i])
+        return out
+
 # Global instance
 vectorizer = StateVectorizer()
 
@@ -0,0 +1,150 @@
+import numpy as np
+from game_logic import Card, PythonCoreEngine, PLAYER_IDS, ACTION_END_TURN, ACTION_PLAY_OFFSET, ACTION_ATTACK_OFFSET, MAX_FIELD_SIZE
+from batched_engine import BatchedCoreEngine
+from card_catalog import CardCatalog, CATALOG_VERSION, get_catalog
+
+
+def _card_tuple(card):
+    return (card.handle, card.id, card.type, card.cost, card.attack, card.health, tuple(card.keywords), card.is_barrier_active)
+
+
+def _state_tuple(state):
+    return (
+        state.turn, state.active_player, state.winner, state.seed, state.zobrist,
+        tuple(
+            (p.health, p.mana, p.max_mana, p.deck_pos,
+             tuple(_card_tuple(c) for c in p.hand),
+             tuple(_card_tuple(c) for c in p.field))
+            for p in (state.players[pid] for pid in PLAYER_IDS)
+        )
+    )
+
+
+def _to_dict_action(state, index):
+    """Decodes a layout index into the scalar engine's dict action."""
+    player = state.players[state.active_player]
+    if index == ACTION_END_TURN:
+        return {"type": "END_TURN"}
+    if index < ACTION_ATTACK_OFFSET:
+        card = player.hand[index - ACTION_PLAY_OFFSET]
+        return {"type": "PLAY_CARD", "card_id": card.id, "handle": card.handle}
+    card = player.field[index - ACTION_ATTACK_OFFSET]
+    return {"type": "ATTACK", "card_id": card.id, "handle": card.handle}
+
+
+def keyword_catalog(seed: int = 0) -> CardCatalog:
+    """The real catalog with random keyword masks, so combat keywords show up in play."""
+    base = get_catalog()
+    rng = np.random.default_rng(seed)
+    return CardCatalog({
+        "version": CATALOG_VERSION, "ids": np.array(base.ids), "cost": base.cost, "attack": base.attack,
+        "health": base.health, "type": base.type, "playable": base.playable,
+        "keywords": rng.integers(0, 256, size=len(base), dtype=np.uint8),
+    })
+
+
+def verify_parity(num_games: int = 256, max_steps: int = 400, seed: int = 0, catalog=None):
+    """Plays the same random action sequences on both engines and compares every state."""
+    seeds = [seed + g for g in range(num_games)]
+    batched = BatchedCoreEngine(num_games, catalog=catalog).reset(seeds)
+
+    scalars = []
+    for s in seeds:
+        engine = PythonCoreEngine(catalog=catalog)
+        engine.reset(s)
+        scalars.append(engine)
+
+    chooser = np.random.default_rng(seed)
+    mismatches = 0
+    for step in range(max_steps):
+        mask = batched.legal_mask()
+        actions = np.zeros(num_games, dtype=np.int64)
+        for g, engine in enumerate(scalars):
+            if engine.state.winner:
+                continue
+            if not np.array_equal(engine.legal_mask(engine.state.active_player), mask[g]):
+                mismatches += 1
+                print(f"Legal mask mismatch: game {g} at step {step}")
+            legal = np.flatnonzero(mask[g])
+            idx = int(legal[chooser.integers(len(legal))])
+            actions[g] = idx
+            if step % 2:
+                engine.apply_action(_to_dict_action(engine.state, idx))
+            else:
+                engine.apply_action_index(idx)
+
+        batched.step(actions)
+
+        for g, engine in enumerate(scalars):
+            if _state_tuple(engine.state) != _state_tuple(batched.to_game_state(g)):
+                mismatches += 1
+                print(f"Mismatch: game {g} at step {step}")
+        if all(engine.state.winner for engine in scalars):
+            break
+
+    finished = int((batched.winner >= 0).sum())
+    print(f"--- Batched Engine Parity ({'mock cards' if catalog is None else f'{int(np.count_nonzero(catalog.keywords))} keyword cards'}) ---")
+    print(f"Games: {num_games} | Finished: {finished} | Steps: {step + 1} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def verify_full_field_masks(seed: int = 0):
+    """A full field losing a unit off turn must not give its owner legal plays (random games never fill it)."""
+    engine = PythonCoreEngine()
+    engine.reset(seed)
+    state = engine.state
+    active, inactive = (state.players[pid] for pid in sorted(PLAYER_IDS, key=lambda pid: pid != state.active_player))
+    inactive.field[:] = [Card("MOCK-1", 1, 1, 1, handle=1000 + i) for i in range(MAX_FIELD_SIZE)]
+    active.field[:] = [Card("MOCK-2", 1, 9, 9, handle=999)]
+    inactive.mana = 10  # Its hand would be playable, were it its turn
+    for player in (active, inactive):
+        player.reindex()
+    engine.invalidate_legal_masks()
+    engine.legal_mask(inactive.id)  # Clean, empty cached mask
+    engine.apply_action_index(ACTION_ATTACK_OFFSET)
+
+    ok = len(inactive.field) == MAX_FIELD_SIZE - 1 and not engine.legal_mask(inactive.id).any()
+    print("--- Full Field Masks ---")
+    print(f"Inactive field: {len(inactive.field)} | Inactive mask empty: {ok}")
+    return ok
+
+
+def verify_rollouts(num_games: int = 256, warmup: int = 10, seed: int = 0, catalog=None):
+    """Scalar rollout() from seeded mid-game positions vs one batched rollout of the same states."""
+    mismatches = 0
+    for policy in ("random", "greedy"):
+        scalars = []
+        for g in range(num_games):
+            engine = PythonCoreEngine(catalog=catalog)
+            engine.reset(seed + g)
+            engine.rollout("random", max_steps=warmup)
+            scalars.append(engine)
+
+        batched = BatchedCoreEngine.from_states(
+            [e.state for e in scalars], [e.policy_rng.seed for e in scalars], catalog=catalog
+        )
+        for g, engine in enumerate(scalars):
+            if _state_tuple(engine.state) != _state_tuple(batched.to_game_state(g)):
+                mismatches += 1
+                print(f"from_states mismatch: game {g}")
+
+        winners, lengths = batched.rollout(policy)
+        for g, engine in enumerate(scalars):
+            winner, length = engine.rollout(policy)
+            expected = PLAYER_IDS.index(winner) if winner else -1
+            if (expected, length) != (winners[g], lengths[g]) or \
+                    _state_tuple(engine.state) != _state_tuple(batched.to_game_state(g)):
+                mismatches += 1
+                print(f"Rollout mismatch ({policy}): game {g}")
+        print(f"--- Rollout Parity ({policy}) ---")
+        print(f"Games: {num_games} | Mean length: {lengths.mean():.1f} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    verify_parity()
+    verify_parity(catalog=get_catalog())
+    verify_parity(catalog=keyword_catalog())
+    verify_full_field_masks()
+    verify_rollouts()
+    verify_rollouts(catalog=keyword_catalog())
@@ -3,12 +3,12 @@ import numpy as np
 import os
 from sklearn.metrics.pairwise import cosine_similarity
 
+from embedding_store import get_store
+
 def verify_semantic_cohesion():
-    cache_path = os.path.join(os.path.dirname(__file__), 'embeddings', 'card_embeddings_cache.json')
     data_path = os.path.join(os.path.dirname(__file__), '..', 'src', 'data', 'riftbound-data.json')
     
-    with open(cache_path, 'r') as f:
-        embeddings = json.load(f)
+    embeddings = get_store()
     
     with open(data_path, 'r', encoding='utf-8-sig') as f:
         cards = json.load(f)
@@ -0,0 +1,220 @@
+import copy
+import time
+
+import numpy as np
+from card_catalog import get_catalog
+from card_features import CardFeatures
+from game_gym import RiftboundEnv
+from game_logic import PythonCoreEngine, zobrist_hash
+from opponents import OPPONENTS
+from vector_env import RiftboundVectorEnv
+
+
+def verify_vector_env(num_envs: int = 32, steps: int = 300, seed: int = 0, opponent: str = "random"):
+    """Steps N RiftboundEnv and one RiftboundVectorEnv with the same actions and compares every output."""
+    envs = [RiftboundEnv(opponent=opponent) for _ in range(num_envs)]
+    vec = RiftboundVectorEnv(num_envs, opponent=opponent)
+
+    expected = np.stack([env.reset(seed=seed + i)[0] for i, env in enumerate(envs)])
+    obs, _ = vec.reset(seed=seed)
+    mismatches = int(not np.array_equal(expected, obs))
+
+    chooser = np.random.default_rng(seed)
+    episodes = 0
+    for step in range(steps):
+        actions = chooser.integers(0, 128, size=num_envs)
+        obs, rewards, terminated, truncated, infos = vec.step(actions)
+        for i, env in enumerate(envs):
+            o, r, term, trunc, _ = env.step(int(actions[i]))
+            if term or trunc:
+                episodes += 1
+                if not np.array_equal(o, infos["final_obs"][i]):
+                    mismatches += 1
+                    print(f"Final observation mismatch: env {i} at step {step}")
+                o, _ = env.reset()
+            if not np.array_equal(o, obs[i]) or r != rewards[i] or term != terminated[i]:
+                mismatches += 1
+                print(f"Mismatch: env {i} at step {step}")
+
+    print(f"--- Vector Env Parity ({opponent} opponent) ---")
+    print(f"Envs: {num_envs} | Steps: {steps} | Episodes: {episodes} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def verify_observation_paths(games: int = 40):
+    """vectorize_engine and both vectorize_features must match the dict path (vectorize over _serialize_state) bit for bit."""
+    env = RiftboundEnv(obs_mode=("spatial", "semantic"))
+    spatial, semantic = env.vectorizer, env.semantic_vectorizer
+    out = np.empty((32, 9, 5), dtype=np.float32)
+    checked = mismatches = 0
+    for catalog in (None, get_catalog()):
+        for seed in range(games):
+            engine = PythonCoreEngine(catalog=catalog)
+            engine.reset(seed)
+            while not engine.state.winner:
+                serialized = env._serialize_state(engine.state)
+                features = CardFeatures(engine.state, spatial.card_rows)
+                for pid in ("player", "opponent"):
+                    expected = spatial.vectorize(serialized, pid)
+                    checked += 1
+                    mismatches += expected.tobytes() != spatial.vectorize_engine(engine.state, pid, out=out).tobytes()
+                    mismatches += expected.tobytes() != spatial.vectorize_features(features, pid).tobytes()
+                    expected = semantic.vectorize(serialized, pid)
+                    mismatches += expected.tobytes() != semantic.vectorize_features(features, pid).tobytes()
+                legal = np.flatnonzero(engine.legal_mask(engine.state.active_player))
+                engine.apply_action_index(int(legal[engine.policy_rng.random_index(legal.size)]))
+
+    print("--- Observation Paths (dict vs engine) ---")
+    print(f"States: {checked} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def verify_batch_vectorizers(games: int = 10):
+    """vectorize_batch into a reused [B, ...] buffer must match per-state vectorize() for all three vectorizers."""
+    env = RiftboundEnv(obs_mode=("flat", "spatial", "semantic"))
+    states, serialized = [], []
+    for seed in range(games):
+        engine = PythonCoreEngine()
+        engine.reset(seed)
+        while not engine.state.winner:
+            states.append(copy.deepcopy(engine.state))
+            serialized.append(env._serialize_state(engine.state))
+            legal = np.flatnonzero(engine.legal_mask(engine.state.active_player))
+            engine.apply_action_index(int(legal[engine.policy_rng.random_index(legal.size)]))
+
+    spatial, flat, semantic = env.vectorizer, env.flat_vectorizer, env.semantic_vectorizer
+    pids = ["player", "opponent"] * (len(serialized) // 2) + ["player"] * (len(serialized) % 2)
+    # Buffers start dirty so a missing fill shows up as a mismatch
+    spatial_out = np.ones((len(serialized), 32, 9, 5), dtype=np.float32)
+    flat_out = np.ones((len(serialized), flat.vector_dim), dtype=np.float32)
+    semantic_out = np.ones((len(serialized), semantic.total_dim), dtype=np.float32)
+
+    mismatches = 0
+    for batch in (spatial.vectorize_batch(serialized, pids, out=spatial_out),
+                  spatial.vectorize_batch(states, pids, out=spatial_out.copy())):
+        mismatches += sum(not np.array_equal(batch[i], spatial.vectorize(s, pids[i])) for i, s in enumerate(serialized))
+    batch = flat.vectorize_batch(serialized, out=flat_out)
+    mismatches += sum(not np.array_equal(batch[i], flat.vectorize(s)) for i, s in enumerate(serialized))
+    batch = semantic.vectorize_batch(serialized, pids, out=semantic_out)
+    mismatches += sum(not np.array_equal(batch[i], semantic.vectorize(s, pids[i])) for i, s in enumerate(serialized))
+
+    print("--- Batch Vectorizers (vectorize_batch vs vectorize) ---")
+    print(f"States: {len(serialized)} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def verify_incremental_observations(steps: int = 5000, seed: int = 0):
+    """RiftboundEnv(verify_obs=True) checks every patched observation against a full re-encode (raises on mismatch)."""
+    counts = []
+    for opponent in OPPONENTS:
+        env = RiftboundEnv(opponent=opponent, verify_obs=True)
+        env.reset(seed=seed)
+        chooser = np.random.default_rng(seed)
+        for a in chooser.integers(0, 128, size=steps):
+            if env.step(int(a))[2]:
+                env.reset()
+            if chooser.random() < 0.01:
+                env.set_state(env.get_state())
+        encoder = env._spatial_encoder
+        counts.append(f"{opponent}: {encoder.full_encodes} full / {encoder.patches} patched / {encoder.skips} skipped")
+
+    print("--- Incremental Observations (verify mode) ---")
+    print(" | ".join(counts))
+    return True
+
+
+def verify_env_states(positions: int = 30, horizon: int = 15, seed: int = 0):
+    """set_state(get_state()) must replay the same steps, in the same env and in a fresh one."""
+    env = RiftboundEnv()
+    env.reset(seed=seed)
+    chooser = np.random.default_rng(seed)
+    mismatches = 0
+
+    def play(target, actions):
+        trace = []
+        for a in actions:
+            obs, reward, terminated, _, _ = target.step(int(a))
+            trace.append((obs.tobytes(), reward, target.engine.state.zobrist))
+            if terminated:
+                break
+        return trace
+
+    for _ in range(positions):
+        for a in chooser.integers(0, 128, size=chooser.integers(1, 6)):
+            if env.step(int(a))[2]:
+                env.reset()
+        state = env.get_state()
+        actions = chooser.integers(0, 128, size=horizon)
+        expected = play(env, actions)
+        fresh = RiftboundEnv()
+        fresh.reset(seed=seed + 1)
+        fresh.set_state(state)
+        mismatches += play(fresh, actions) != expected
+        env.set_state(state)
+        mismatches += play(env, actions) != expected
+        if env.engine.state.winner:
+            env.reset()
+
+    print("--- Env get_state / set_state ---")
+    print(f"Positions: {positions} | Mismatches: {mismatches}")
+    return mismatches == 0
+
+
+def verify_state_isolation(positions: int = 30, horizon: int = 15, seed: int = 1):
+    """B.set_state(A.get_state()) and B's later steps must leave A's cards and Zobrist hash untouched."""
+    a, b = RiftboundEnv(), RiftboundEnv()
+    a.reset(seed=seed)
+    b.reset(seed=seed + 1)
+    chooser = np.random.default_rng(seed)
+    failures = 0
+
+    def units(env):
+        return [[(c.handle, c.health, c.is_barrier_active) for c in p.hand + p.field]
+                for p in env.engine.state.players.values()]
+
+    for _ in range(positions):
+        state = a.get_state()
+        # A moves on, so the captured health/barrier values no longer match its live cards
+        for action in chooser.integers(0, 128, size=chooser.integers(1, 6)):
+            if a.step(int(action))[2]:
+                a.reset()
+        before = units(a)
+        b.set_state(state)
+        for action in chooser.integers(0, 128, size=horizon):
+            if b.step(int(action))[2]:
+                break
+        failures += units(a) != before or a.engine.state.zobrist != zobrist_hash(a.engine.state)
+
+    print("--- Env state isolation (two envs) ---")
+    print(f"Positions: {positions} | Failures: {failures}")
+    return failures == 0
+
+
+def throughput(num_envs: int, steps: int = 200) -> float:
+    """Env steps per second (all N games count) for the vector env."""
+    vec = RiftboundVectorEnv(num_envs)
+    vec.reset(seed=0)
+    actions = np.random.default_rng(0).integers(0, 128, size=(steps, num_envs))
+    start = time.perf_counter()
+    for a in actions:
+        vec.step(a)
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    for opponent in OPPONENTS:
+        verify_vector_env(opponent=opponent)
+    verify_observation_paths()
+    verify_batch_vectorizers()
+    verify_incremental_observations()
+    verify_env_states()
+    verify_state_isolation()
+    env = RiftboundEnv()
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for a in np.random.default_rng(0).integers(0, 128, size=2000):
+        if env.step(int(a))[2]:
+            env.reset()
+    print(f"RiftboundEnv: {2000 / (time.perf_counter() - start):,.0f} steps/s")
+    for n in (1, 16, 256, 1024):
+        print(f"RiftboundVectorEnv N={n}: {throughput(n):,.0f} steps/s")
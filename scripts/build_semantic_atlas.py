@@ -22,36 +22,38 @@ Copyright (c) 2026 Manuel Ramirez Ballesteros. All rights reserved.
 
 import json
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from embedding_store import STORE_PATH, get_store
 
 
 def build_atlas() -> None:
     """Construye el Atlas Semántico desde el cache de embeddings."""
     
     base_dir = os.path.dirname(__file__)
-    cache_path = os.path.join(
-        base_dir, '..', 'backend', 'embeddings', 'card_embeddings_cache.json'
-    )
+    cache_path = STORE_PATH
     output_path = os.path.join(
         base_dir, '..', 'src', 'data', 'semantic_atlas.json'
     )
 
     print(f"Construyendo Atlas Semántico desde {cache_path}...")
     
+    # Cargar embeddings completos (un JSON antiguo se convierte al store)
+    embeddings = get_store()
+    
     # Verificar que existe el cache
-    if not os.path.exists(cache_path):
+    if not embeddings:
         print("Error: Cache de embeddings no encontrado.")
         print("Ejecuta primero: python backend/embeddings/card_embeddings.py")
         return
 
-    # Cargar embeddings completos
-    with open(cache_path, 'r', encoding='utf-8') as f:
-        embeddings = json.load(f)
-
     # Optimizar para cliente edge
     atlas = {}
     for card_id, vec in embeddings.items():
         # Truncar a 16 dimensiones y redondear
-        optimized = [round(x, 4) for x in vec[:16]]
+        optimized = [round(x, 4) for x in vec[:16].tolist()]
         atlas[card_id] = optimized
 
     # Guardar en directorio público del frontend
@@ -60,7 +62,7 @@ def build_atlas() -> None:
         json.dump(atlas, f, separators=(',', ':'))  # Sin espacios para menor tamaño
 
     # Estadísticas
-    original_size = os.path.getsize(cache_path) / 1024
+    original_size = embeddings.matrix.nbytes / 1024
     atlas_size = os.path.getsize(output_path) / 1024
     
     print(f"Atlas Semántico construido:")
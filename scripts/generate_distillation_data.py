@@ -14,7 +14,9 @@ Proceso:
 1. Cargar el modelo profesor (MainAgent).
 2. Ejecutar N episodios de juego.
 3. En cada turno, guardar la observación y los logits del profesor.
-4. Serializar el dataset a formato pickle para carga eficiente.
+4. Serializar el dataset: .npz con las observaciones comprimidas por
+   obs_codec (modo `codec`) más logits y valores, o pickle (.pkl, formato
+   original).
 
 Author: Manuel Ramirez Ballesteros
 Email: ramiballes96@gmail.com
@@ -32,17 +34,20 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
 from game_gym import RiftboundEnv
 from models.muzero_nexus import MuZeroNexus
+from obs_codec import ObsCodec
 
 
 def generate_distillation_data(
     episodes: int = 50, 
-    save_path: str = "backend/data/distillation_dataset.pkl"
+    save_path: str = "backend/data/distillation_dataset.npz",
+    codec: str = "sparse"
 ) -> None:
     """Genera dataset de destilación desde el modelo profesor.
     
     Args:
         episodes: Número de partidas a jugar
-        save_path: Ruta donde guardar el dataset
+        save_path: Ruta donde guardar el dataset (.npz comprimido o .pkl)
+        codec: Modo de obs_codec.ObsCodec para las observaciones del .npz
     """
     print("--- Generación de Datos de Destilación ---")
     
@@ -104,8 +109,17 @@ def generate_distillation_data(
     abs_save_path = os.path.join(os.path.dirname(__file__), '..', save_path)
     os.makedirs(os.path.dirname(abs_save_path), exist_ok=True)
     
-    with open(abs_save_path, "wb") as f:
-        pickle.dump(dataset, f)
+    if abs_save_path.endswith(".npz"):
+        encoded = ObsCodec(codec).encode(np.stack([sample["obs"] for sample in dataset]))
+        encoded.save(
+            abs_save_path,
+            logits=np.stack([sample["logits"] for sample in dataset]),
+            value=np.array([sample["value"] for sample in dataset], dtype=np.float32)
+        )
+        print(f"Observaciones comprimidas ({codec}): {encoded.compression_ratio:.1f}x")
+    else:
+        with open(abs_save_path, "wb") as f:
+            pickle.dump(dataset, f)
     
     print(f"--- Generación Completada ---")
     print(f"Guardadas {len(dataset)} muestras en {abs_save_path}")